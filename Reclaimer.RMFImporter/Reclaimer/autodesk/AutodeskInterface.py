@@ -1,13 +1,12 @@
 import operator
 from typing import cast
 from typing import Dict, Tuple, List
-from functools import reduce
 
 import pymxs
-from pymxs import runtime as rt
 
 from .MaterialBuilder import *
 from .Utils import *
+from .. import autodesk
 
 from ..src.ImportOptions import *
 from ..src.SceneFilter import *
@@ -102,6 +101,7 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
     materials: List[rt.Material] = None
     unique_meshes: Dict[MeshKey, rt.Mesh] = None
     mat_assign: List[Tuple[rt.Editable_Mesh, rt.Material]] = None
+    mesh_call_counts: Dict[str, int] = None # number of pymxs calls used to build each mesh
 
     def init_scene(self, scene: Scene, options: ImportOptions) -> None:
         self.unit_scale = scene.unit_scale / MX_UNITS * options.OBJECT_SCALE
@@ -109,6 +109,10 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         self.options = options
         self.unique_meshes = dict()
         self.mat_assign = list()
+        self.mesh_call_counts = dict()
+
+        # defines the bulk functions used to build meshes without crossing into MAXScript for every element
+        rt.fileIn(autodesk.resource('MeshBuilder.ms'))
 
         # TODO: OSL material API changed so MaterialBuilder needs to be updated
         if pymxs.runtime.maxversion()[7] >= 2025:
@@ -130,6 +134,11 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
 
         __groups__.clear()
 
+        if self.mesh_call_counts:
+            total = sum(self.mesh_call_counts.values())
+            name, most = max(self.mesh_call_counts.items(), key=operator.itemgetter(1))
+            print(f'pymxs calls: {total} for {len(self.mesh_call_counts)} meshes, {total / len(self.mesh_call_counts):.1f} per mesh, {most} for {name}')
+
     def init_materials(self) -> None:
         self.material_builder = MaterialBuilder(self.scene, self.options)
 
@@ -174,14 +183,6 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
     def apply_transform(self, model_state: AutodeskModelState, world_transform: rt.Matrix3) -> None:
         model_state.group_helper.group_transform = world_transform
 
-    def _get_bone_transforms(self, model: Model) -> List[rt.Matrix3]:
-        result = []
-        for bone in model.bones:
-            lineage = model.get_bone_lineage(bone)
-            transforms = [self.create_transform(x.transform, True) for x in reversed(lineage)]
-            result.append(reduce(operator.mul, transforms))
-        return result
-
     def create_bones(self, model_state: AutodeskModelState) -> None:
         model = model_state.model
 
@@ -191,7 +192,7 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         bone_layer = model_state.create_layer(f'{model_state.display_name}::__bones__')
         bone_layer.setParent(model_state.parent_layer)
         model_state.region_layers[-1] = bone_layer
-        bone_transforms = self._get_bone_transforms(model)
+        bone_transforms = self.get_bone_transforms(model_state)
 
         maxbones = model_state.maxbones = []
         for i, b in enumerate(model.bones):
@@ -203,9 +204,9 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
             model_state.append_child(maxbone)
             bone_layer.addnode(maxbone)
 
-            children = model.get_bone_children(b)
+            children = model.bone_children[i]
             if children:
-                size = max(rt.length(toPoint3(b.transform[3])) for b in children)
+                size = max(rt.length(toPoint3(model.bones[ci].transform[3])) for ci in children)
                 maxbone.length = size * self.unit_scale
 
             maxbone.taper = 70 if children else 50
@@ -220,7 +221,7 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         MARKER_SIZE = 0.01 * self.unit_scale * options.MARKER_SCALE
 
         marker_layer = None
-        bone_transforms = self._get_bone_transforms(model)
+        bone_transforms = self.get_bone_transforms(model_state)
 
         for marker in model.markers:
             for i, instance in enumerate(marker.instances):
@@ -255,7 +256,12 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         return region_layer
 
     def build_mesh(self, model_state: AutodeskModelState, permutation: ModelPermutation, region_group: MaxLayer, world_transform: rt.Matrix3, mesh_params: MeshParams) -> None:
-        vertex_buffer, mesh_key, display_name = mesh_params.vertex_buffer, mesh_params.mesh_key, mesh_params.display_name
+        call_count = rt.count
+        self._build_mesh(model_state, permutation, region_group, world_transform, mesh_params)
+        self.mesh_call_counts[mesh_params.display_name] = rt.count - call_count
+
+    def _build_mesh(self, model_state: AutodeskModelState, permutation: ModelPermutation, region_group: MaxLayer, world_transform: rt.Matrix3, mesh_params: MeshParams) -> None:
+        mesh_key, display_name = mesh_params.mesh_key, mesh_params.display_name
 
         if mesh_key in self.unique_meshes.keys():
             source = self.unique_meshes.get(mesh_key)
@@ -271,12 +277,13 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
             return
 
         # note 3dsMax uses 1-based indices for triangles, vertices etc
+        # the MeshBuilder.ms functions take flat 0-based arrays and do the conversion on the MAXScript side
 
         DECOMPRESSION_TRANSFORM = toMatrix3(mesh_params.vertex_transform)
-        positions = list(toPoint3(v) * DECOMPRESSION_TRANSFORM for v in vertex_buffer.position_channels[0])
-        faces = list(toPoint3(t) + 1 for t in mesh_params.chain_triangles())
+        positions = flatten(mesh_params.get_array('position'), 3)
+        faces = flatten(mesh_params.get_faces(), 3)
 
-        mesh_obj = cast(rt.Editable_Mesh, rt.Mesh(vertices=positions, faces=faces))
+        mesh_obj = cast(rt.Editable_Mesh, rt.reclaimer_buildMesh(positions, faces, DECOMPRESSION_TRANSFORM))
         mesh_obj.name = display_name
 
         mc: MeshContext = (self.scene, model_state, mesh_params, mesh_obj)
@@ -301,10 +308,7 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         if not (self.options.IMPORT_NORMALS and vertex_buffer.normal_channels):
             return
 
-        normals = list(rt.normalize(toPoint3(v)) for v in vertex_buffer.normal_channels[0])
-        for i, normal in enumerate(normals):
-            # note: prior to 2015, this was only temporary
-            rt.setNormal(mesh_obj, i + 1, normal)
+        rt.reclaimer_setNormals(mesh_obj, flatten(mesh_params.get_array('normal'), 3))
 
     def _build_uvw(self, mc: MeshContext):
         scene, model_state, mesh_params, mesh_obj = mc
@@ -319,11 +323,8 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         # however channel 0 is always reserved for vertex color
         rt.Meshop.setNumMaps(mesh_obj, len(vertex_buffer.texcoord_channels) + 1)
 
-        for i, texcoord_buffer in enumerate(vertex_buffer.texcoord_channels):
-            rt.Meshop.defaultMapFaces(mesh_obj, i + 1) # sets vert/face count to same as mesh, copies triangle indices from mesh
-            for vi, v in enumerate(texcoord_buffer):
-                vec = rt.Point3(v[0], v[1], 0) * DECOMPRESSION_TRANSFORM
-                rt.Meshop.setMapVert(mesh_obj, i + 1, vi + 1, rt.Point3(vec[0], 1 - vec[1], 0))
+        for i in range(len(vertex_buffer.texcoord_channels)):
+            rt.reclaimer_setMapVerts(mesh_obj, i + 1, flatten(mesh_params.get_array('texcoord', i), 2), DECOMPRESSION_TRANSFORM)
 
     def _build_matindex(self, mc: MeshContext):
         scene, model_state, mesh_params, mesh_obj = mc
@@ -332,9 +333,9 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
             return
 
         material_ids = []
-        for mi, triangles in mesh_params.triangle_sets:
+        for mi, triangles in mesh_params.triangle_arrays:
             mi = max(1, mi + 1) # default to 1 for meshes with no material
-            material_ids.extend(mi for _ in triangles)
+            material_ids.extend([mi] * len(triangles))
 
         rt.setMesh(mesh_obj, materialIds=material_ids)
         self.mat_assign.append((mesh_obj, self.material_builder.create_multi_material(model_state.model)))
@@ -360,13 +361,13 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
         # TODO: set the dq blend weights per vertex (in max, enableDQ doesnt actually do anything until you set the dq blend weights)
 
         # note replaceVertexWeights() can take either bone indices or bone references
+        # the weights are passed to MAXScript in CSR form (see VertexBuffer.get_blend_arrays) using the bone indices of the skin modifier
         if bone_index >= 0:
             modifier.rigid_vertices = True
-            bi, bw = [model_state.maxbones[bone_index]], [1.0]
-            rt.SkinOps.addBone(modifier, bi[0], 0)
+            rt.SkinOps.addBone(modifier, model_state.maxbones[bone_index], 0)
             rt.redrawViews()
-            for vi in range(vertex_count): # set every vertex to 1.0
-                rt.SkinOps.replaceVertexWeights(modifier, vi + 1, bi, bw)
+            # set every vertex to 1.0 on the only bone
+            offsets, indices, weights = list(range(vertex_count + 1)), [0] * vertex_count, [1.0] * vertex_count
         else:
             # add every bone so the bone indices are 1:1 with the skin modifier
             for b in model_state.maxbones:
@@ -374,14 +375,9 @@ class AutodeskInterface(ViewportInterface[rt.Material, MaxLayer, rt.Matrix3, Aut
             # unfortunately it seems a redraw is required for the added bones to take effect
             # otherwise trying to set weights gives the error "Runtime error: Exceeded the vertex countSkin:Skin"
             rt.redrawViews()
-            bi, bw = [], []
-            for vi, blend_indicies, blend_weights in vertex_buffer.enumerate_blendpairs(mesh_params.mesh_flags):
-                bi.clear()
-                bw.clear()
-                for i, w in enumerate(blend_weights):
-                    bi.append(model_state.maxbones[blend_indicies[i]])
-                    bw.append(w)
-                rt.SkinOps.replaceVertexWeights(modifier, vi + 1, bi, bw)
+            offsets, indices, weights = (a if isinstance(a, list) else a.tolist() for a in mesh_params.get_blend_arrays())
+
+        rt.reclaimer_setSkinWeights(modifier, offsets, indices, weights)
 
         rt.SkinOps.removeUnusedBones(modifier)
 
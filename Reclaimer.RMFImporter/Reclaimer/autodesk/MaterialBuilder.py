@@ -1,8 +1,6 @@
 from typing import Dict, List
 
-from pymxs import runtime as rt
-
-from .Utils import *
+from .Utils import * # rt is the call counting runtime wrapper
 from .. import autodesk
 from ..src.SceneReader import *
 from ..src.ImportOptions import *
@@ -1,9 +1,36 @@
-from pymxs import runtime as rt
-from typing import Union
+import pymxs
+from typing import Sequence, Union, List
 
 from ..src.Types import *
 
 
+class RuntimeCallCounter:
+    '''
+    Wraps the pymxs runtime and counts every lookup made through it.
+    Each lookup crosses the boundary between python and MAXScript, so the count is a lower bound on the number of pymxs calls that were made.
+    '''
+
+    count: int
+
+    def __init__(self, runtime):
+        self._runtime = runtime
+        self.count = 0
+
+    def __getattr__(self, name: str):
+        self.count += 1
+        return getattr(self._runtime, name)
+
+
+rt = RuntimeCallCounter(pymxs.runtime)
+
+
+def flatten(values: Sequence[Sequence[float]], dimensions: int) -> List[float]:
+    ''' Flattens the first `dimensions` components of each vector into a single list that can be passed to MAXScript '''
+    if hasattr(values, 'ravel'):
+        return values[:, :dimensions].ravel().tolist() # numpy array from VectorBuffer.to_array()
+    return [v for vector in values for v in vector[:dimensions]]
+
+
 def toPoint2(value: Union[Float2, Float3, Float4]) -> rt.Point2:
     ''' Creates a 3dsMax Point2 from a float collection '''
     return rt.Point2(value[0], value[1])
@@ -1,11 +1,9 @@
 import bpy
-import itertools
-import operator
+import numpy as np # numpy is always bundled with blender
 from typing import cast
 from typing import Dict, Tuple, List
 from mathutils import Vector, Matrix, Quaternion
 from bpy.types import Context, Collection, Armature, EditBone, Object
-from functools import reduce
 
 from .CustomShaderNodes import *
 from .MaterialBuilder import *
@@ -30,6 +28,19 @@ BL_UNITS: float = 1000.0 # 1 blender unit = 1000mm
 MeshContext = Tuple[Scene, 'BlenderModelState', MeshParams, bpy.types.Mesh, Object]
 
 
+def _resize_columns(values: np.ndarray, count: int) -> np.ndarray:
+    ''' Truncates or zero-pads each row of a 2D array to `count` columns '''
+    if values.shape[1] >= count:
+        return values[:, :count]
+    return np.pad(values, ((0, 0), (0, count - values.shape[1])))
+
+def _transform_points(values: np.ndarray, transform: Matrix4x4) -> np.ndarray:
+    ''' Applies a row-major transform to each vector as if it were a 3D point, returning a (count, 3) float32 array '''
+    points = np.ones((len(values), 4), dtype=np.float32)
+    points[:, :3] = _resize_columns(values, 3)
+    return (points @ np.asarray(transform, dtype=np.float32))[:, :3]
+
+
 class BlenderModelState(ModelState):
     parent_collection: Collection
     root_object: Object
@@ -132,21 +143,13 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         for c in model_state.root_object.children:
             c.matrix_parent_inverse = Matrix.Identity(4)
 
-    def _get_bone_transforms(self, model: Model) -> List[Matrix]:
-        result = []
-        for bone in model.bones:
-            lineage = model.get_bone_lineage(bone)
-            transforms = [self.create_transform(x.transform, True) for x in lineage]
-            result.append(reduce(operator.matmul, transforms))
-        return result
-
     def create_bones(self, model_state: BlenderModelState) -> None:
         model, group_obj = model_state.model, model_state.root_object
 
         # options.BONE_SCALE not relevant to blender since you cant set bone width?
         TAIL_VECTOR = (0.03 * self.unit_scale, 0.0, 0.0)
 
-        bone_transforms = self._get_bone_transforms(model)
+        bone_transforms = self.get_bone_transforms(model_state)
 
         # armatures only work while they are included in the view layer
         # so we need to temporaily include the parent collection until the armature is done
@@ -195,7 +198,7 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         MODE = 'EMPTY_SPHERE' # TODO
         MARKER_SIZE = 0.01 * self.unit_scale * options.MARKER_SCALE
 
-        bone_transforms = self._get_bone_transforms(model)
+        bone_transforms = self.get_bone_transforms(model_state)
 
         for marker in model.markers:
             for i, instance in enumerate(marker.instances):
@@ -234,7 +237,7 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         return region_obj
 
     def build_mesh(self, model_state: BlenderModelState, permutation: ModelPermutation, region_group: Object, world_transform: Matrix, mesh_params: MeshParams) -> None:
-        vertex_buffer, mesh_key, display_name = mesh_params.vertex_buffer, mesh_params.mesh_key, mesh_params.display_name
+        mesh_key, display_name = mesh_params.mesh_key, mesh_params.display_name
 
         existing_mesh = self.unique_meshes.get(mesh_key, None)
         if existing_mesh:
@@ -246,18 +249,26 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
             self._apply_custom_properties(copy, permutation)
             return
 
+        # build flat arrays and push them with foreach_set rather than creating the mesh one element at a time
         # note blender doesnt like if we provide too many dimensions
-        positions = list(Vector(v).to_3d() for v in vertex_buffer.position_channels[0])
-        faces = list(mesh_params.chain_triangles())
+        positions = _transform_points(mesh_params.get_array('position'), mesh_params.vertex_transform)
+        faces = mesh_params.get_faces()
+        face_count = len(faces)
 
         mesh_data = bpy.data.meshes.new(display_name)
-        mesh_data.from_pydata(positions, [], faces)
+        mesh_data.vertices.add(len(positions))
+        mesh_data.vertices.foreach_set('co', positions.ravel())
+        mesh_data.loops.add(face_count * 3)
+        mesh_data.loops.foreach_set('vertex_index', faces.ravel())
+        mesh_data.polygons.add(face_count)
+        mesh_data.polygons.foreach_set('loop_start', np.arange(0, face_count * 3, 3, dtype=np.int32))
 
-        DECOMPRESSION_TRANSFORM = Matrix(mesh_params.vertex_transform).transposed()
-        mesh_data.transform(DECOMPRESSION_TRANSFORM)
+        # prior to 4.0, loop_total needs to be set as well - it is read-only in 4.0 and later
+        if bpy.app.version < (4, 0):
+            mesh_data.polygons.foreach_set('loop_total', np.full(face_count, 3, dtype=np.int32))
 
-        for p in mesh_data.polygons:
-            p.use_smooth = True
+        mesh_data.polygons.foreach_set('use_smooth', np.ones(face_count, dtype=bool))
+        mesh_data.update(calc_edges=True)
 
         mesh_obj = bpy.data.objects.new(mesh_data.name, mesh_data)
         mesh_obj.matrix_world = world_transform
@@ -282,7 +293,9 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         if not (self.options.IMPORT_NORMALS and vertex_buffer.normal_channels):
             return
 
-        normals = list(Vector(v).to_3d().normalized() for v in vertex_buffer.normal_channels[0])
+        normals = _resize_columns(mesh_params.get_array('normal'), 3)
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
         mesh_data.normals_split_custom_set_from_vertices(normals)
 
         # prior to 4.1, this is required in order for custom normals to take effect
@@ -290,23 +303,21 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         if bpy.app.version < (4, 1):
             mesh_data.use_auto_smooth = True
 
-    def _build_uvw(self, mc: MeshContext, faces: List[Triangle]):
+    def _build_uvw(self, mc: MeshContext, faces: np.ndarray):
         scene, model_state, mesh_params, mesh_data, mesh_obj = mc
         vertex_buffer = mesh_params.vertex_buffer
 
         if not (self.options.IMPORT_UVW and vertex_buffer.texcoord_channels):
             return
 
-        DECOMPRESSION_TRANSFORM = Matrix(mesh_params.texture_transform).transposed()
+        for i in range(len(vertex_buffer.texcoord_channels)):
+            texcoords = _transform_points(_resize_columns(mesh_params.get_array('texcoord', i), 2), mesh_params.texture_transform)[:, :2]
+            texcoords[:, 1] = 1 - texcoords[:, 1]
 
-        for texcoord_buffer in vertex_buffer.texcoord_channels:
             # note blender wants 3 uvs per triangle rather than one per vertex
-            # so we iterate the triangle indices rather than directly iterating the buffer
+            # so we index the decoded array with the triangle indices to get a uv for each loop
             uv_layer = mesh_data.uv_layers.new()
-            for i, ti in enumerate(itertools.chain(*faces)):
-                v = texcoord_buffer[ti]
-                vec = DECOMPRESSION_TRANSFORM @ Vector((v[0], v[1], 0))
-                uv_layer.data[i].uv = Vector((vec[0], 1 - vec[1]))
+            uv_layer.data.foreach_set('uv', texcoords[faces.ravel()].ravel())
 
     def _build_matindex(self, mc: MeshContext):
         scene, model_state, mesh_params, mesh_data, mesh_obj = mc
@@ -317,7 +328,7 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         # only append materials to the mesh that it actually uses, rather than appening all scene materials
         # this means we need to build a lookup of global mat index -> local mat index
         mat_lookup = dict()
-        for loc, glob in enumerate(set(mi for mi, _ in mesh_params.triangle_sets if mi >= 0)):
+        for loc, glob in enumerate(set(mi for mi, _ in mesh_params.triangle_arrays if mi >= 0)):
             mat_lookup[glob] = loc
 
         if not mat_lookup:
@@ -327,13 +338,9 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
         for i in mat_lookup.keys():
             mesh_data.materials.append(self.materials[i])
 
-        face_start = 0
-        for mi, triangles in mesh_params.triangle_sets:
-            face_end = face_start + len(triangles)
-            if mi >= 0:
-                for i in range(face_start, face_end):
-                    mesh_data.polygons[i].material_index = mat_lookup[mi]
-            face_start = face_end
+        # faces without a material keep the default index of 0
+        material_indices = np.concatenate([np.full(len(triangles), mat_lookup.get(mi, 0), dtype=np.int32) for mi, triangles in mesh_params.triangle_arrays])
+        mesh_data.polygons.foreach_set('material_index', material_indices)
 
     def _build_skin(self, mc: MeshContext):
         scene, model_state, mesh_params, mesh_data, mesh_obj = mc
@@ -362,31 +369,35 @@ class BlenderInterface(ViewportInterface[bpy.types.Material, bpy.types.Collectio
             # create a vertex group for each bone so the bone indices are 1:1 with the vertex groups
             for bone in model_state.model.bones:
                 mesh_obj.vertex_groups.new(name=bone.name)
-            print(list(vertex_buffer.enumerate_blendpairs(mesh_params.mesh_flags)))
-            for vi, blend_indicies, blend_weights in vertex_buffer.enumerate_blendpairs(mesh_params.mesh_flags):
-                for bi, bw in zip(blend_indicies, blend_weights):
-                    mesh_obj.vertex_groups[bi].add([vi], bw, 'ADD')
 
-    def _build_colors(self, mc: MeshContext, faces: List[Triangle]):
+            # VertexGroup.add() assigns a single weight to a list of vertices
+            # so for each bone we make one call per distinct weight value rather than one call per vertex
+            for bi, (vertex_ids, weights) in mesh_params.get_bone_weights().items():
+                group = mesh_obj.vertex_groups[bi]
+                values, inverse = np.unique(weights, return_inverse=True)
+                order = np.argsort(inverse, kind='stable')
+                splits = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+                for bw, ids in zip(values, np.split(vertex_ids[order], splits)):
+                    group.add(ids.tolist(), float(bw), 'ADD')
+
+    def _build_colors(self, mc: MeshContext, faces: np.ndarray):
         scene, model_state, mesh_params, mesh_data, mesh_obj = mc
         vertex_buffer = mesh_params.vertex_buffer
 
         if not self.options.IMPORT_COLORS:
             return
 
-        if vertex_buffer.color_channels:
-            for color_buffer in vertex_buffer.color_channels:
-                # note vertex_colors uses the same triangle loop as uv coords
-                # so we iterate the triangle indices rather than directly iterating the buffer
-                color_layer = mesh_data.vertex_colors.new()
-                for i, ti in enumerate(itertools.chain(*faces)):
-                    c = color_buffer[ti]
-                    color_layer.data[i].color = c
+        loop_vertices = faces.ravel()
+
+        # note vertex_colors uses the same triangle loop as uv coords
+        # so we index the decoded array with the triangle indices to get a color for each loop
+        for i in range(len(vertex_buffer.color_channels)):
+            colors = _resize_columns(mesh_params.get_array('color', i), 4)
+            color_layer = mesh_data.vertex_colors.new()
+            color_layer.data.foreach_set('color', colors[loop_vertices].ravel())
 
         if mesh_params.mesh_flags & MeshFlags.VERTEX_COLOR_FROM_POSITION > 0:
-            color_buffer = vertex_buffer.position_channels[0]
+            # the color comes from the position components after xyz, padded with zeros
+            colors = _resize_columns(mesh_params.get_array('position'), 7)[:, 3:7]
             color_layer = mesh_data.vertex_colors.new()
-            padding = (0, 0, 0, 0)
-            for i, ti in enumerate(itertools.chain(*faces)):
-                c = tuple(itertools.chain(color_buffer[ti], padding))[3:7]
-                color_layer.data[i].color = c
\ No newline at end of file
+            color_layer.data.foreach_set('color', colors[loop_vertices].ravel())
\ No newline at end of file
@@ -67,7 +67,7 @@ class RmfImportOperator(Operator, bpy_extras.io_utils.ImportHelper):
 
     def _import_nogui(self):
         try:
-            scene = SceneReader.open_scene(self.filepath)
+            scene = SceneReader.open_scene(self.filepath, memory_map=True, lazy=True)
         except Exception as e:
             self.report({'ERROR'}, 'An error occured during the import. See the console window for details.')
             print('\n===============\nERROR DETAILS\n===============\n')
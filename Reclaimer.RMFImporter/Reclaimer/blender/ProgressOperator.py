@@ -41,7 +41,7 @@ class RmfProgressOperator(QtWindowEventLoop):
                     raise task_queue.error
                 return
 
-            task_queue.execute_batch()
+            task_queue.execute_batch(options.TASK_BATCH_TIME)
             return 0
 
         bpy.app.timers.register(execute_next, first_interval=0.1)
@@ -0,0 +1,188 @@
+'''
+Converts RMF files to other formats without needing Blender or 3ds Max.
+
+Usage (from the directory that contains the Reclaimer folder):
+    python -m Reclaimer.convert <files, directories or glob patterns> [--output-dir dir] [--format obj|glb] [--models glob] [--regions glob] [--permutations glob] [--workers n] [--profile]
+
+Directories are searched recursively for .rmf files, and the output keeps the same relative folder structure.
+Each file is converted in a separate process, so multiple files are converted in parallel.
+'''
+
+import io
+import os
+import sys
+import glob
+import time
+import argparse
+import contextlib
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Callable, Iterator
+
+from .src.ImportOptions import ImportOptions
+from .src.SceneReader import SceneReader
+from .src.SceneFilter import SceneFilter
+from .src.SceneBuilder import SceneBuilder
+from .src.ViewportInterface import ViewportInterface
+from .headless import ObjInterface, GltfInterface, RecordingInterface
+
+__all__ = [
+    'FORMATS',
+    'ConvertJob',
+    'ConvertResult',
+    'find_files',
+    'convert_file',
+    'convert_files'
+]
+
+
+# file extension -> function that creates the interface for a given output path
+FORMATS: Dict[str, Callable[[str], ViewportInterface]] = {
+    'obj': ObjInterface,
+    'glb': GltfInterface
+}
+
+
+@dataclass
+class ConvertJob:
+    input_path: str
+    output_path: str
+    format: str = 'obj'
+    models: str = '*'
+    regions: str = '*'
+    permutations: str = '*'
+    verbose: bool = False
+    profile: bool = False
+
+
+@dataclass
+class ConvertResult:
+    input_path: str
+    output_path: str
+    input_size: int = 0
+    mesh_count: int = 0
+    seconds: float = 0.0
+    error: str = None
+    profile: List[str] = None # lines of the RecordingInterface and TaskProfiler reports, if requested
+
+
+def find_files(inputs: List[str], output_dir: str, extension: str) -> Iterator[Tuple[str, str]]:
+    ''' Expands the input files, directories and glob patterns into pairs of (input path, output path) '''
+
+    def output_path(path: str, root: str = None) -> str:
+        name = os.path.relpath(path, root) if root else os.path.basename(path)
+        return os.path.join(output_dir, os.path.splitext(name)[0] + f'.{extension}')
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in sorted(glob.glob(os.path.join(item, '**', '*.rmf'), recursive=True)):
+                yield (path, output_path(path, item))
+        elif os.path.isfile(item):
+            yield (item, output_path(item))
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield (path, output_path(path))
+
+
+def convert_file(job: ConvertJob) -> ConvertResult:
+    ''' Converts a single file. This runs in a worker process so it returns any errors in the result rather than raising them. '''
+
+    result = ConvertResult(job.input_path, job.output_path)
+    start = time.perf_counter()
+
+    try:
+        result.input_size = os.path.getsize(job.input_path)
+        os.makedirs(os.path.dirname(os.path.abspath(job.output_path)), exist_ok=True)
+
+        # the buffers are read as each model is written, which keeps the memory use bounded by the largest model rather than the whole file
+        scene = SceneReader.open_scene(job.input_path, memory_map=True, lazy=True)
+        filter = SceneFilter(scene)
+        filter.select_matching(job.models, job.regions, job.permutations)
+
+        options = ImportOptions(scene)
+        options.PROFILE_TASKS = job.profile
+        interface = FORMATS[job.format](job.output_path)
+        if job.profile:
+            interface = RecordingInterface(interface)
+        builder = SceneBuilder(interface, scene, filter, options)
+        result.mesh_count = filter.count_meshes()
+
+        output = contextlib.nullcontext() if job.verbose else contextlib.redirect_stdout(io.StringIO())
+        build_start = time.perf_counter()
+        with output:
+            task_queue = builder.begin_create_scene()
+            while not task_queue.finished():
+                task_queue.execute_next()
+            if task_queue.error:
+                raise task_queue.error
+            builder.end_create_scene()
+
+        if job.profile:
+            interface.total_seconds = time.perf_counter() - build_start
+            result.profile = interface.report() + task_queue.profiler.report()
+    except Exception as e:
+        result.error = f'{type(e).__name__}: {e}'
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def convert_files(jobs: List[ConvertJob], max_workers: int = None) -> Iterator[ConvertResult]:
+    ''' Converts each job in a pool of worker processes, yielding the results in the order they complete '''
+
+    if max_workers == 1 or len(jobs) <= 1:
+        # no point starting worker processes
+        yield from map(convert_file, jobs)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(convert_file, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(args: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m Reclaimer.convert', description='Converts RMF files to other formats')
+    parser.add_argument('inputs', nargs='+', help='RMF files, directories to search for RMF files, or glob patterns')
+    parser.add_argument('-o', '--output-dir', default='.', help='directory to write the converted files to')
+    parser.add_argument('-f', '--format', default='obj', choices=list(FORMATS), help='output format')
+    parser.add_argument('--models', default='*', help='only convert models or placements with names matching this glob pattern')
+    parser.add_argument('--regions', default='*', help='only convert regions with names matching this glob pattern')
+    parser.add_argument('--permutations', default='*', help='only convert permutations with names matching this glob pattern')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (defaults to the number of processors)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print the progress messages of each file')
+    parser.add_argument('--profile', action='store_true', help='print the time spent in each phase of the import and the slowest tasks for each file')
+    args = parser.parse_args(args)
+
+    jobs = [
+        ConvertJob(input_path, output_path, args.format, args.models, args.regions, args.permutations, args.verbose, args.profile)
+        for input_path, output_path in find_files(args.inputs, args.output_dir, args.format)
+    ]
+
+    if not jobs:
+        print('no input files found')
+        return 1
+
+    start = time.perf_counter()
+    total_size = failures = 0
+
+    for result in convert_files(jobs, args.workers):
+        size_mb = result.input_size / 1048576
+        if result.error:
+            failures += 1
+            print(f'FAILED {result.input_path}: {result.error}')
+        else:
+            total_size += result.input_size
+            rate = size_mb / result.seconds if result.seconds > 0 else 0
+            print(f'{result.input_path} -> {result.output_path}: {result.mesh_count} meshes, {size_mb:.1f}MB in {result.seconds:.2f}s ({rate:.1f}MB/s)')
+            if result.profile:
+                print('\n'.join(result.profile))
+
+    seconds = time.perf_counter() - start
+    print(f'converted {len(jobs) - failures}/{len(jobs)} files, {total_size / 1048576:.1f}MB in {seconds:.2f}s ({total_size / 1048576 / seconds:.1f}MB/s)')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,511 @@
+import os
+import sys
+import json
+import shutil
+import struct
+import tempfile
+from array import array
+from urllib.parse import quote
+from typing import Dict, List, Tuple, Optional, BinaryIO, Sequence, Union
+
+from .Utils import *
+
+from ..src.ImportOptions import *
+from ..src.SceneFilter import *
+from ..src.Scene import *
+from ..src.Model import *
+from ..src.Material import *
+from ..src.Types import *
+from ..src.Vectors import DataType, DescriptorFlags, VectorDescriptor
+from ..src.VertexBuffer import VectorBuffer
+from ..src.IndexBuffer import IndexLayout
+from ..src.ViewportInterface import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # data that needs to be transcoded will be converted one vector at a time
+
+__all__ = [
+    'GltfInterface'
+]
+
+
+GLTF_UNITS: float = 1000.0 # 1 gltf unit = 1 metre (1000mm)
+
+# the RMF data is Z-up, so the root node rotates the scene to be Y-up as required by glTF
+# (x, y, z) -> (x, z, -y), written as a row-major matrix that transforms row vectors, see Utils.py
+Z_UP_TO_Y_UP: Matrix4x4 = ((1., 0., 0., 0.), (0., 0., -1., 0.), (0., 1., 0., 0.), (0., 0., 0., 1.))
+
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+VECTOR_TYPES = { 1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4', 16: 'MAT4' }
+INDEX_TYPES = { 1: UNSIGNED_BYTE, 2: UNSIGNED_SHORT, 4: UNSIGNED_INT }
+
+# component types that can be used for each attribute, as (component type, normalized)
+# the quantized types are only valid when the KHR_mesh_quantization extension is used
+CORE_TYPES = {
+    'POSITION': [(FLOAT, False)],
+    'NORMAL': [(FLOAT, False)],
+    'TEXCOORD': [(FLOAT, False), (UNSIGNED_BYTE, True), (UNSIGNED_SHORT, True)],
+    'COLOR': [(FLOAT, False), (UNSIGNED_BYTE, True), (UNSIGNED_SHORT, True)]
+}
+
+QUANTIZED_TYPES = {
+    'POSITION': [],
+    'NORMAL': [(BYTE, True), (SHORT, True)],
+    'TEXCOORD': [(BYTE, True), (SHORT, True)],
+    'COLOR': []
+}
+
+ALPHA_MODES = {
+    ALPHA_MODE.CLIP: 'MASK',
+    ALPHA_MODE.ADD: 'BLEND',
+    ALPHA_MODE.MULTIPLY: 'BLEND',
+    ALPHA_MODE.BLEND: 'BLEND',
+    ALPHA_MODE.PRE_MULTIPLIED: 'BLEND'
+}
+
+
+def _flatten_matrix(m: Matrix4x4) -> List[float]:
+    # glTF matrices are column-major and transform column vectors, which has the same element order as a row-major matrix that transforms row vectors
+    return [float(v) for row in m for v in row]
+
+def _get_component_type(descriptor: VectorDescriptor) -> Optional[Tuple[int, bool]]:
+    ''' Gets the glTF (component type, normalized) that matches the vector format, or None if there is no equivalent '''
+
+    if descriptor._datatype == DataType.REAL:
+        return (FLOAT, False) if descriptor._size == 4 else None
+
+    if descriptor._datatype != DataType.INTEGER or descriptor._size not in (1, 2):
+        return None
+
+    flags = set(f for f, length in descriptor._dimensions if length == descriptor._size * 8)
+    if len(flags) != 1 or len(descriptor._dimensions) != descriptor._count:
+        return None
+
+    flags = flags.pop()
+    if not flags & DescriptorFlags.NORMALIZED or flags & DescriptorFlags.SIGN_SHIFTED:
+        return None
+
+    signed = flags & DescriptorFlags.SIGN_EXTENDED > 0
+    return ((BYTE if signed else UNSIGNED_BYTE) if descriptor._size == 1 else (SHORT if signed else UNSIGNED_SHORT), True)
+
+def _to_float_bytes(values: Union['np.ndarray', Sequence[Sequence[float]]], dimensions: int) -> bytes:
+    ''' Converts the first `dimensions` components of each vector to tightly packed float32 values '''
+    if np is not None:
+        return np.ascontiguousarray(np.asarray(values, dtype='<f4').reshape(len(values), -1)[:, :dimensions]).tobytes()
+    return struct.pack(f'<{len(values) * dimensions}f', *(v for vector in values for v in tuple(vector)[:dimensions]))
+
+def _get_bounds(values: Union['np.ndarray', Sequence[Sequence[float]]], dimensions: int) -> Tuple[List[float], List[float]]:
+    if np is not None:
+        values = np.asarray(values, dtype=np.float32).reshape(len(values), -1)[:, :dimensions]
+        return (values.min(axis=0).tolist(), values.max(axis=0).tolist())
+    columns = list(zip(*(tuple(v)[:dimensions] for v in values)))
+    return ([float(min(c)) for c in columns], [float(max(c)) for c in columns])
+
+
+class _BinaryChunk:
+    ''' Writes the binary chunk to a temporary file as the data is added, so the data does not need to be kept in memory until the end '''
+
+    _file: BinaryIO
+    length: int
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self.length = 0
+
+    def write(self, data: Union[bytes, memoryview]) -> int:
+        ''' Writes the data aligned to a 4-byte boundary and returns the offset it was written to '''
+        padding = -self.length % 4
+        if padding:
+            self._file.write(b'\0' * padding)
+        offset = self.length + padding
+        self._file.write(data)
+        self.length = offset + memoryview(data).nbytes
+        return offset
+
+    def copy_to(self, f: BinaryIO):
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, f)
+        f.write(b'\0' * (-self.length % 4))
+
+    def close(self):
+        self._file.close()
+
+
+class GltfModelState(ModelState):
+    node: int
+    region_nodes: Dict[int, int]
+    bone_nodes: List[int]
+    skins: Dict[Matrix4x4, int] # world transform -> skin
+
+    def __init__(self, model: Model, filter: ModelFilter, display_name: str, node: int):
+        super().__init__(model, filter, display_name)
+        self.node = node
+        self.region_nodes = dict()
+        self.bone_nodes = []
+        self.skins = dict()
+
+
+class GltfInterface(RowMatrixTransforms, ViewportInterface[int, int, Matrix4x4, GltfModelState, int]):
+    '''
+    Writes the scene to a binary glTF 2.0 (.glb) file.
+    Vertex and index data that is already in a glTF compatible layout is copied straight from the source buffers into the binary chunk.
+    Other data (packed vectors, triangle strips, formats that need decompression) is converted to float32 vectors or uint32 triangle lists.
+    The binary chunk is written to a temporary file during the import, so memory use does not grow with the size of the scene.
+    '''
+
+    output_path: str
+    scene: Scene = None
+    options: ImportOptions = None
+    materials: List[int] = None
+    unique_meshes: Dict[MeshKey, int] = None
+    _json: Dict[str, list] = None
+    _bin: _BinaryChunk = None
+    _root_node: int = None
+    _textures: Dict[int, int] = None # texture pool index -> gltf texture index
+    _quantized: bool = False
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+
+    def init_scene(self, scene: Scene, options: ImportOptions) -> None:
+        self.unit_scale = scene.unit_scale / GLTF_UNITS * options.OBJECT_SCALE
+        self.scene = scene
+        self.options = options
+        self.materials = []
+        self.unique_meshes = dict()
+        self._textures = dict()
+        self._quantized = False
+        self._json = { key: [] for key in ('nodes', 'meshes', 'skins', 'materials', 'textures', 'images', 'samplers', 'accessors', 'bufferViews') }
+        self._bin = _BinaryChunk()
+
+    def pre_import(self, root_collection: int):
+        self._root_node = root_collection
+
+    def post_import(self):
+        gltf = {
+            'asset': { 'version': '2.0', 'generator': 'Reclaimer RMF Importer' },
+            'scene': 0,
+            'scenes': [{ 'name': self.scene.name, 'nodes': [self._root_node] }]
+        }
+
+        gltf.update((key, value) for key, value in self._json.items() if value)
+
+        if self._bin.length:
+            gltf['buffers'] = [{ 'byteLength': self._bin.length }]
+
+        if self._quantized:
+            gltf['extensionsUsed'] = gltf['extensionsRequired'] = ['KHR_mesh_quantization']
+
+        json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+        json_chunk += b' ' * (-len(json_chunk) % 4)
+        bin_length = self._bin.length + (-self._bin.length % 4)
+        total_length = 12 + 8 + len(json_chunk) + (8 + bin_length if bin_length else 0)
+
+        with open(self.output_path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, total_length))
+            f.write(struct.pack('<I4s', len(json_chunk), b'JSON'))
+            f.write(json_chunk)
+            if bin_length:
+                f.write(struct.pack('<I4s', bin_length, b'BIN\0'))
+                self._bin.copy_to(f)
+
+        self._bin.close()
+
+    def _add_node(self, name: str, parent: Optional[int], **properties) -> int:
+        index = len(self._json['nodes'])
+        self._json['nodes'].append({ 'name': name, **properties })
+        if parent is not None:
+            self._json['nodes'][parent].setdefault('children', []).append(index)
+        return index
+
+    def _add_view(self, data: Union[bytes, memoryview], stride: int = None, target: int = None) -> int:
+        view = { 'buffer': 0, 'byteOffset': self._bin.write(data), 'byteLength': memoryview(data).nbytes }
+        if stride:
+            view['byteStride'] = stride
+        if target:
+            view['target'] = target
+        self._json['bufferViews'].append(view)
+        return len(self._json['bufferViews']) - 1
+
+    def _add_accessor(self, view: int, component_type: int, dimensions: int, count: int, normalized: bool = False, bounds: Tuple[List[float], List[float]] = None) -> int:
+        accessor = { 'bufferView': view, 'componentType': component_type, 'count': count, 'type': VECTOR_TYPES[dimensions] }
+        if normalized:
+            accessor['normalized'] = True
+        if bounds:
+            accessor['min'], accessor['max'] = bounds
+        self._json['accessors'].append(accessor)
+        return len(self._json['accessors']) - 1
+
+    def init_materials(self) -> None:
+        self._json['samplers'].append({ 'wrapS': 10497, 'wrapT': 10497 }) # repeat
+
+    def _get_texture(self, texture_index: int) -> int:
+        if texture_index not in self._textures:
+            path = self.options.texture_path(self.scene.texture_pool[texture_index])
+            # use a relative uri where possible so the output can be moved along with the textures
+            try:
+                path = os.path.relpath(path, os.path.dirname(os.path.abspath(self.output_path)))
+            except ValueError:
+                pass # different drive
+            self._json['images'].append({ 'uri': quote(path.replace(os.sep, '/')) })
+            self._json['textures'].append({ 'source': len(self._json['images']) - 1, 'sampler': 0 })
+            self._textures[texture_index] = len(self._json['textures']) - 1
+        return self._textures[texture_index]
+
+    def create_material(self, material: Material) -> int:
+        result = { 'name': self.options.material_name(material), 'pbrMetallicRoughness': { 'metallicFactor': 0.0 } }
+
+        alpha_mode = ALPHA_MODES.get(material.alpha_mode)
+        if alpha_mode:
+            result['alphaMode'] = alpha_mode
+
+        for mapping in material.texture_mappings:
+            if mapping.texture_index < 0:
+                continue
+            if mapping.texture_usage == TEXTURE_USAGE.DIFFUSE and 'baseColorTexture' not in result['pbrMetallicRoughness']:
+                result['pbrMetallicRoughness']['baseColorTexture'] = { 'index': self._get_texture(mapping.texture_index) }
+            elif mapping.texture_usage == TEXTURE_USAGE.NORMAL and 'normalTexture' not in result:
+                result['normalTexture'] = { 'index': self._get_texture(mapping.texture_index) }
+            elif mapping.texture_usage == TEXTURE_USAGE.EMISSION and 'emissiveTexture' not in result:
+                result['emissiveTexture'] = { 'index': self._get_texture(mapping.texture_index) }
+                result['emissiveFactor'] = [1.0, 1.0, 1.0]
+
+        self._json['materials'].append(result)
+        return len(self._json['materials']) - 1
+
+    def set_materials(self, materials: List[int]) -> None:
+        self.materials = materials
+
+    def create_collection(self, display_name: str, parent: int) -> int:
+        if parent is None:
+            return self._add_node(display_name, None, matrix=_flatten_matrix(Z_UP_TO_Y_UP))
+        return self._add_node(display_name, parent)
+
+    def init_model(self, model: Model, filter: ModelFilter, collection: int, display_name: str) -> GltfModelState:
+        return GltfModelState(model, filter, display_name, self._add_node(display_name, collection))
+
+    def finish_model(self, model_state: GltfModelState) -> None:
+        pass
+
+    def apply_transform(self, model_state: GltfModelState, world_transform: Matrix4x4) -> None:
+        self._json['nodes'][model_state.node]['matrix'] = _flatten_matrix(world_transform)
+
+    def create_bones(self, model_state: GltfModelState) -> None:
+        model = model_state.model
+        bone_nodes = model_state.bone_nodes = [None] * len(model.bones)
+
+        # bone nodes use the local transforms, so each parent needs to be created before its children
+        for i in model.bone_order:
+            bone = model.bones[i]
+            parent = bone_nodes[bone.parent_index] if bone.parent_index >= 0 else model_state.node
+            bone_nodes[i] = self._add_node(self.options.bone_name(bone), parent, matrix=_flatten_matrix(self.create_transform(bone.transform, True)))
+
+    def create_markers(self, model_state: GltfModelState) -> None:
+        options, model = self.options, model_state.model
+
+        for marker in model.markers:
+            for i, instance in enumerate(marker.instances):
+                if instance.bone_index >= 0 and model_state.bone_nodes:
+                    parent = model_state.bone_nodes[instance.bone_index]
+                else:
+                    parent = model_state.region_nodes.get(instance.region_index, model_state.node)
+
+                translation = [v * self.unit_scale for v in instance.position]
+                rotation = [float(v) for v in instance.rotation] # stored as xyzw (see toQuat() in the autodesk utils), the same order as glTF
+                self._add_node(options.marker_name(marker, i), parent, translation=translation, rotation=rotation)
+
+    def create_region(self, model_state: GltfModelState, region: ModelRegion, display_name: str) -> int:
+        node = self._add_node(display_name, model_state.node)
+        model_state.region_nodes[model_state.model.regions.index(region)] = node
+        return node
+
+    def build_mesh(self, model_state: GltfModelState, permutation: ModelPermutation, region_group: int, world_transform: Matrix4x4, mesh_params: MeshParams) -> None:
+        mesh = self.unique_meshes.get(mesh_params.mesh_key)
+        if mesh is None:
+            mesh = self.unique_meshes[mesh_params.mesh_key] = self._create_mesh(model_state, mesh_params)
+
+        # the node transform of a skinned mesh is ignored, so the world transform is applied through the skin instead
+        skin = self._get_skin(model_state, mesh_params, world_transform)
+        if skin is None:
+            self._add_node(mesh_params.display_name, region_group, mesh=mesh, matrix=_flatten_matrix(world_transform))
+        else:
+            self._add_node(mesh_params.display_name, region_group, mesh=mesh, skin=skin)
+
+    def _create_mesh(self, model_state: GltfModelState, mesh_params: MeshParams) -> int:
+        options, vertex_buffer = self.options, mesh_params.vertex_buffer
+
+        attributes = { 'POSITION': self._write_positions(mesh_params) }
+
+        if options.IMPORT_NORMALS and vertex_buffer.normal_channels:
+            attributes['NORMAL'] = self._write_attribute(mesh_params, 'NORMAL', vertex_buffer.normal_channels[0], 3, 'normal')
+
+        if options.IMPORT_UVW:
+            for i, channel in enumerate(vertex_buffer.texcoord_channels):
+                attributes[f'TEXCOORD_{i}'] = self._write_attribute(mesh_params, 'TEXCOORD', channel, 2, 'texcoord', i)
+
+        if options.IMPORT_COLORS and vertex_buffer.color_channels:
+            dimensions = min(4, max(3, vertex_buffer.color_channels[0]._descriptor._count))
+            attributes['COLOR_0'] = self._write_attribute(mesh_params, 'COLOR', vertex_buffer.color_channels[0], dimensions, 'color')
+
+        if self._is_skinned(mesh_params) and model_state.bone_nodes:
+            attributes['JOINTS_0'], attributes['WEIGHTS_0'] = self._write_skin_attributes(mesh_params)
+
+        primitives = []
+        for material_index, indices in self._write_indices(mesh_params):
+            primitive = { 'attributes': attributes, 'indices': indices }
+            if options.IMPORT_MATERIALS and 0 <= material_index < len(self.materials) and self.materials[material_index] is not None:
+                primitive['material'] = self.materials[material_index]
+            primitives.append(primitive)
+
+        self._json['meshes'].append({ 'name': mesh_params.display_name, 'primitives': primitives })
+        return len(self._json['meshes']) - 1
+
+    def _write_positions(self, mesh_params: MeshParams) -> int:
+        channel = mesh_params.vertex_buffer.position_channels[0]
+        values = mesh_params.get_array('position')
+
+        # float positions without any decompression transform can be copied directly
+        if mesh_params.vertex_transform == Matrix4x4_IDENTITY and _get_component_type(channel._descriptor) == (FLOAT, False) and channel._descriptor._count >= 3:
+            view = self._add_view(channel.get_bytes(), channel._descriptor._total_bytes, ARRAY_BUFFER)
+        else:
+            values = transform_points(values, mesh_params.vertex_transform)
+            view = self._add_view(_to_float_bytes(values, 3), None, ARRAY_BUFFER)
+
+        return self._add_accessor(view, FLOAT, 3, len(channel), bounds=_get_bounds(values, 3))
+
+    def _write_attribute(self, mesh_params: MeshParams, semantic: str, channel: VectorBuffer, dimensions: int, array_name: str, array_index: int = 0) -> int:
+        descriptor = channel._descriptor
+        component_type = _get_component_type(descriptor)
+
+        # the source data can only be used as-is if the vector format is valid for the attribute, the stride is aligned and there is no decompression transform
+        streamable = (
+            component_type is not None
+            and descriptor._count >= dimensions
+            and descriptor._total_bytes % 4 == 0
+            and (semantic != 'TEXCOORD' or mesh_params.texture_transform == Matrix4x4_IDENTITY)
+        )
+
+        if streamable and component_type in CORE_TYPES[semantic]:
+            pass
+        elif streamable and component_type in QUANTIZED_TYPES[semantic]:
+            self._quantized = True
+        else:
+            streamable = False
+
+        if streamable:
+            view = self._add_view(channel.get_bytes(), descriptor._total_bytes, ARRAY_BUFFER)
+            return self._add_accessor(view, component_type[0], dimensions, len(channel), component_type[1])
+
+        values = mesh_params.get_array(array_name, array_index)
+        if semantic == 'TEXCOORD':
+            values = transform_points(values, mesh_params.texture_transform, 2)
+        elif semantic == 'NORMAL':
+            values = transform_directions(values, identity_matrix()) # normals must be unit length
+
+        view = self._add_view(_to_float_bytes(values, dimensions), None, ARRAY_BUFFER)
+        return self._add_accessor(view, FLOAT, dimensions, len(channel))
+
+    def _write_indices(self, mesh_params: MeshParams) -> List[Tuple[int, int]]:
+        ''' Writes the indices of each triangle set, returning a list of (material index, accessor index) '''
+
+        index_buffer, result = mesh_params.index_buffer, []
+
+        if mesh_params.source_segment is None:
+            ranges = [(s.index_start, s.index_length) for s in mesh_params.source_mesh.segments]
+        else:
+            ranges = [(0, len(index_buffer.indices))] # already compacted to the indices of the segment
+
+        for (material_index, triangles), (start, length) in zip(mesh_params.triangle_arrays, ranges):
+            if index_buffer.index_layout == IndexLayout.TRIANGLE_LIST and sys.byteorder == 'little':
+                # triangle lists can be copied directly
+                indices = memoryview(index_buffer.indices[start:start + length])
+                component_type, count = INDEX_TYPES[indices.itemsize], len(indices)
+            else:
+                indices = np.asarray(triangles, dtype='<u4').tobytes() if np is not None else array('I', (i for t in triangles for i in t)).tobytes()
+                component_type, count = UNSIGNED_INT, len(triangles) * 3
+
+            view = self._add_view(indices, None, ELEMENT_ARRAY_BUFFER)
+            result.append((material_index, self._add_accessor(view, component_type, 1, count)))
+
+        return result
+
+    def _is_skinned(self, mesh_params: MeshParams) -> bool:
+        return (
+            self.options.IMPORT_BONES
+            and self.options.IMPORT_SKIN
+            and (len(mesh_params.vertex_buffer.blendindex_channels) > 0 or mesh_params.bone_index >= 0)
+        )
+
+    def _write_skin_attributes(self, mesh_params: MeshParams) -> Tuple[int, int]:
+        ''' Writes the JOINTS_0 and WEIGHTS_0 attributes, using the 4 highest weights of each vertex '''
+
+        count = len(mesh_params.vertex_buffer.position_channels[0])
+
+        if mesh_params.bone_index >= 0:
+            joints = [(mesh_params.bone_index, 0, 0, 0)] * count
+            weights = [(1.0, 0.0, 0.0, 0.0)] * count
+        else:
+            offsets, indices, blend_weights = mesh_params.get_blend_arrays()
+            if np is not None:
+                rows = np.repeat(np.arange(count), np.diff(offsets))
+                order = np.lexsort((-blend_weights, rows)) # sort each vertex by descending weight
+                rows, indices, blend_weights = rows[order], indices[order], blend_weights[order]
+                columns = np.arange(len(rows)) - np.repeat(offsets[:-1], np.diff(offsets))
+                keep = columns < 4
+                joints = np.zeros((count, 4), dtype=np.int64)
+                weights = np.zeros((count, 4), dtype=np.float32)
+                joints[rows[keep], columns[keep]] = indices[keep]
+                weights[rows[keep], columns[keep]] = blend_weights[keep]
+                totals = weights.sum(axis=1, keepdims=True)
+                weights = np.divide(weights, totals, out=weights, where=totals > 0)
+            else:
+                joints, weights = [], []
+                for vi in range(count):
+                    pairs = sorted(zip(blend_weights[offsets[vi]:offsets[vi + 1]], indices[offsets[vi]:offsets[vi + 1]]), reverse=True)[:4]
+                    pairs += [(0.0, 0)] * (4 - len(pairs))
+                    total = sum(w for w, _ in pairs) or 1.0
+                    joints.append(tuple(i for _, i in pairs))
+                    weights.append(tuple(w / total for w, _ in pairs))
+
+        # skin joint indices are the same as the bone indices since the skin joints are in bone order
+        if np is not None:
+            joints = np.asarray(joints, dtype=np.int64)
+            component_type = UNSIGNED_BYTE if joints.max(initial=0) < 256 else UNSIGNED_SHORT
+            joint_bytes = joints.astype('<u1' if component_type == UNSIGNED_BYTE else '<u2').tobytes()
+        else:
+            component_type = UNSIGNED_BYTE if max((i for j in joints for i in j), default=0) < 256 else UNSIGNED_SHORT
+            joint_bytes = array('B' if component_type == UNSIGNED_BYTE else 'H', (i for j in joints for i in j)).tobytes()
+
+        joint_view = self._add_view(joint_bytes, None, ARRAY_BUFFER)
+        weight_view = self._add_view(_to_float_bytes(weights, 4), None, ARRAY_BUFFER)
+        return (self._add_accessor(joint_view, component_type, 4, count), self._add_accessor(weight_view, FLOAT, 4, count))
+
+    def _get_skin(self, model_state: GltfModelState, mesh_params: MeshParams, world_transform: Matrix4x4) -> Optional[int]:
+        '''
+        Gets the skin for the model and world transform, creating it when the first skinned mesh with that transform is built.
+        The world transform is applied before each inverse bind matrix, since glTF ignores the node transform of a skinned mesh.
+        '''
+
+        if not (self._is_skinned(mesh_params) and model_state.bone_nodes):
+            return None
+
+        key = tuple(tuple(row) for row in world_transform)
+        skin = model_state.skins.get(key)
+        if skin is None:
+            inverse_binds = [self.multiply_transform(self.invert_transform(m), world_transform) for m in self.get_bone_transforms(model_state)]
+            view = self._add_view(struct.pack(f'<{len(inverse_binds) * 16}f', *(v for m in inverse_binds for v in _flatten_matrix(m))))
+            self._json['skins'].append({ 'joints': model_state.bone_nodes, 'inverseBindMatrices': self._add_accessor(view, FLOAT, 16, len(inverse_binds)), 'skeleton': model_state.node })
+            skin = model_state.skins[key] = len(self._json['skins']) - 1
+
+        return skin
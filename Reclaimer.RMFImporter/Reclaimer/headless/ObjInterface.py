@@ -0,0 +1,166 @@
+import os
+from typing import List, Tuple, TextIO
+
+from .Utils import *
+
+from ..src.ImportOptions import *
+from ..src.SceneFilter import *
+from ..src.Scene import *
+from ..src.Model import *
+from ..src.Material import *
+from ..src.Types import *
+from ..src.ViewportInterface import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # vertex and face lines will be formatted one at a time
+
+__all__ = [
+    'ObjInterface'
+]
+
+
+OBJ_UNITS: float = 1000.0 # 1 obj unit = 1 metre (1000mm)
+
+
+class ObjModelState(ModelState):
+    pending_meshes: List[Tuple[str, Matrix4x4, MeshParams]] # (group name, permutation transform, mesh params)
+
+    def __init__(self, model: Model, filter: ModelFilter, display_name: str):
+        super().__init__(model, filter, display_name)
+        self.pending_meshes = []
+
+
+class ObjInterface(RowMatrixTransforms, ViewportInterface[str, str, Matrix4x4, ObjModelState, str]):
+    '''
+    Writes the scene to a Wavefront OBJ file (and an MTL file for the materials).
+    OBJ files have no hierarchy or instancing, so every mesh is written with its final world transform applied to the vertices.
+    Bones, markers, skin weights and vertex colors are not supported by the format and are ignored.
+    '''
+
+    output_path: str
+    scene: Scene = None
+    options: ImportOptions = None
+    materials: List[str] = None
+    _file: TextIO = None
+    _material_lines: List[str] = None
+    _vertex_count: int = 0
+    _texcoord_count: int = 0
+    _normal_count: int = 0
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+
+    @property
+    def material_path(self) -> str:
+        return os.path.splitext(self.output_path)[0] + '.mtl'
+
+    def init_scene(self, scene: Scene, options: ImportOptions) -> None:
+        self.unit_scale = scene.unit_scale / OBJ_UNITS * options.OBJECT_SCALE
+        self.scene = scene
+        self.options = options
+        self.materials = []
+        self._material_lines = []
+        self._vertex_count = self._texcoord_count = self._normal_count = 0
+
+    def pre_import(self, root_collection: str):
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+        self._file.write(f'# {self.scene.name}\n')
+        if self.options.IMPORT_MATERIALS:
+            self._file.write(f'mtllib {os.path.basename(self.material_path)}\n')
+
+    def post_import(self):
+        self._file.close()
+        self._file = None
+
+        if self.options.IMPORT_MATERIALS:
+            with open(self.material_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self._material_lines))
+                f.write('\n')
+
+    def create_material(self, material: Material) -> str:
+        name = self.options.material_name(material)
+        self._material_lines.extend((f'newmtl {name}', 'Kd 1.000000 1.000000 1.000000'))
+
+        diffuse = next((m for m in material.texture_mappings if m.texture_usage == TEXTURE_USAGE.DIFFUSE and m.texture_index >= 0), None)
+        if diffuse:
+            self._material_lines.append(f'map_Kd {self.options.texture_path(self.scene.texture_pool[diffuse.texture_index])}')
+
+        self._material_lines.append('')
+        return name
+
+    def set_materials(self, materials: List[str]) -> None:
+        self.materials = materials
+
+    def create_collection(self, display_name: str, parent: str) -> str:
+        return display_name
+
+    def init_model(self, model: Model, filter: ModelFilter, collection: str, display_name: str) -> ObjModelState:
+        return ObjModelState(model, filter, display_name)
+
+    def finish_model(self, model_state: ObjModelState) -> None:
+        pass
+
+    def apply_transform(self, model_state: ObjModelState, world_transform: Matrix4x4) -> None:
+        # the meshes can only be written once the model transform is known
+        for group_name, transform, mesh_params in model_state.pending_meshes:
+            self._write_mesh(group_name, self.multiply_transform(world_transform, transform), mesh_params)
+        model_state.pending_meshes.clear()
+
+    def create_region(self, model_state: ObjModelState, region: ModelRegion, display_name: str) -> str:
+        return display_name
+
+    def build_mesh(self, model_state: ObjModelState, permutation: ModelPermutation, region_group: str, world_transform: Matrix4x4, mesh_params: MeshParams) -> None:
+        model_state.pending_meshes.append((f'{model_state.display_name}::{mesh_params.display_name}', world_transform, mesh_params))
+
+    def _write_mesh(self, group_name: str, world_transform: Matrix4x4, mesh_params: MeshParams):
+        options, vertex_buffer, f = self.options, mesh_params.vertex_buffer, self._file
+
+        transform = multiply_matrix(mesh_params.vertex_transform, world_transform)
+        positions = transform_points(mesh_params.get_array('position'), transform)
+        _write_lines(f, 'v %.6f %.6f %.6f', positions)
+
+        texcoord_offset = normal_offset = None
+
+        if options.IMPORT_UVW and vertex_buffer.texcoord_channels:
+            texcoords = transform_points(mesh_params.get_array('texcoord'), mesh_params.texture_transform, 2)
+            texcoords = [(t[0], 1 - t[1]) for t in texcoords] if np is None else np.column_stack((texcoords[:, 0], 1 - texcoords[:, 1]))
+            _write_lines(f, 'vt %.6f %.6f', texcoords)
+            texcoord_offset = self._texcoord_count + 1
+            self._texcoord_count += len(texcoords)
+
+        if options.IMPORT_NORMALS and vertex_buffer.normal_channels:
+            normals = transform_directions(mesh_params.get_array('normal'), world_transform)
+            _write_lines(f, 'vn %.6f %.6f %.6f', normals)
+            normal_offset = self._normal_count + 1
+            self._normal_count += len(normals)
+
+        # obj indices are 1-based and count from the start of the file, so each index needs to be offset by the count of previously written values
+        offsets = [self._vertex_count + 1] + [o for o in (texcoord_offset, normal_offset) if o is not None]
+        if normal_offset is None:
+            corner = '%d/%d' if texcoord_offset is not None else '%d'
+        else:
+            corner = '%d/%d/%d' if texcoord_offset is not None else '%d//%d'
+        face_format = 'f ' + ' '.join([corner] * 3)
+
+        f.write(f'g {group_name}\n')
+        for mi, triangles in mesh_params.triangle_arrays:
+            if options.IMPORT_MATERIALS and 0 <= mi < len(self.materials) and self.materials[mi]:
+                f.write(f'usemtl {self.materials[mi]}\n')
+            if np is not None:
+                triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+                corners = np.concatenate([triangles[:, [i]] + o for i in range(3) for o in offsets], axis=1)
+            else:
+                corners = [tuple(t[i] + o for i in range(3) for o in offsets) for t in triangles]
+            _write_lines(f, face_format, corners)
+
+        self._vertex_count += len(positions)
+
+
+def _write_lines(f: TextIO, line_format: str, rows):
+    if np is not None and isinstance(rows, np.ndarray):
+        if len(rows):
+            np.savetxt(f, rows, fmt=line_format)
+    else:
+        f.writelines(line_format % tuple(r) + '\n' for r in rows)
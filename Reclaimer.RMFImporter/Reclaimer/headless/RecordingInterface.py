@@ -0,0 +1,204 @@
+import io
+import contextlib
+from time import perf_counter
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Callable
+
+from .Utils import *
+
+from ..src.ImportOptions import *
+from ..src.SceneFilter import *
+from ..src.Scene import *
+from ..src.Model import *
+from ..src.Material import *
+from ..src.Types import *
+from ..src.ViewportInterface import *
+from ..src.SceneBuilder import SceneBuilder
+
+__all__ = [
+    'NullInterface',
+    'CallRecord',
+    'CallStats',
+    'RecordingInterface',
+    'profile_import'
+]
+
+
+# the phase of the import that each interface method belongs to
+PHASES: Dict[str, str] = {
+    'init_scene': 'scene',
+    'pre_import': 'scene',
+    'post_import': 'scene',
+    'create_collection': 'scene',
+    'init_materials': 'materials',
+    'create_material': 'materials',
+    'set_materials': 'materials',
+    'init_model': 'models',
+    'finish_model': 'models',
+    'create_bones': 'bones',
+    'create_markers': 'markers',
+    'create_region': 'meshes',
+    'build_mesh': 'meshes',
+    'identity_transform': 'transforms',
+    'invert_transform': 'transforms',
+    'multiply_transform': 'transforms',
+    'create_transform': 'transforms',
+    'get_bone_transforms': 'transforms',
+    'apply_transform': 'transforms'
+}
+
+
+class NullInterface(RowMatrixTransforms, ViewportInterface[None, str, Matrix4x4, ModelState, str]):
+    '''
+    A viewport interface that creates nothing, so running a `SceneBuilder` only does the work that is shared by every interface
+    (filter walks, `MeshParams` construction, triangle unpacking, name formatting etc).
+    The transform methods still return valid matrices so bone and marker calculations behave the same as a real import.
+    '''
+
+    def init_scene(self, scene: Scene, options: ImportOptions) -> None:
+        self.unit_scale = options.OBJECT_SCALE
+
+    def create_collection(self, display_name: str, parent: str) -> str:
+        return display_name
+
+    def init_model(self, model: Model, filter: ModelFilter, collection: str, display_name: str) -> ModelState:
+        return ModelState(model, filter, display_name)
+
+    def apply_transform(self, model_state: ModelState, world_transform: Matrix4x4) -> None:
+        pass
+
+    def create_region(self, model_state: ModelState, region: ModelRegion, display_name: str) -> str:
+        return display_name
+
+
+@dataclass
+class CallRecord:
+    name: str
+    seconds: float
+    size: int # see _get_size()
+
+
+@dataclass
+class CallStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    size: int = 0
+
+    def add(self, seconds: float, size: int):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.size += size
+
+
+def _get_size(value) -> int:
+    ''' Gets an approximate size of an argument: the vertex count of a mesh, the bone and marker count of a model, the length of a list, otherwise zero '''
+    if isinstance(value, MeshParams):
+        return len(value.vertex_buffer.position_channels[0]) if value.vertex_buffer.position_channels else 0
+    if isinstance(value, ModelState):
+        return len(value.model.bones) + len(value.model.markers)
+    if isinstance(value, (list, dict)):
+        return len(value)
+    return 0
+
+
+class RecordingInterface(ViewportInterface):
+    '''
+    Wraps another viewport interface and records the wall time and argument sizes of every call made to it.
+    Any time that is not spent inside the wrapped interface is time spent in the code that is shared by every interface.
+    '''
+
+    interface: ViewportInterface
+    calls: List[CallRecord]
+    stats: Dict[str, CallStats]
+    total_seconds: float = 0.0
+
+    def __init__(self, interface: Optional[ViewportInterface] = None):
+        self.interface = interface if interface is not None else NullInterface()
+        self.calls = []
+        self.stats = { name: CallStats() for name in PHASES }
+
+        # replace each interface method with a recording version of the same method on the wrapped interface
+        for name in PHASES:
+            setattr(self, name, self._wrap(name, getattr(self.interface, name)))
+
+    def _wrap(self, name: str, func: Callable) -> Callable:
+        stats = self.stats[name]
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                size = sum(_get_size(a) for a in args)
+                self.calls.append(CallRecord(name, seconds, size))
+                stats.add(seconds, size)
+
+        return wrapper
+
+    @property
+    def interface_seconds(self) -> float:
+        return sum(s.seconds for s in self.stats.values())
+
+    def get_phases(self) -> Dict[str, CallStats]:
+        ''' Gets the combined stats of the calls in each phase '''
+        result = dict()
+        for name, stats in self.stats.items():
+            phase = result.setdefault(PHASES[name], CallStats())
+            phase.count += stats.count
+            phase.seconds += stats.seconds
+            phase.max_seconds = max(phase.max_seconds, stats.max_seconds)
+            phase.size += stats.size
+        return result
+
+    def report(self) -> List[str]:
+        ''' Gets the lines of a table showing the time spent in each phase and each interface method '''
+
+        total = self.total_seconds or self.interface_seconds
+        percent = lambda seconds: 100 * seconds / total if total > 0 else 0
+
+        lines = [f'{"phase/method":<28}{"calls":>8}{"size":>12}{"total":>12}{"max":>12}{"share":>8}']
+
+        for phase, phase_stats in sorted(self.get_phases().items(), key=lambda p: -p[1].seconds):
+            if phase_stats.count == 0:
+                continue
+            lines.append(f'{phase:<28}{phase_stats.count:>8}{phase_stats.size:>12}{phase_stats.seconds * 1000:>10.2f}ms{phase_stats.max_seconds * 1000:>10.2f}ms{percent(phase_stats.seconds):>7.1f}%')
+            for name, stats in sorted(self.stats.items(), key=lambda s: -s[1].seconds):
+                if PHASES[name] == phase and stats.count > 0:
+                    lines.append(f'  {name:<26}{stats.count:>8}{stats.size:>12}{stats.seconds * 1000:>10.2f}ms{stats.max_seconds * 1000:>10.2f}ms{percent(stats.seconds):>7.1f}%')
+
+        if self.total_seconds:
+            shared = self.total_seconds - self.interface_seconds
+            lines.append(f'{"shared (SceneBuilder)":<28}{"":>8}{"":>12}{shared * 1000:>10.2f}ms{"":>12}{percent(shared):>7.1f}%')
+            lines.append(f'{"total":<28}{"":>8}{"":>12}{self.total_seconds * 1000:>10.2f}ms')
+
+        return lines
+
+    def print_report(self):
+        print('\n'.join(self.report()))
+
+
+def profile_import(scene: Scene, filter: Optional[SceneFilter] = None, options: Optional[ImportOptions] = None, interface: Optional[ViewportInterface] = None, quiet: bool = True) -> RecordingInterface:
+    '''
+    Runs a complete import of the scene through a `RecordingInterface` and returns it once every task has finished.
+    The wrapped interface defaults to a `NullInterface`. When `quiet` is set, the progress messages are discarded rather than printed.
+    '''
+
+    recorder = RecordingInterface(interface)
+    builder = SceneBuilder(recorder, scene, filter, options)
+
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    start = perf_counter()
+
+    with output:
+        task_queue = builder.begin_create_scene()
+        while not task_queue.finished():
+            task_queue.execute_next()
+        if task_queue.error:
+            raise task_queue.error
+        builder.end_create_scene()
+
+    recorder.total_seconds = perf_counter() - start
+    return recorder
@@ -0,0 +1,114 @@
+from typing import List, Sequence, Union
+
+from ..src.Types import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # transforms will be applied one vector at a time
+
+__all__ = [
+    'RowMatrixTransforms',
+    'identity_matrix',
+    'multiply_matrix',
+    'invert_matrix',
+    'scale_matrix',
+    'rigid_matrix',
+    'transform_points',
+    'transform_directions'
+]
+
+# matrices are row-major 4x4 tuples that transform row vectors (the same layout as the RMF data)
+# so a point is transformed by [x, y, z, 1] * M and the translation is in the last row
+
+
+def identity_matrix() -> Matrix4x4:
+    return Matrix4x4_IDENTITY
+
+def multiply_matrix(a: Matrix4x4, b: Matrix4x4) -> Matrix4x4:
+    ''' Returns a * b, which applies `a` first and then `b` '''
+    return tuple(tuple(sum(a[r][k] * b[k][c] for k in range(4)) for c in range(4)) for r in range(4))
+
+def invert_matrix(m: Matrix4x4) -> Matrix4x4:
+    ''' Inverts a 4x4 matrix using Gauss-Jordan elimination '''
+    rows = [list(m[r]) + [1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+    for c in range(4):
+        pivot = max(range(c, 4), key=lambda r: abs(rows[r][c]))
+        if abs(rows[pivot][c]) < 1e-12:
+            raise ValueError('Matrix is not invertible')
+        rows[c], rows[pivot] = rows[pivot], rows[c]
+        scale = rows[c][c]
+        rows[c] = [v / scale for v in rows[c]]
+        for r in range(4):
+            if r != c and rows[r][c]:
+                factor = rows[r][c]
+                rows[r] = [v - factor * p for v, p in zip(rows[r], rows[c])]
+    return tuple(tuple(row[4:]) for row in rows)
+
+def scale_matrix(scale: float) -> Matrix4x4:
+    return ((scale, 0., 0., 0.), (0., scale, 0., 0.), (0., 0., scale, 0.), (0., 0., 0., 1.))
+
+def rigid_matrix(m: Matrix4x4, translation_scale: float = 1.0) -> Matrix4x4:
+    ''' Removes the scale from a transform, keeping the rotation and scaling the translation by `translation_scale` '''
+    def normalize(row):
+        length = sum(v * v for v in row[:3]) ** 0.5 or 1.0
+        return (row[0] / length, row[1] / length, row[2] / length, 0.)
+    t = m[3]
+    return (normalize(m[0]), normalize(m[1]), normalize(m[2]), (t[0] * translation_scale, t[1] * translation_scale, t[2] * translation_scale, 1.))
+
+
+class RowMatrixTransforms:
+    ''' Implements the transform methods of `ViewportInterface` using the row-major matrices from this module '''
+
+    unit_scale: float = 1.0
+
+    def identity_transform(self) -> Matrix4x4:
+        return identity_matrix()
+
+    def invert_transform(self, transform: Matrix4x4) -> Matrix4x4:
+        return invert_matrix(transform)
+
+    def multiply_transform(self, a: Matrix4x4, b: Matrix4x4) -> Matrix4x4:
+        # the result applies b first and then a, the same as the other interfaces
+        return multiply_matrix(b, a)
+
+    def create_transform(self, transform: Matrix4x4, bone_mode: bool = False) -> Matrix4x4:
+        if not bone_mode:
+            return multiply_matrix(transform, scale_matrix(self.unit_scale))
+
+        # for bones we want to keep the scale component at 1x, but still need to convert the translation component
+        return rigid_matrix(transform, self.unit_scale)
+
+
+def transform_points(values: Union['np.ndarray', Sequence[Sequence[float]]], m: Matrix4x4, dimensions: int = 3) -> Union['np.ndarray', List[Float3]]:
+    '''
+    Transforms each vector as a 3D point, using only the first `dimensions` components of each vector.
+    Any missing components are treated as zero.
+    '''
+    if np is not None:
+        values = np.asarray(values, dtype=np.float32).reshape(len(values), -1)
+        points = np.zeros((len(values), 4), dtype=np.float32)
+        count = min(dimensions, values.shape[1])
+        points[:, :count] = values[:, :count]
+        points[:, 3] = 1
+        return (points @ np.asarray(m, dtype=np.float32))[:, :3]
+
+    result = []
+    for v in values:
+        x, y, z = (tuple(v[:dimensions]) + (0., 0., 0.))[:3]
+        result.append(tuple(x * m[0][c] + y * m[1][c] + z * m[2][c] + m[3][c] for c in range(3)))
+    return result
+
+def transform_directions(values: Union['np.ndarray', Sequence[Sequence[float]]], m: Matrix4x4) -> Union['np.ndarray', List[Float3]]:
+    ''' Transforms each vector as a 3D direction (ignoring translation) and normalizes the result '''
+    m = (m[0], m[1], m[2], (0., 0., 0., 1.))
+    if np is not None:
+        result = transform_points(values, m)
+        lengths = np.linalg.norm(result, axis=1, keepdims=True)
+        return np.divide(result, lengths, out=np.zeros_like(result), where=lengths > 0)
+
+    result = []
+    for v in transform_points(values, m):
+        length = sum(c * c for c in v) ** 0.5
+        result.append(tuple(c / length for c in v) if length > 0 else (0., 0., 0.))
+    return result
@@ -0,0 +1,8 @@
+'''
+Viewport interfaces that write files instead of creating objects in a DCC application.
+These only depend on the python standard library (and optionally NumPy), so they can be used outside of Blender and 3ds Max.
+'''
+
+from .ObjInterface import ObjInterface
+from .GltfInterface import GltfInterface
+from .RecordingInterface import NullInterface, RecordingInterface, profile_import
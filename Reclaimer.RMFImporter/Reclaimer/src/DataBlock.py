@@ -37,6 +37,19 @@ class DataBlock:
 
         reader.position = self.end_address
 
+    @classmethod
+    def create(cls, code: str, start_address: int, end_address: int, count: int) -> 'DataBlock':
+        ''' Creates a block from previously read header values without reading from a file. Child blocks of a list block must be added afterwards. '''
+        block = cls.__new__(cls)
+        block.code = code
+        block.is_list = code.endswith('[]')
+        block.start_address = start_address
+        block.end_address = end_address
+        block.count = count
+        if block.is_list:
+            block.child_blocks = []
+        return block
+
     def __str__(self) -> str:
         name = f'{self.code[:-1]}{self.count}]' if self.is_list else self.code
         return f'<<{name}>> @{self.start_address:08X}+{self.size:08X}'
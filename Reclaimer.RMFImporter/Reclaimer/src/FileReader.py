@@ -1,5 +1,7 @@
+import mmap
 import struct
 from io import BufferedReader, SEEK_SET
+from typing import Union
 from enum import IntEnum #, StrEnum
 
 from .Types import *
@@ -21,10 +23,27 @@ class SeekOrigin(IntEnum):
 #    BIG_ENDIAN = '>'
 
 class FileReader:
-    _stream: BufferedReader
-
-    def __init__(self, fileName: str):
-        self._stream = open(fileName, 'rb') # 'rb' = read+binary mode
+    file_name: str
+    _stream: Union[BufferedReader, mmap.mmap]
+    _file: BufferedReader
+    _view: memoryview
+
+    def __init__(self, fileName: str, memory_map: bool = False):
+        '''
+        When `memory_map` is enabled the file is mapped into memory rather than read through a buffered stream.
+        In that mode `read_bytes` returns `memoryview` slices of the mapping instead of copying the data.
+        '''
+        self.file_name = fileName
+        self._file = open(fileName, 'rb') # 'rb' = read+binary mode
+        self._view = None
+
+        if not memory_map:
+            self._stream = self._file
+            return
+
+        # the mmap object supports the same read/seek/tell calls as the file stream, so it can be used as a drop-in replacement
+        self._stream = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._stream)
 
     def _read(self, byteOrder: str, format: str, length: int):
         return struct.unpack(f'{byteOrder}{format}', self._stream.read(length))[0]
@@ -33,9 +52,24 @@ class FileReader:
         self._stream.seek(offset, origin)
 
     def close(self):
-        self._stream.close()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._stream.close()
+            except BufferError:
+                # slices returned by read_bytes() are still in use (ie vertex/index buffers of the scene)
+                # the mapping will be released by the garbage collector once the last slice is gone
+                pass
+
+        self._file.close()
+        self._file = None
         self._stream = None
 
+    @property
+    def is_memory_mapped(self) -> bool:
+        return self._view is not None
+
     @property
     def position(self) -> int:
         return self._stream.tell()
@@ -44,8 +78,15 @@ class FileReader:
     def position(self, value: int):
         self._stream.seek(value, 0)
 
-    def read_bytes(self, length: int) -> bytes:
-        return self._stream.read(length)
+    def read_bytes(self, length: int) -> Union[bytes, memoryview]:
+        if self._view is None:
+            return self._stream.read(length)
+
+        # zero-copy: return a view into the mapping and advance the position manually
+        start = self._stream.tell()
+        end = min(start + length, len(self._view))
+        self._stream.seek(end, SEEK_SET)
+        return self._view[start:end]
 
     def read_byte(self, byteOrder: str = '<') -> int:
         return self._read(byteOrder, 'B', 1)
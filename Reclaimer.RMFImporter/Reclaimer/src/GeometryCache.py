@@ -0,0 +1,136 @@
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+from .VertexBuffer import VertexBuffer, VectorBuffer
+from .IndexBuffer import IndexBuffer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # arrays will not be cached as ndarrays, sizes are estimated from the fallback types
+
+__all__ = [
+    'GeometryCache'
+]
+
+T = TypeVar('T')
+
+
+def _get_size(value: object) -> int:
+    ''' Estimates the number of bytes used by a cached value '''
+
+    if value is None:
+        return 0
+    if np is not None and isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, VectorBuffer):
+        return len(value) * value._descriptor._total_bytes
+    if isinstance(value, VertexBuffer):
+        channels = (value.position_channels, value.texcoord_channels, value.normal_channels, value.blendindex_channels, value.blendweight_channels, value.color_channels)
+        return sum(_get_size(c) for channel_list in channels for c in channel_list)
+    if isinstance(value, IndexBuffer):
+        return len(value.indices) * value.indices.itemsize
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_get_size(v) for v in value)
+    if isinstance(value, list):
+        # assume the elements are all the same type, since cached lists are large lists of triangles/vectors
+        return sys.getsizeof(value) + (len(value) * _get_size(value[0]) if value else 0)
+    return sys.getsizeof(value)
+
+
+class GeometryCache:
+    '''
+    A cache of prepared mesh geometry (triangle arrays, remapped buffers and decoded vertex channels) shared by all `MeshParams` of an import.
+    Once the total size of the cached values exceeds `max_bytes`, the least recently used values are evicted.
+    The cache is safe to use from multiple threads. If a value is requested while another thread is already creating it, the caller waits for that value
+    rather than calling its own factory, so each value is only created once.
+    '''
+
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    _entries: 'OrderedDict[Hashable, Tuple[object, int]]'
+    _pending: Dict[Hashable, Future] # values currently being created by a factory
+    _size: int
+    _lock: threading.RLock
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._pending = dict()
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return f'{len(self._entries)} entries, {self._size / 1048576:.1f}MB, {self.hits} hits, {self.misses} misses, {self.evictions} evictions'
+
+    @property
+    def size(self) -> int:
+        ''' The estimated number of bytes used by all cached values '''
+        return self._size
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        ''' Gets the cached value for `key`, or calls `factory` to create and cache the value if it is not cached '''
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            pending = self._pending.get(key)
+            creating = pending is None
+            if creating:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+            else:
+                self.hits += 1
+
+        if not creating:
+            return pending.result() # another thread is already creating the value
+
+        try:
+            value = factory()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            pending.set_exception(e)
+            raise
+
+        size = _get_size(value)
+        with self._lock:
+            del self._pending[key]
+            # values that could never fit are returned without being cached
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._size += size
+                self._evict()
+
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
@@ -1,11 +1,12 @@
 import os, re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, List, Dict, Iterable
 
 from .Types import *
 from .Material import *
 from .Scene import *
 from .Model import *
+from .TextureResolver import TextureResolver
 
 __all__ = [
     'ImportOptions'
@@ -22,6 +23,8 @@ class ImportOptions:
 
     _scene: Scene = None
     _implied_bitmap_root: str = None
+    _texture_resolver: TextureResolver = None
+    _texture_paths: Dict[str, str] = None # texture name -> resolved path
 
     IMPORT_BONES: bool = True
     IMPORT_MARKERS: bool = True
@@ -36,6 +39,19 @@ class ImportOptions:
 
     IMPORT_CUSTOM_PROPS: bool = True
 
+    GEOMETRY_CACHE_SIZE: int = 512 * 1024 * 1024 # in bytes
+    DEDUPLICATE_GEOMETRY: bool = False # link meshes with identical content instead of building them again, even across different models
+
+    PREPARE_THREADS: int = 0 # worker threads that decode mesh geometry ahead of the main thread, or 0 to decode each mesh on the main thread when it is built
+    PREPARE_LOOKAHEAD: int = 8 # maximum number of meshes being prepared or waiting to be built at once when PREPARE_THREADS is enabled
+
+    TASK_BATCH_TIME: Optional[float] = 0.0167 # target duration in seconds of each batch of tasks run between UI updates, or None to run the whole import in one batch for maximum throughput
+
+    PROFILE_TASKS: bool = False # record the duration of every import task and print a summary when the import finishes
+    PROFILE_CATEGORIES: Tuple[str, ...] = () # task categories to capture with cProfile when PROFILE_TASKS is enabled, or ('*', ) for all
+    PROFILE_MEMORY: bool = False # also record the memory allocated by each task with tracemalloc (slow, peak memory is only the net change before python 3.9)
+    PROFILE_OUTPUT: str = '' # if set, the task records are written to this path as JSON, along with a .pstats file for each cProfile category
+
     OBJECT_SCALE: float = 1.0
     BONE_SCALE: float = 1.0
     MARKER_SCALE: float = 1.0
@@ -53,6 +69,8 @@ class ImportOptions:
 
     def __init__(self, scene: Optional[Scene]=None):
         self._scene = scene
+        self._texture_resolver = TextureResolver()
+        self._texture_paths = dict()
 
         if scene:
             # Path().parent only works if the separators match the OS so we need to normalize the original_path value
@@ -86,45 +104,55 @@ class ImportOptions:
     def material_name(self, material: Material):
         return f'{material.name}'
 
-    def texture_path(self, texture: Texture):
+    def texture_path(self, texture: Texture) -> str:
+        ''' Gets the path of the bitmap file for a texture. Each texture is only looked up once per import, see `resolve_textures()`. '''
+        path = self._texture_paths.get(texture.name)
+        if path is None:
+            path = self._texture_paths[texture.name] = self._find_texture(texture) or self._fallback_texture_path(texture)
+        return path
+
+    def resolve_textures(self, textures: Iterable[Texture]):
+        ''' Looks up the bitmap files of all the given textures in one pass, so the results are ready before the materials are created '''
+        textures = list({ t.name: t for t in textures if t.name not in self._texture_paths }.values())
+        found = 0
+        for texture in textures:
+            path = self._find_texture(texture)
+            found += path is not None
+            self._texture_paths[texture.name] = path or self._fallback_texture_path(texture)
+        print(f'located {found}/{len(textures)} bitmap files ({self._texture_resolver.scans} directories scanned)')
+
+    def _texture_search_paths(self) -> Tuple[List[str], List[str]]:
+        ''' Gets the directories and extensions to search for bitmap files, in order of preference '''
         default_ext = (self.BITMAP_EXT or '').strip().lstrip('.').lower()
         default_dir = (self.BITMAP_ROOT or '').strip()
-        name_only = Path(texture.name).name
-
-        # if the folder and extension were specified, test the exact path first
-        default_path = None
-        if default_ext and default_dir:
-            default_path = Path(default_dir).joinpath(texture.name).with_suffix(f'.{default_ext}')
-            if default_path.exists():
-                return str(default_path)
-            else:
-                print(f'WARNING: bitmap file \'{name_only}\' did not exist at {default_path}')
-        else:
-            print(f'attempting to locate bitmap file \'{name_only}\'...')
-
-        def get_test_paths():
+
+        #attempt to make unique lists while still preserving order (set doesnt preserve order)
+        dir_list = [default_dir, self._last_texture_directory]
+        if self._scene:
             scene = self._scene
-            if not scene:
-                return
-
-            #attempt to make unique lists while still preserving order (set doesnt preserve order)
-            dir_list = dict.fromkeys((default_dir, self._last_texture_directory, self._implied_bitmap_root, scene._source_dir, str(Path(scene._source_dir).joinpath(scene._source_name)))).keys()
-            ext_list = dict.fromkeys((default_ext, self._last_texture_extension, 'tif', 'png')).keys()
-
-            for dir in dir_list:
-                for ext in ext_list:
-                    if ext and dir:
-                        self._last_texture_directory = dir
-                        self._last_texture_extension = ext
-                        yield Path(dir).joinpath(texture.name).with_suffix(f'.{ext}')
-
-        for p in get_test_paths():
-            if p == default_path:
-                continue
-            print(f'...try: {p}')
-            if p.exists():
-                print('found bitmap file!')
-                return str(p)
-
-        print(f'WARNING: could not find bitmap file: \'{name_only}\'')
-        return str(next(get_test_paths())) # fall back to the first path checked
\ No newline at end of file
+            dir_list.extend((self._implied_bitmap_root, scene._source_dir, str(Path(scene._source_dir).joinpath(scene._source_name))))
+        dir_list = [d for d in dict.fromkeys(dir_list) if d]
+        ext_list = [e for e in dict.fromkeys((default_ext, self._last_texture_extension, 'tif', 'png')) if e]
+        return (dir_list, ext_list)
+
+    def _find_texture(self, texture: Texture) -> Optional[str]:
+        ''' Gets the path of the bitmap file for a texture from the cached directory listings, or None if it could not be found '''
+        dir_list, ext_list = self._texture_search_paths()
+
+        for dir in dir_list:
+            path = self._texture_resolver.find(dir, texture.name, ext_list)
+            if path:
+                self._last_texture_directory = dir
+                self._last_texture_extension = os.path.splitext(path)[1].lstrip('.').lower()
+                return path
+
+        return None
+
+    def _fallback_texture_path(self, texture: Texture) -> str:
+        ''' Gets the first path that was checked for a texture whose bitmap file could not be found '''
+        print(f'WARNING: could not find bitmap file: \'{Path(texture.name).name}\'')
+
+        dir_list, ext_list = self._texture_search_paths()
+        if dir_list and ext_list:
+            return str(Path(dir_list[0]).joinpath(texture.name).with_suffix(f'.{ext_list[0]}'))
+        return texture.name
@@ -1,11 +1,18 @@
+import sys
 import struct
-import itertools
+from array import array
 from enum import IntEnum
-from typing import List, Tuple, Iterable, Iterator, overload
+from typing import List, Dict, Tuple, Iterable, Iterator, Union, overload
+from collections.abc import Sequence
 
 from .Types import Triangle
 from .Model import Mesh, MeshSegment
 
+try:
+    import numpy as np
+except ImportError:
+    np = None # vectorized unpacking is unavailable, fall back to unpacking one index at a time
+
 __all__ = [
     'IndexLayout',
     'IndexBuffer'
@@ -24,12 +31,33 @@ class IndexLayout(IntEnum):
 
 _index_widths = (None, 'B', 'H', None, 'I')
 
+
+def _unpack_triangle_strip(indices: 'np.ndarray') -> 'np.ndarray':
+    ''' Vectorized equivalent of `IndexBuffer._unpack_triangle_list()` that returns an array of shape (triangles, 3) '''
+    if len(indices) < 3:
+        return np.empty((0, 3), dtype=np.int32)
+
+    i0, i1, i2 = indices[:-2], indices[1:-1], indices[2:]
+
+    # every second triangle in a strip has reversed winding order
+    odd = (np.arange(2, len(indices)) % 2) == 1
+    result = np.stack((i0, np.where(odd, i2, i1), np.where(odd, i1, i2)), axis=1)
+
+    # degenerate triangles are used to join separate strips together
+    valid = (i0 != i1) & (i0 != i2) & (i1 != i2)
+    return result[valid].astype(np.int32, copy=False)
+
 class IndexBuffer:
     index_layout: IndexLayout
-    indices: List[int]
+    indices: Sequence # a flat sequence of ints, stored at the native width of the source data
+    _typecode: str
+    _index_ranges: Dict[Tuple[int, int], Tuple[int, int]] # cache of (offset, count) -> (min index, max index)
+    _triangle_counts: Dict[Tuple[int, int], int] # cache of (offset, count) -> number of triangles
 
-    def __init__(self, index_layout: IndexLayout, width: int, data: bytes):
+    def __init__(self, index_layout: IndexLayout, width: int, data: Union[bytes, memoryview]):
         self.index_layout = index_layout
+        self._index_ranges = dict()
+        self._triangle_counts = dict()
 
         if width is None and data is None:
             return
@@ -37,29 +65,85 @@ class IndexBuffer:
         if width <= 0 or width > 4 or width == 3:
             raise Exception('Unsupported binary width')
 
-        self.indices = list(t[0] for t in struct.iter_unpack(_index_widths[width], data))
+        self._typecode = _index_widths[width]
+
+        if sys.byteorder == 'little':
+            # reinterpret the existing data rather than copying it (the data may be a view of a memory mapped file)
+            self.indices = memoryview(data).cast(self._typecode)
+        else:
+            self.indices = array(self._typecode, (t[0] for t in struct.iter_unpack(f'<{self._typecode}', data)))
 
     def __repr__(self) -> str:
-        return f'<{self.__class__.name}|{IndexLayout(self.index_layout).name}|{self.indices.count}>'
+        return f'<{self.__class__.__name__}|{IndexLayout(self.index_layout).name}|{len(self.indices)}>'
+
+    def _get_array(self, offset: int, count: int) -> 'np.ndarray':
+        ''' Gets a range of indices as an array (without copying) '''
+        end = len(self.indices) if count < 0 else offset + count
+        return np.asarray(self.indices[offset:end])
+
+    def _get_index_range(self, offset: int, count: int) -> Tuple[int, int]:
+        ''' Gets the (min, max) index in a given range of source indices, or (-1, -1) if the range is empty. The result is cached for each range. '''
+        key = (offset, count)
+        result = self._index_ranges.get(key)
+        if result is not None:
+            return result
+
+        if np is not None:
+            subset = self._get_array(offset, count)
+            result = (int(subset.min()), int(subset.max())) if len(subset) else (-1, -1)
+        else:
+            end = len(self.indices) if count < 0 else offset + count
+            indices = self.indices[offset:end]
+            result = (min(indices), max(indices)) if len(indices) else (-1, -1)
+
+        self._index_ranges[key] = result
+        return result
 
     def get_vertex_range(self, segment: MeshSegment) -> Tuple[int, int]:
-        indices = (self.indices[i] for i in range(segment.index_start, segment.index_start + segment.index_length))
-        lower, upper = -1, -1
-        for i, index in enumerate(indices):
-            lower, upper = (index, index) if i == 0 else (min(lower, index), max(upper, index))
+        lower, upper = self._get_index_range(segment.index_start, segment.index_length)
         return lower, upper + 1 - lower
 
     def relative_slice(self, segment: MeshSegment) -> 'IndexBuffer':
         result = IndexBuffer(self.index_layout, None, None)
-        result.indices = self.indices[segment.index_start:(segment.index_start + segment.index_length)]
+        result._typecode = self._typecode
 
         # offset the indices so they are relative to zero (so they correspond with the vertices in a slice of the vertex buffer)
-        vertex_start = min(result.indices)
-        for i, value in enumerate(result.indices):
-            result.indices[i] = value - vertex_start
+        # the source indices may be a readonly view, so the offset values go into a new array of the same width
+        vertex_start = self._get_index_range(segment.index_start, segment.index_length)[0]
+
+        if np is not None:
+            subset = self._get_array(segment.index_start, segment.index_length)
+            result.indices = memoryview((subset - vertex_start).astype(subset.dtype))
+            return result
+
+        indices = self.indices[segment.index_start:(segment.index_start + segment.index_length)]
+        result.indices = array(self._typecode, (value - vertex_start for value in indices))
 
         return result
 
+    def compact_slice(self, segment: MeshSegment) -> Tuple[Sequence[int], 'IndexBuffer']:
+        '''
+        Similar to `relative_slice()`, except the indices are remapped so they only refer to the vertices that are actually used by the segment.
+        Returns a tuple of (vertex_ids, index_buffer) where `vertex_ids` contains the source vertex index of each remapped vertex in ascending order.
+        Pass `vertex_ids` to `VertexBuffer.gather()` to get the corresponding vertices.
+        '''
+
+        result = IndexBuffer(self.index_layout, None, None)
+        result._typecode = self._typecode
+
+        if np is not None:
+            subset = self._get_array(segment.index_start, segment.index_length)
+            vertex_ids, remapped = np.unique(subset, return_inverse=True)
+            result.indices = memoryview(remapped.reshape(-1).astype(subset.dtype))
+            return (vertex_ids, result)
+
+        indices = self.indices[segment.index_start:(segment.index_start + segment.index_length)]
+        vertex_ids = sorted(set(indices))
+        remap = { v: i for i, v in enumerate(vertex_ids) }
+        result.indices = array(self._typecode, (remap[v] for v in indices))
+
+        return (vertex_ids, result)
+
     @overload
     def count_triangles(self, offset: int, count: int) -> int:
         ''' Gets the number of triangles in a given range of source indices '''
@@ -78,13 +162,21 @@ class IndexBuffer:
     def count_triangles(self, arg1, arg2 = None) -> int:
         def get_count(offset: int, count: int) -> int:
             if self.index_layout == IndexLayout.TRIANGLE_LIST:
-                return int(count / 3)
-            elif self.index_layout in [IndexLayout.DEFAULT, IndexLayout.TRIANGLE_STRIP]:
-                # count the number of unpacked triangles returned
-                return sum(1 for _ in self.get_triangles(offset, count))
-            else:
+                return (len(self.indices) - offset if count < 0 else count) // 3
+            elif self.index_layout not in [IndexLayout.DEFAULT, IndexLayout.TRIANGLE_STRIP]:
                 raise Exception('Unsupported index layout')
 
+            # strips need to be unpacked to count the non-degenerate triangles, so the count is cached for each range
+            key = (offset, count)
+            triangle_count = self._triangle_counts.get(key)
+            if triangle_count is None:
+                if np is not None:
+                    triangle_count = len(_unpack_triangle_strip(self._get_array(offset, count)))
+                else:
+                    triangle_count = sum(1 for _ in self.get_triangles(offset, count))
+                self._triangle_counts[key] = triangle_count
+            return triangle_count
+
         def from_range(offset: int, count: int) -> int:
             return get_count(offset, count)
         
@@ -127,8 +219,10 @@ class IndexBuffer:
                 raise Exception('Unsupported index layout')
 
         def from_range(offset: int, count: int) -> Iterator[Triangle]:
+            if np is not None:
+                return map(tuple, self.get_triangle_array(offset, count).tolist())
             indices = get_indices(offset, count)
-            return iter(lambda: tuple(itertools.islice(indices, 3)), ())
+            return zip(indices, indices, indices)
 
         def from_segment(segment: MeshSegment) -> Iterator[Triangle]:
             return from_range(segment.index_start, segment.index_length)
@@ -144,6 +238,53 @@ class IndexBuffer:
             return from_mesh(arg1)
         return from_range(arg1, arg2)
 
+    @overload
+    def get_triangle_array(self, offset: int, count: int) -> 'np.ndarray':
+        ''' Gets an array of shape (triangles, 3) for a given range of source indices '''
+        ...
+
+    @overload
+    def get_triangle_array(self, segment: MeshSegment) -> 'np.ndarray':
+        ''' Gets an array of shape (triangles, 3) for the index range defined in a `MeshSegment` '''
+        ...
+
+    @overload
+    def get_triangle_array(self, mesh: Mesh) -> 'np.ndarray':
+        ''' Gets an array of shape (triangles, 3) across every index range defined by the `MeshSegments` of a given `Mesh` '''
+        ...
+
+    def get_triangle_array(self, arg1, arg2 = None) -> Union['np.ndarray', List[Triangle]]:
+        '''
+        Array equivalent of `get_triangles()` where the result is an int32 array of shape (triangles, 3).
+        If NumPy is not available, returns a list of the tuples produced by `get_triangles()` instead.
+        '''
+
+        if np is None:
+            return list(self.get_triangles(arg1, arg2))
+
+        def from_range(offset: int, count: int) -> 'np.ndarray':
+            subset = self._get_array(offset, count)
+            if self.index_layout == IndexLayout.TRIANGLE_LIST:
+                return subset[:len(subset) - len(subset) % 3].reshape(-1, 3).astype(np.int32)
+            elif self.index_layout in [IndexLayout.DEFAULT, IndexLayout.TRIANGLE_STRIP]:
+                return _unpack_triangle_strip(subset)
+            else:
+                raise Exception('Unsupported index layout')
+
+        def from_segment(segment: MeshSegment) -> 'np.ndarray':
+            return from_range(segment.index_start, segment.index_length)
+
+        def from_mesh(mesh: Mesh) -> 'np.ndarray':
+            if len(mesh.segments) == 1:
+                return from_segment(mesh.segments[0])
+            return np.concatenate([from_segment(s) for s in mesh.segments] or [np.empty((0, 3), dtype=np.int32)])
+
+        if isinstance(arg1, MeshSegment):
+            return from_segment(arg1)
+        if isinstance(arg1, Mesh):
+            return from_mesh(arg1)
+        return from_range(arg1, arg2)
+
     def _unpack_triangle_list(self, indices: Iterable[int]) -> Iterator[int]:
         i0, i1, i2 = 0, 0, 0
         for pos, idx in enumerate(indices):
@@ -1,4 +1,4 @@
-from typing import List, Iterator
+from typing import List, Iterator, Callable, TypeVar
 from enum import IntFlag
 
 from .Types import *
@@ -16,6 +16,9 @@ __all__ = [
 ]
 
 
+T = TypeVar('T')
+
+
 class MeshFlags(IntFlag):
     NONE = 0
     USE_IMPLIED_BLENDWEIGHTS = 1 << 0
@@ -29,6 +32,43 @@ class Model(SceneObject):
     markers: List['Marker']
     bones: List['Bone']
     meshes: List['Mesh']
+    _bone_children: List[List[int]] = None
+    _bone_order: List[int] = None
+
+    @property
+    def bone_children(self) -> List[List[int]]:
+        ''' The indices of the child bones of each bone, in the same order as `bones` '''
+        if self._bone_children is None:
+            children = [[] for _ in self.bones]
+            for i, b in enumerate(self.bones):
+                if 0 <= b.parent_index < len(children):
+                    children[b.parent_index].append(i)
+            self._bone_children = children
+        return self._bone_children
+
+    @property
+    def bone_order(self) -> List[int]:
+        ''' The bone indices in topological order, where every bone comes after its parent '''
+        if self._bone_order is None:
+            children = self.bone_children
+            order = [i for i, b in enumerate(self.bones) if not 0 <= b.parent_index < len(self.bones)]
+            # the list is extended while iterating, so each bone's children get appended after it
+            for i in order:
+                order.extend(children[i])
+            self._bone_order = order
+        return self._bone_order
+
+    def get_world_transforms(self, local_transforms: List[T], multiply: Callable[[T, T], T]) -> List[T]:
+        '''
+        Combines the local transform of each bone with the world transform of its parent in a single pass over `bone_order`.
+        `multiply` is called as `multiply(parent_world_transform, local_transform)`.
+        '''
+        result = list(local_transforms)
+        for i in self.bone_order:
+            parent_index = self.bones[i].parent_index
+            if 0 <= parent_index < len(result):
+                result[i] = multiply(result[parent_index], local_transforms[i])
+        return result
 
     def get_bone_lineage(self, bone: 'Bone') -> List['Bone']:
         lineage = [bone]
@@ -40,7 +80,7 @@ class Model(SceneObject):
     
     def get_bone_children(self, bone: 'Bone') -> List['Bone']:
         index = self.bones.index(bone)
-        return [b for b in self.bones if b.parent_index == index]
+        return [self.bones[i] for i in self.bone_children[index]]
 
 
 class ModelRegion(INamed, ICustomProperties):
@@ -43,6 +43,7 @@ class Scene(INamed, ICustomProperties):
     index_buffer_pool: List[IndexBuffer]
     material_pool: List[Material]
     texture_pool: List[Texture]
+    buffer_timings: Dict[str, List[float]]
 
     def _set_source_file(self, path: str):
         self._source_file = path
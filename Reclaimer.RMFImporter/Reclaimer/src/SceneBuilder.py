@@ -1,38 +1,117 @@
-from typing import Optional, Any, Union
+import hashlib
+from typing import Optional, Any, Union, Dict, Tuple, Callable, TypeVar
 from queue import Queue, LifoQueue as Stack
-from time import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from time import time, perf_counter
 from functools import partial
 
 from .ImportOptions import *
 from .Progress import *
 from .Scene import *
+from .Model import *
 from .SceneFilter import *
+from .SceneReader import BufferTracker
+from .GeometryCache import GeometryCache
+from .TaskProfiler import TaskProfiler
 from .ViewportInterface import *
 
 __all__ = [
     'SceneBuilder',
+    'TaskCategory',
+    'Task',
     'TaskQueue'
 ]
 
 
+class TaskCategory:
+    SCENE: str = 'scene'
+    MATERIALS: str = 'materials'
+    MODELS: str = 'models'
+    BONES: str = 'bones'
+    MESHES: str = 'meshes'
+    MARKERS: str = 'markers'
+    TRANSFORMS: str = 'transforms'
+    BUFFERS: str = 'buffers'
+    PROGRESS: str = 'progress'
+
+
+class Task:
+    ''' A queued function call with a category and label, so the `TaskQueue` can report what each task was doing '''
+
+    __slots__ = ('category', 'label', 'func')
+
+    category: str
+    label: str
+    func: Callable
+
+    def __init__(self, category: str, label: str, func: Callable, *args, **kwargs) -> None:
+        self.category = category
+        self.label = label
+        self.func = partial(func, *args, **kwargs) if args or kwargs else func
+
+    def __call__(self):
+        return self.func()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}|{self.category}|{self.label}>'
+
+
 class TaskQueue():
     stack: Stack
     queue: Queue
     error: Exception
+    profiler: Optional[TaskProfiler]
+    cost_estimates: Dict[str, float] # category -> moving average of the task duration in seconds, see execute_batch()
 
-    def __init__(self, initial: Queue) -> None:
+    COST_SMOOTHING: float = 0.25 # weight of the latest duration in each moving average
+
+    def __init__(self, initial: Queue, profiler: Optional[TaskProfiler] = None) -> None:
         self.stack = Stack()
         self.queue = initial
         self.error = None
+        self.profiler = profiler
+        self.cost_estimates = dict()
 
     def finished(self) -> bool:
         return self.error or (self.queue.empty() and self.stack.empty())
 
-    def execute_batch(self, timeout: float = 0.0167):
-        ''' Timeout is in fractional seconds, defaults to approx 1/60th of a second '''
-        t = time()
-        while time() - t < timeout:
+    def pending(self) -> int:
+        ''' The number of tasks currently queued. Tasks that have not been expanded into their own queue yet count as a single task. '''
+        return self.queue.qsize() + sum(q.qsize() for q in list(self.stack.queue))
+
+    def peek(self) -> Optional[Callable]:
+        ''' Gets the task that will be executed next without removing it, or None if there is no work remaining '''
+        while self.queue.empty() and not self.stack.empty():
+            self.queue = self.stack.get()
+        return None if self.finished() else self.queue.queue[0]
+
+    def estimate_cost(self, task: Callable) -> float:
+        ''' Gets the expected duration of a task in seconds, based on the previous tasks of the same category. Unknown categories are assumed to be free. '''
+        return self.cost_estimates.get(getattr(task, 'category', None), 0.0)
+
+    def execute_batch(self, timeout: Optional[float] = 0.0167) -> int:
+        '''
+        Executes tasks until the next task is expected to take the batch past `timeout` (in fractional seconds, defaults to approx 1/60th of a second).
+        Each task's duration is predicted from the previous tasks of the same category, so a batch stops before a slow task rather than overrunning
+        while cheap tasks (progress updates, buffer bookkeeping) get grouped into the same batch.
+        At least one task is always executed. If `timeout` is None then every remaining task is executed.
+        Returns the number of tasks that were executed.
+        '''
+
+        start = perf_counter()
+        count = 0
+
+        while True:
+            task = self.peek()
+            if task is None:
+                break
+            if count > 0 and timeout is not None and perf_counter() - start + self.estimate_cost(task) > timeout:
+                break
             self.execute_next()
+            count += 1
+
+        return count
 
     def execute_next(self):
         # move to the next queue if necessary
@@ -46,7 +125,13 @@ class TaskQueue():
         try:
             # execute the task
             task = self.queue.get()
-            result = task()
+            start = perf_counter()
+            result = task() if self.profiler is None else self.profiler.run(task, self.pending() + 1)
+
+            category = getattr(task, 'category', None)
+            seconds = perf_counter() - start
+            estimate = self.cost_estimates.get(category)
+            self.cost_estimates[category] = seconds if estimate is None else estimate + (seconds - estimate) * self.COST_SMOOTHING
 
             # if the task returns another queue, put the current one onto the stack
             # and execute the new queue first before continuing
@@ -62,13 +147,113 @@ class TaskQueue():
                 self.queue.get()
 
 
+T = TypeVar('T')
+
+
+class _PreparePipeline:
+    '''
+    Runs functions on a pool of worker threads ahead of when their results are needed, with at most `lookahead` results in progress or waiting at once.
+    Results must be collected in the same order the functions were submitted. Without worker threads, each function runs when its result is collected.
+    '''
+
+    _executor: Optional[ThreadPoolExecutor]
+    _lookahead: int
+    _waiting: deque # entries that have not been submitted to the executor yet
+    _in_flight: int
+
+    def __init__(self, threads: int, lookahead: int) -> None:
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix='rmf_prepare') if threads > 0 else None
+        self._lookahead = max(1, lookahead)
+        self._waiting = deque()
+        self._in_flight = 0
+
+    def submit(self, func: Callable[[], T]) -> Callable[[], T]:
+        ''' Schedules `func` to run on a worker thread and returns a function that waits for and returns the result '''
+
+        if self._executor is None:
+            return func
+
+        entry = [func, None] # function, future
+        self._waiting.append(entry)
+        self._fill()
+
+        def result() -> T:
+            if entry[1] is None:
+                # collected out of order, so just run it now
+                self._waiting.remove(entry)
+                return func()
+
+            future: Future = entry[1]
+            entry[1] = None
+            try:
+                return future.result()
+            finally:
+                self._in_flight -= 1
+                self._fill()
+
+        return result
+
+    def _fill(self):
+        while self._waiting and self._in_flight < self._lookahead:
+            entry = self._waiting.popleft()
+            entry[1] = self._executor.submit(entry[0])
+            self._in_flight += 1
+
+    def shutdown(self):
+        self._waiting.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+def _hash_geometry(mesh_params: MeshParams) -> Tuple[bytes, int]:
+    '''
+    Hashes everything that affects the geometry built from a `MeshParams`: the vertex data and formats, the index range and material of each segment,
+    the mesh flags and the decompression transforms. Returns the hash and the number of bytes of vertex and index data that were hashed.
+    '''
+
+    vertex_buffer, index_buffer = mesh_params.vertex_buffer, mesh_params.index_buffer
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((int(mesh_params.mesh_flags), mesh_params.vertex_transform, mesh_params.texture_transform, index_buffer.index_layout)).encode())
+
+    size = 0
+    channels = (vertex_buffer.position_channels, vertex_buffer.texcoord_channels, vertex_buffer.normal_channels, vertex_buffer.color_channels)
+    for channel_list in channels:
+        h.update(repr([str(c._descriptor) for c in channel_list]).encode())
+        for c in channel_list:
+            data = c.get_bytes()
+            h.update(data)
+            size += data.nbytes
+
+    if mesh_params.source_segment is None:
+        ranges = [(s.material_index, s.index_start, s.index_length) for s in mesh_params.source_mesh.segments]
+    else:
+        # the index buffer has already been compacted to only the indices of this segment
+        ranges = [(mesh_params.source_segment.material_index, 0, len(index_buffer.indices))]
+
+    for material_index, start, length in ranges:
+        indices = memoryview(index_buffer.indices[start:start + length])
+        h.update(repr((material_index, indices.format, length)).encode())
+        h.update(indices)
+        size += indices.nbytes
+
+    return h.digest(), size
+
+
 class SceneBuilder():
     _interface: ViewportInterface
     _scene: Scene
     _filter: SceneFilter
     _options: ImportOptions
     _progress: ProgressCallback
+    _buffers: BufferTracker
+    _geometry: GeometryCache
+    _mesh_keys: Dict[MeshKey, MeshKey] # mesh key -> mesh key of the first mesh with the same content
+    _content_keys: Dict[bytes, MeshKey] # content hash -> mesh key of the first mesh with that content
+    _dedup_meshes: int
+    _dedup_bytes: int
     _start_time: float
+    _profiler: Optional[TaskProfiler]
+    _pipeline: _PreparePipeline
 
     def __init__(self, interface: ViewportInterface, scene: Scene, filter: Optional[SceneFilter] = None, options: Optional[ImportOptions] = None, callback: Optional[ProgressCallback] = None):
         if not filter:
@@ -94,26 +279,49 @@ class SceneBuilder():
 
         interface.init_scene(scene, options)
 
+        # for lazily loaded scenes, each model's buffers are read when its meshes are created
+        # and discarded after the last selected model that uses them has been created
+        selected_models = [m._model for m in filter._selected_models_recursive()] if options.IMPORT_MESHES else []
+        self._buffers = BufferTracker(scene, selected_models)
+        self._geometry = GeometryCache(options.GEOMETRY_CACHE_SIZE)
+        self._mesh_keys = dict()
+        self._content_keys = dict()
+        self._dedup_meshes = self._dedup_bytes = 0
+        self._pipeline = _PreparePipeline(options.PREPARE_THREADS, options.PREPARE_LOOKAHEAD)
+
         # TODO: enforce unique collection names
         root_collection = interface.create_collection(scene.name, None)
         interface.pre_import(root_collection)
 
+        self._profiler = None
+        if options.PROFILE_TASKS:
+            self._profiler = TaskProfiler(options.PROFILE_CATEGORIES, options.PROFILE_MEMORY)
+
         q = Queue()
-        q.put(partial(self._create_materials))
+        q.put(Task(TaskCategory.MATERIALS, f'{scene.name}/materials', self._create_materials))
 
         for group in filter.selected_groups():
-            q.put(partial(self._create_scene_group, group, root_collection))
+            q.put(Task(TaskCategory.SCENE, group.path, self._create_scene_group, group, root_collection))
 
         for model in filter.selected_models():
-            q.put(partial(self._create_model, model, root_collection))
+            q.put(Task(TaskCategory.MODELS, model.label, self._create_model, model, root_collection))
 
-        return TaskQueue(q)
+        return TaskQueue(q, self._profiler)
 
     def end_create_scene(self):
+        self._pipeline.shutdown()
         self._interface.post_import()
         self._progress.complete()
         end_time = time()
         seconds = round(end_time - self._start_time, 3)
+        print(f'geometry cache: {self._geometry}')
+        if self._options.DEDUPLICATE_GEOMETRY:
+            print(f'geometry dedup: {self._dedup_meshes} meshes linked instead of built, {self._dedup_bytes / 1048576:.1f}MB of geometry not rebuilt')
+        if self._profiler:
+            self._profiler.stop()
+            self._profiler.print_report()
+            if self._options.PROFILE_OUTPUT:
+                self._profiler.write(self._options.PROFILE_OUTPUT)
         print(f'finished in {seconds} seconds')
 
     def _create_materials(self) -> Union[None, Queue]:
@@ -128,8 +336,11 @@ class SceneBuilder():
 
         print(f'creating {scene.name}/materials')
 
+        # find all the bitmap files up front so the material builders only need to look up the results
+        options.resolve_textures(t for _, t in filter.selected_textures())
+
         q = Queue()
-        q.put(partial(interface.init_materials))
+        q.put(Task(TaskCategory.MATERIALS, 'init_materials', interface.init_materials))
 
         for i, m in filter.selected_materials():
             def create_material(mat, idx):
@@ -137,9 +348,9 @@ class SceneBuilder():
                 material = interface.create_material(mat)
                 result[idx] = material
                 progress.increment_materials()
-            q.put(partial(create_material, m, i))
+            q.put(Task(TaskCategory.MATERIALS, m.name, create_material, m, i))
 
-        q.put(partial(interface.set_materials, result))
+        q.put(Task(TaskCategory.MATERIALS, 'set_materials', interface.set_materials, result))
         return q
 
     def _create_scene_group(self, filter_item: FilterGroup, parent: Any) -> Queue:
@@ -153,10 +364,10 @@ class SceneBuilder():
         q = Queue()
 
         for group in filter_item.selected_groups():
-            q.put(partial(self._create_scene_group, group, collection))
+            q.put(Task(TaskCategory.SCENE, group.path, self._create_scene_group, group, collection))
 
         for model in filter_item.selected_models():
-            q.put(partial(self._create_model, model, collection))
+            q.put(Task(TaskCategory.MODELS, model.label, self._create_model, model, collection))
 
         return q
 
@@ -169,11 +380,12 @@ class SceneBuilder():
         q = Queue()
 
         if options.IMPORT_BONES and model.bones:
-            q.put(partial(self._create_bones, model_state))
+            q.put(Task(TaskCategory.BONES, f'{filter_item.label}/bones', self._create_bones, model_state))
         if options.IMPORT_MESHES and model.meshes:
-            q.put(partial(self._create_meshes, model_state))
+            q.put(Task(TaskCategory.BUFFERS, f'{model.name}/acquire', self._buffers.acquire, model))
+            q.put(Task(TaskCategory.MESHES, f'{filter_item.label}/meshes', self._create_meshes, model_state))
         if options.IMPORT_MARKERS and model.markers:
-            q.put(partial(self._create_markers, model_state))
+            q.put(Task(TaskCategory.MARKERS, f'{filter_item.label}/markers', self._create_markers, model_state))
 
         def transform_func():
             target_sys = interface.identity_transform()
@@ -185,12 +397,37 @@ class SceneBuilder():
 
             interface.apply_transform(model_state, final_transform)
 
-        q.put(partial(interface.finish_model, model_state))
-        q.put(partial(transform_func))
-        q.put(partial(progress.increment_objects))
+        q.put(Task(TaskCategory.MODELS, f'{filter_item.label}/finish', interface.finish_model, model_state))
+        if options.IMPORT_MESHES and model.meshes:
+            q.put(Task(TaskCategory.BUFFERS, f'{model.name}/release', self._buffers.release, model))
+        q.put(Task(TaskCategory.TRANSFORMS, f'{filter_item.label}/transform', transform_func))
+        q.put(Task(TaskCategory.PROGRESS, 'increment_objects', progress.increment_objects))
 
         return q
 
+    def _get_dedup_key(self, mesh_params: MeshParams) -> MeshKey:
+        '''
+        Gets the key of the first mesh that has the same content as `mesh_params`, so the interface links to that mesh instead of building it again.
+        Skinned meshes keep their own key since the skin belongs to the bones of a specific model.
+        '''
+
+        mesh_key = mesh_params.mesh_key
+        if mesh_key in self._mesh_keys:
+            return self._mesh_keys[mesh_key]
+
+        if mesh_params.bone_index >= 0 or mesh_params.vertex_buffer.blendindex_channels:
+            self._mesh_keys[mesh_key] = mesh_key
+            return mesh_key
+
+        content_hash, size = _hash_geometry(mesh_params)
+        result = self._mesh_keys[mesh_key] = self._content_keys.setdefault(content_hash, mesh_key)
+
+        if result != mesh_key:
+            self._dedup_meshes += 1
+            self._dedup_bytes += size
+
+        return result
+
     def _create_bones(self, model_state: ModelState):
         print(f'creating {model_state.model.name}/bones')
         self._interface.create_bones(model_state)
@@ -199,6 +436,16 @@ class SceneBuilder():
         print(f'creating {model_state.model.name}/markers')
         self._interface.create_markers(model_state)
 
+    def _prepare_mesh(self, mesh: Mesh, segment: Optional[MeshSegment], mesh_key: MeshKey, display_name: str) -> MeshParams:
+        '''
+        Creates the `MeshParams` for a mesh. This runs on a worker thread when `PREPARE_THREADS` is enabled, in which case the geometry
+        is also decoded in advance so the main thread only needs to make the viewport calls. It must not call the viewport interface.
+        '''
+        mesh_params = MeshParams(self._scene, mesh, segment, mesh_key, display_name, self._geometry)
+        if self._options.PREPARE_THREADS > 0:
+            mesh_params.prepare(self._options)
+        return mesh_params
+
     def _create_meshes(self, model_state: ModelState) -> Queue:
         interface, scene, options, progress = self._interface, self._scene, self._options, self._progress
         model, filter = model_state.model, model_state.filter
@@ -223,7 +470,11 @@ class SceneBuilder():
 
                     message = f'creating mesh {total_meshes:03d}: {model.name}/{r.name}/{p.name}/{mesh_index} [{ri:02d}/{pi:02d}/{mesh_index:02d}]'
 
-                    def mesh_func(message, model_state, permutation, region_group, transform, mesh_params):
+                    def mesh_func(message, model_state, permutation, region_group, transform, get_mesh_params):
+                        # this waits for the mesh to finish being prepared if it is running on a worker thread
+                        mesh_params = get_mesh_params()
+                        if options.DEDUPLICATE_GEOMETRY:
+                            mesh_params.mesh_key = self._get_dedup_key(mesh_params)
                         print(message)
                         interface.build_mesh(model_state, permutation, region_group, transform, mesh_params)
 
@@ -231,13 +482,14 @@ class SceneBuilder():
                     for si, s in segments:
                         mesh_key = (scene.model_pool.index(model), mesh_index, si)
                         mesh_name = options.permutation_name(r, p, mesh_index, si)
-                        mesh_params = MeshParams(scene, mesh, s, mesh_key, mesh_name)
+                        get_mesh_params = self._pipeline.submit(partial(self._prepare_mesh, mesh, s, mesh_key, mesh_name))
                         message = f'creating mesh {total_meshes:03d}: {model.name}/{r.name}/{p.name}/{mesh_index} [{ri:02d}/{pi:02d}/{mesh_index:02d}]'
                         if si >= 0:
                             message = f'{message}[{si:02d}]'
-                        q.put(partial(mesh_func, message, model_state, p, region_group, world_transform, mesh_params))
+                        label = f'{filter.label}/{r.name}/{p.name}/{mesh_index}' + (f'/{si}' if si >= 0 else '')
+                        q.put(Task(TaskCategory.MESHES, label, mesh_func, message, model_state, p, region_group, world_transform, get_mesh_params))
 
-                    q.put(partial(progress.increment_meshes))
+                    q.put(Task(TaskCategory.PROGRESS, 'increment_meshes', progress.increment_meshes))
                     total_meshes += 1
 
         return q
\ No newline at end of file
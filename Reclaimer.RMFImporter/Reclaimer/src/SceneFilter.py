@@ -1,4 +1,5 @@
 from enum import Enum
+from fnmatch import fnmatchcase
 from typing import cast
 from typing import List, Dict, Iterator, Optional, Tuple, Union
 
@@ -166,7 +167,34 @@ class SceneFilter(FilterGroup):
                 texture_ids.add(t.texture_index)
 
         for id in texture_ids:
-            yield (id, self._scene.texture_pool[id])
+            if id >= 0:
+                yield (id, self._scene.texture_pool[id])
+
+    def select_matching(self, models: str = '*', regions: str = '*', permutations: str = '*'):
+        '''
+        Unchecks every model, region and permutation that does not match the corresponding glob pattern (case insensitive).
+        Models match against either the placement label or the model name.
+        '''
+
+        def matches(pattern: str, *names: str) -> bool:
+            return any(fnmatchcase((n or '').lower(), pattern.lower()) for n in names)
+
+        def all_models(group: FilterGroup) -> Iterator[ModelFilter]:
+            for g in group.groups:
+                yield from all_models(g)
+            yield from group.models
+
+        for model in all_models(self):
+            if not matches(models, model.label, model._model.name):
+                model.toggle(CheckState.UNCHECKED)
+                continue
+            for region in model.regions:
+                if not matches(regions, region.label):
+                    region.toggle(CheckState.UNCHECKED)
+                    continue
+                for permutation in region.permutations:
+                    if not matches(permutations, permutation.label):
+                        permutation.toggle(CheckState.UNCHECKED)
 
     def count_objects(self) -> int:
         return sum(1 for _ in self._selected_models_recursive())
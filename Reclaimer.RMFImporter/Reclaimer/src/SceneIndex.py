@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+
+from .DataBlock import DataBlock
+
+__all__ = [
+    'SceneIndex'
+]
+
+_INDEX_VERSION = 1
+_INDEX_EXTENSION = '.rmfidx'
+_HASH_LENGTH = 0x10000 # number of bytes to hash from both the start and end of the file
+
+
+def _create_key(fileName: str) -> Dict[str, object]:
+    ''' Creates a value that identifies the current contents of the file without reading the whole file '''
+    stat = os.stat(fileName)
+    hasher = hashlib.blake2b(digest_size=16)
+
+    with open(fileName, 'rb') as f:
+        hasher.update(f.read(_HASH_LENGTH))
+        if stat.st_size > _HASH_LENGTH:
+            f.seek(max(_HASH_LENGTH, stat.st_size - _HASH_LENGTH))
+            hasher.update(f.read(_HASH_LENGTH))
+
+    return {
+        'version': _INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': hasher.hexdigest()
+    }
+
+
+class SceneIndex:
+    '''
+    A cache of the block headers and string table of an RMF file.
+    The index is stored in a sidecar file next to the RMF file so the block tree does not need to be walked again the next time the file is opened.
+    '''
+
+    strings: Optional[List[str]]
+    _key: Dict[str, object]
+    _entries: Dict[int, List[DataBlock]]
+    _modified: bool
+
+    def __init__(self, key: Dict[str, object]):
+        self.strings = None
+        self._key = key
+        self._entries = dict()
+        self._modified = False
+
+    @staticmethod
+    def get_index_path(fileName: str) -> Path:
+        return Path(fileName).with_suffix(_INDEX_EXTENSION)
+
+    @staticmethod
+    def open(fileName: str) -> 'SceneIndex':
+        ''' Loads the index for the given RMF file, or returns an empty index if there is no valid index for the current version of the file '''
+        key = _create_key(fileName)
+
+        try:
+            with open(SceneIndex.get_index_path(fileName), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return SceneIndex(key)
+
+        if data.get('key') != key:
+            return SceneIndex(key)
+
+        index = SceneIndex(key)
+        index.strings = data['strings']
+
+        blocks = []
+        for code, start, end, count, parent in data['blocks']:
+            block = DataBlock.create(code, start, end, count)
+            if parent >= 0:
+                blocks[parent].child_blocks.append(block)
+            blocks.append(block)
+
+        for position, ids in data['entries']:
+            index._entries[position] = [blocks[i] for i in ids]
+
+        return index
+
+    @property
+    def is_modified(self) -> bool:
+        return self._modified
+
+    def get_blocks(self, position: int) -> Optional[List[DataBlock]]:
+        ''' Gets the block headers that were previously read from the given position, if any '''
+        return self._entries.get(position)
+
+    def add_blocks(self, position: int, blocks: List[DataBlock]):
+        ''' Records the block headers that were read from the given position '''
+        self._entries[position] = blocks
+        self._modified = True
+
+    def set_strings(self, strings: List[str]):
+        self.strings = strings
+        self._modified = True
+
+    def save(self, fileName: str):
+        ''' Writes the index to the sidecar file of the given RMF file. Failures are ignored since the index is only a cache. '''
+
+        # flatten the block tree into a table where each block refers to the position of its parent in the table
+        table: List[Tuple[str, int, int, int, int]] = []
+        ids: Dict[int, int] = dict()
+
+        def add_block(block: DataBlock, parent: int) -> int:
+            if id(block) in ids:
+                return ids[id(block)]
+
+            i = ids[id(block)] = len(table)
+            table.append((block.code, block.start_address, block.end_address, block.count, parent))
+            if block.is_list:
+                for child in block.child_blocks:
+                    add_block(child, i)
+            return i
+
+        entries = [(position, [add_block(b, -1) for b in blocks]) for position, blocks in self._entries.items()]
+
+        data = {
+            'key': self._key,
+            'strings': self.strings or [],
+            'blocks': table,
+            'entries': entries
+        }
+
+        try:
+            with open(SceneIndex.get_index_path(fileName), 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            self._modified = False
+        except OSError:
+            pass
@@ -1,9 +1,16 @@
-from typing import List, Dict, Tuple, Union, Callable, TypeVar
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Set, Union, Callable, Iterable, Iterator, TypeVar, Generic
+from collections import defaultdict
+from collections.abc import Sequence
 from dataclasses import astuple
+from functools import partial
 
 from .Types import *
 from .FileReader import FileReader
 from .DataBlock import DataBlock
+from .SceneIndex import SceneIndex
 from .Scene import *
 from .Model import *
 from .Material import *
@@ -12,14 +19,30 @@ from .VertexBuffer import *
 from .IndexBuffer import *
 
 __all__ = [
+    'BufferTracker',
     'SceneReader'
 ]
 
 T = TypeVar('T')
 
-__strings: List[str]
-__vector_descriptors: List[VectorDescriptor]
-__models: List[Model]
+
+class _ReaderContext(FileReader):
+    '''
+    A FileReader that also holds the scene-level lookup tables needed while decoding a scene.
+    Each call to `open_scene` gets its own context, so multiple scenes can be decoded at the same time.
+    '''
+
+    strings: List[str]
+    vector_descriptors: List[VectorDescriptor]
+    models: List[Model]
+    block_index: SceneIndex
+
+    def __init__(self, fileName: str, memory_map: bool = False, block_index: SceneIndex = None):
+        super().__init__(fileName, memory_map)
+        self.strings = []
+        self.vector_descriptors = []
+        self.models = []
+        self.block_index = block_index
 
 
 # helper functions #
@@ -29,17 +52,30 @@ def _read_property_blocks(reader: FileReader, block: DataBlock) -> Dict[str, Dat
     blocks = _read_remaining_blocks(reader, block)
     return { b.code:b for b in blocks }
 
-def _read_remaining_blocks(reader: FileReader, block: DataBlock) -> List[DataBlock]:
+def _read_remaining_blocks(reader: _ReaderContext, block: DataBlock) -> List[DataBlock]:
     ''' Reads the block headers (not body) of all remaining child blocks in the current parent block '''
+    index = reader.block_index
+    position = reader.position
+
+    if index is not None:
+        blocks = index.get_blocks(position)
+        if blocks is not None:
+            reader.position = block.end_address
+            return blocks
+
     blocks = []
     while reader.position < block.end_address:
         blocks.append(DataBlock(reader))
+
+    if index is not None:
+        index.add_blocks(position, blocks)
+
     return blocks
 
-def _read_stringref(reader: FileReader) -> str:
-    ''' Reads an Int32 and returns the corresponding global string '''
+def _read_stringref(reader: _ReaderContext) -> str:
+    ''' Reads an Int32 and returns the corresponding string from the scene string table '''
     index = reader.read_int32()
-    return __strings[index] if index >= 0 else ''
+    return reader.strings[index] if index >= 0 else ''
 
 def _decode_attributes(reader: FileReader, props: Dict[str, DataBlock], read_func: Callable[[], None]):
     ''' Seeks to the body of the attribute data block and calls `read_func` '''
@@ -62,6 +98,40 @@ def _decode_list(reader: FileReader, block: DataBlock, read_func: Callable[[File
     ''' Seeks to and reads the body of each child in a list block '''
     return [_decode_block(reader, b, read_func) for b in block.child_blocks]
 
+def _decode_list_timed(reader: _ReaderContext, block: DataBlock, read_func: Callable[[FileReader, DataBlock], T], max_workers: int = 0) -> Tuple[List[T], List[float]]:
+    '''
+    Seeks to and reads the body of each child in a list block, returning the results along with the time in seconds taken to decode each child.
+    When `max_workers` is greater than zero the children are decoded by a pool of threads that each have their own reader.
+    The results are always returned in the original order.
+    '''
+
+    def decode(r: FileReader, b: DataBlock) -> Tuple[T, float]:
+        start = time.perf_counter()
+        result = _decode_block(r, b, read_func)
+        return (result, time.perf_counter() - start)
+
+    if max_workers <= 0:
+        results = [decode(reader, b) for b in block.child_blocks]
+    else:
+        local = threading.local()
+        readers = []
+
+        def decode_worker(b: DataBlock) -> Tuple[T, float]:
+            r = getattr(local, 'reader', None)
+            if r is None:
+                r = local.reader = _ReaderContext(reader.file_name, reader.is_memory_mapped, reader.block_index)
+                readers.append(r)
+            return decode(r, b)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(decode_worker, block.child_blocks))
+        finally:
+            for r in readers:
+                r.close()
+
+    return ([r for r, _ in results], [t for _, t in results])
+
 def _decode_data_block(reader: FileReader, block: DataBlock) -> Tuple[int, int]:
     ''' Reads the address and length of a `DATA` block (byte array) '''
     reader.position = block.start_address
@@ -142,11 +212,154 @@ def _append_default_custom_properties(scene: Scene):
         set_value_if_new(t, 'relative_path', t.name)
 
 
-# decode functions #
+class _SharedReader:
+    '''
+    Opens the file the first time a buffer is read and keeps it open, so every buffer read from a lazy scene shares one file handle
+    (and one mapping when the scene is memory mapped). Reads must be made while holding `lock` since the reader position is shared.
+    '''
+
+    lock: threading.Lock
+    _file_name: str
+    _memory_map: bool
+    _reader: _ReaderContext
+
+    def __init__(self, file_name: str, memory_map: bool):
+        self.lock = threading.Lock()
+        self._file_name = file_name
+        self._memory_map = memory_map
+        self._reader = None
+
+    def __del__(self):
+        self.close()
+
+    def get(self) -> _ReaderContext:
+        if self._reader is None:
+            self._reader = _ReaderContext(self._file_name, self._memory_map)
+        return self._reader
+
+    def close(self):
+        ''' Closes the file. It will be opened again if any more buffers are read. '''
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+class _LazyBufferPool(Sequence, Generic[T]):
+    '''
+    A list of buffers where the body of each buffer is only read from the file when it is first accessed.
+    The block headers of the buffers are read up front so the body of each buffer can be read directly.
+    '''
+
+    _reader: _SharedReader
+    _blocks: List[DataBlock]
+    _read_func: Callable[[FileReader, DataBlock], T]
+    _items: List[T]
+
+    def __init__(self, reader: _SharedReader, blocks: List[DataBlock], read_func: Callable[[FileReader, DataBlock], T]):
+        self._reader = reader
+        self._blocks = blocks
+        self._read_func = read_func
+        self._items = [None for _ in blocks]
+
+    def __getitem__(self, i: int) -> T:
+        if isinstance(i, slice):
+            return [self[x] for x in range(*i.indices(len(self)))]
+
+        item = self._items[i]
+        if item is None:
+            self.load((i, ))
+            item = self._items[i]
+        return item
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def is_loaded(self, i: int) -> bool:
+        return self._items[i] is not None
+
+    def load(self, indices: Iterable[int] = None):
+        ''' Reads all of the specified buffers that are not already loaded (or all buffers if not specified) '''
+
+        with self._reader.lock:
+            indices = range(len(self._blocks)) if indices is None else indices
+            pending = [i for i in indices if self._items[i] is None]
+            if not pending:
+                return
+
+            reader = self._reader.get()
+            for i in pending:
+                self._items[i] = _decode_block(reader, self._blocks[i], self._read_func)
+
+    def release(self, indices: Iterable[int]):
+        ''' Discards the specified buffers. They will be read from the file again if they are accessed later. '''
+
+        with self._reader.lock:
+            for i in indices:
+                self._items[i] = None
+
+
+def _get_buffer_indices(model: Model) -> Tuple[Set[int], Set[int]]:
+    ''' Gets the indices of the vertex buffers and index buffers referenced by the meshes of a model '''
+    vertex_indices = set(m.vertex_buffer_index for m in model.meshes if m.vertex_buffer_index >= 0)
+    index_indices = set(m.index_buffer_index for m in model.meshes if m.index_buffer_index >= 0)
+    return (vertex_indices, index_indices)
+
+
+class BufferTracker:
+    '''
+    Keeps track of the vertex and index buffers referenced by a sequence of models.
+    For scenes opened with `lazy` enabled, the buffers of each model are read in a single batch when the model is acquired,
+    and are discarded once no remaining models reference them. For other scenes this does nothing.
+    '''
+
+    _scene: Scene
+    _vertex_refs: Dict[int, int]
+    _index_refs: Dict[int, int]
+
+    def __init__(self, scene: Scene, models: Iterable[Model]):
+        self._scene = scene
+        self._vertex_refs = defaultdict(int)
+        self._index_refs = defaultdict(int)
+
+        for model in models:
+            vertex_indices, index_indices = _get_buffer_indices(model)
+            for i in vertex_indices:
+                self._vertex_refs[i] += 1
+            for i in index_indices:
+                self._index_refs[i] += 1
+
+    def acquire(self, model: Model):
+        ''' Ensures all buffers referenced by the model are loaded '''
+        vertex_indices, index_indices = _get_buffer_indices(model)
+        BufferTracker._load(self._scene.vertex_buffer_pool, vertex_indices)
+        BufferTracker._load(self._scene.index_buffer_pool, index_indices)
+
+    def release(self, model: Model):
+        ''' Marks the model as finished, discarding any of its buffers that are not referenced by any remaining models '''
+        vertex_indices, index_indices = _get_buffer_indices(model)
+        BufferTracker._release(self._scene.vertex_buffer_pool, self._vertex_refs, vertex_indices)
+        BufferTracker._release(self._scene.index_buffer_pool, self._index_refs, index_indices)
+
+    @staticmethod
+    def _load(pool: Sequence, indices: Set[int]):
+        if isinstance(pool, _LazyBufferPool):
+            pool.load(sorted(i for i in indices if i < len(pool)))
+
+    @staticmethod
+    def _release(pool: Sequence, refs: Dict[int, int], indices: Set[int]):
+        unused = []
+        for i in indices:
+            refs[i] -= 1
+            if refs[i] <= 0:
+                unused.append(i)
 
-def _read_scene(reader: FileReader, block: DataBlock) -> Scene:
-    global __strings, __models, __vector_descriptors
+        if isinstance(pool, _LazyBufferPool):
+            pool.release(i for i in unused if i < len(pool))
 
+
+# decode functions #
+
+def _read_scene(reader: _ReaderContext, block: DataBlock, lazy: bool = False, buffer_workers: int = 0) -> Scene:
     scene = Scene()
     scene.version = Version(reader.read_byte(), reader.read_byte(), reader.read_byte(), reader.read_byte())
 
@@ -161,16 +374,33 @@ def _read_scene(reader: FileReader, block: DataBlock) -> Scene:
 
     props = _read_property_blocks(reader, block)
 
-    __strings = _decode_block(reader, props['STRS'], _read_string_index)
-    __vector_descriptors = _decode_list(reader, props['VECD[]'], _read_vector_descriptor)
-    __models = _decode_list(reader, props['MODL[]'], _read_model)
+    if reader.block_index is not None and reader.block_index.strings is not None:
+        reader.strings = reader.block_index.strings
+    else:
+        reader.strings = _decode_block(reader, props['STRS'], _read_string_index)
+        if reader.block_index is not None:
+            reader.block_index.set_strings(reader.strings)
+    reader.vector_descriptors = _decode_list(reader, props['VECD[]'], _read_vector_descriptor)
+    reader.models = _decode_list(reader, props['MODL[]'], _read_model)
 
     _decode_attributes(reader, props, read_attribute_data)
     _decode_custom_properties(reader, props, scene)
 
-    scene.model_pool = __models
-    scene.vertex_buffer_pool = _decode_list(reader, props['VBUF[]'], _read_vertex_buffer)
-    scene.index_buffer_pool = _decode_list(reader, props['IBUF[]'], _read_index_buffer)
+    scene.model_pool = reader.models
+
+    read_vertex_buffer = partial(_read_vertex_buffer, vector_descriptors=reader.vector_descriptors)
+    if lazy:
+        # only the block headers are read for now, the buffer bodies get read on first access
+        # both pools read through the same file handle, which stays open until the pools are discarded
+        shared_reader = _SharedReader(reader.file_name, reader.is_memory_mapped)
+        scene.vertex_buffer_pool = _LazyBufferPool(shared_reader, props['VBUF[]'].child_blocks, read_vertex_buffer)
+        scene.index_buffer_pool = _LazyBufferPool(shared_reader, props['IBUF[]'].child_blocks, _read_index_buffer)
+        scene.buffer_timings = dict()
+    else:
+        scene.vertex_buffer_pool, vertex_timings = _decode_list_timed(reader, props['VBUF[]'], read_vertex_buffer, buffer_workers)
+        scene.index_buffer_pool, index_timings = _decode_list_timed(reader, props['IBUF[]'], _read_index_buffer, buffer_workers)
+        scene.buffer_timings = { 'VBUF': vertex_timings, 'IBUF': index_timings }
+
     scene.material_pool = _decode_list(reader, props['MATL[]'], _read_material)
     scene.texture_pool = _decode_list(reader, props['BITM[]'], _read_texture)
 
@@ -178,11 +408,6 @@ def _read_scene(reader: FileReader, block: DataBlock) -> Scene:
 
     _append_default_custom_properties(scene)
 
-    # cleanup since theyre no longer needed
-    __strings = None
-    __vector_descriptors = None
-    __models = None
-
     return scene
 
 def _read_string_index(reader: FileReader, block: DataBlock) -> List[str]:
@@ -239,8 +464,8 @@ def _read_object(reader: FileReader, block: DataBlock) -> SceneObject:
     if block.code == 'MOD*':
         return _decode_block(reader, block, _read_modelref)
 
-def _read_modelref(reader: FileReader, block: DataBlock) -> Model:
-    return __models[reader.read_int32()]
+def _read_modelref(reader: _ReaderContext, block: DataBlock) -> Model:
+    return reader.models[reader.read_int32()]
 
 def _read_model(reader: FileReader, block: DataBlock) -> Model:
     model = Model()
@@ -442,7 +667,7 @@ def _read_vector_descriptor(reader: FileReader, block: DataBlock) -> VectorDescr
     return VectorDescriptor(datatype, size, dimensions)
 
 
-def _read_vertex_buffer(reader: FileReader, block: DataBlock) -> VertexBuffer:
+def _read_vertex_buffer(reader: FileReader, block: DataBlock, vector_descriptors: List[VectorDescriptor]) -> VertexBuffer:
     buf = VertexBuffer()
     buf.count = reader.read_int32()
     channel_blocks = _read_remaining_blocks(reader, block)
@@ -460,7 +685,7 @@ def _read_vertex_buffer(reader: FileReader, block: DataBlock) -> VertexBuffer:
     for b in channel_blocks:
         reader.position = b.start_address
         descriptor_index = reader.read_int32()
-        descriptor = __vector_descriptors[descriptor_index]
+        descriptor = vector_descriptors[descriptor_index]
         data = reader.read_bytes(b.end_address - reader.position)
         channel = VectorBuffer(data, descriptor, buf.count)
         channel_buffers[b.code].append(channel)
@@ -477,19 +702,74 @@ def _read_vertex_buffer(reader: FileReader, block: DataBlock) -> VertexBuffer:
 
 class SceneReader:
     @staticmethod
-    def open_scene(fileName: str) -> Scene:
-        reader = FileReader(fileName)
+    def open_scene(fileName: str, memory_map: bool = False, lazy: bool = False, buffer_workers: int = 0, use_index: bool = False) -> Scene:
+        '''
+        Reads the RMF file at the given path.
+        When `memory_map` is enabled, the vertex and index buffers of the returned scene will be views into a memory mapping of the file rather than copies of the data.
+        When `lazy` is enabled, only the scene metadata is read up front. The body of each vertex and index buffer will be read the first time it is accessed.
+        When `buffer_workers` is greater than zero (and `lazy` is not enabled), the vertex and index buffers are decoded in parallel using that many threads.
+        The time taken to decode each buffer is stored in `Scene.buffer_timings`.
+        When `use_index` is enabled, the block headers and string table are read from the `.rmfidx` sidecar file if it is up to date, otherwise the sidecar file is created.
+        '''
+        block_index = SceneIndex.open(fileName) if use_index else None
+        reader = _ReaderContext(fileName, memory_map, block_index)
         rootBlock = DataBlock(reader)
 
         if rootBlock.code != 'RMF!' or rootBlock.is_list or reader.position != rootBlock.end_address:
             raise Exception('Not a valid RMF file')
 
-        scene = _decode_block(reader, rootBlock, _read_scene)
+        scene = _decode_block(reader, rootBlock, partial(_read_scene, lazy=lazy, buffer_workers=buffer_workers))
         reader.close()
 
+        if block_index is not None and block_index.is_modified:
+            block_index.save(fileName)
+
         scene._set_source_file(fileName)
         return scene
 
+    @staticmethod
+    def open_scenes(fileNames: Iterable[str], max_workers: int = None, memory_map: bool = False, lazy: bool = False, buffer_workers: int = 0, use_index: bool = False) -> List[Scene]:
+        '''
+        Reads each of the RMF files at the given paths using a pool of up to `max_workers` threads.
+        The scenes are returned in the same order as the given paths. See `open_scene` for the remaining arguments.
+        '''
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda f: SceneReader.open_scene(f, memory_map, lazy, buffer_workers, use_index), fileNames))
+
+    @staticmethod
+    def iter_models(scene: Scene, models: Iterable[Model] = None) -> Iterator[Model]:
+        '''
+        Iterates over the given models (or all models in the scene if not specified), loading the buffers of each model just before it is returned.
+        For scenes opened with `lazy` enabled, buffers that are not referenced by any remaining models are discarded as the iterator advances.
+        '''
+        models = list(scene.model_pool if models is None else models)
+        tracker = BufferTracker(scene, models)
+
+        for model in models:
+            tracker.acquire(model)
+            yield model
+            tracker.release(model)
+
+    @staticmethod
+    def iter_placements(scene: Scene) -> Iterator[Placement]:
+        '''
+        Iterates over all model placements in the scene node tree (depth first), loading the buffers of each model just before it is returned.
+        For scenes opened with `lazy` enabled, buffers that are not referenced by any remaining placements are discarded as the iterator advances.
+        Placements of any other object type are skipped, since models are the only objects that reference buffers.
+        '''
+        def enumerate_placements(group: SceneGroup) -> Iterator[Placement]:
+            for g in group.child_groups:
+                yield from enumerate_placements(g)
+            yield from (p for p in group.child_objects if isinstance(p.object, Model))
+
+        placements = list(enumerate_placements(scene.root_node))
+        tracker = BufferTracker(scene, (p.object for p in placements))
+
+        for placement in placements:
+            tracker.acquire(placement.object)
+            yield placement
+            tracker.release(placement.object)
+
     @staticmethod
     def read_texture(scene: Scene, texture: Texture) -> Union[bytes, None]:
         if texture.size == 0:
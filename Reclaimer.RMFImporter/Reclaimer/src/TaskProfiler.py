@@ -0,0 +1,177 @@
+import os
+import json
+import heapq
+import cProfile
+import tracemalloc
+from time import perf_counter
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Tuple, Callable, Iterable, Optional
+
+__all__ = [
+    'TaskRecord',
+    'CategoryStats',
+    'TaskProfiler'
+]
+
+
+@dataclass
+class TaskRecord:
+    category: str
+    label: str
+    start: float # seconds since the profiler was created
+    seconds: float
+    memory: int = 0 # net bytes allocated by the task, if memory tracing is enabled
+    peak_memory: int = 0 # peak bytes allocated during the task, if memory tracing is enabled
+
+
+@dataclass
+class CategoryStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    memory: int = 0
+    peak_memory: int = 0
+
+    def add(self, record: TaskRecord):
+        self.count += 1
+        self.seconds += record.seconds
+        self.max_seconds = max(self.max_seconds, record.seconds)
+        self.memory += record.memory
+        self.peak_memory = max(self.peak_memory, record.peak_memory)
+
+
+def _describe(task: Callable) -> Tuple[str, str]:
+    ''' Gets the (category, label) of a task, falling back to the function name for tasks that were queued without a label '''
+    category = getattr(task, 'category', None)
+    label = getattr(task, 'label', None)
+    if category is not None and label is not None:
+        return (category, label)
+
+    func = getattr(task, 'func', task)
+    return (category or 'other', label or getattr(func, '__qualname__', repr(func)))
+
+
+class TaskProfiler:
+    '''
+    Records the duration of each task executed by a `TaskQueue` along with the queue depth over time.
+    Categories listed in `profile_categories` (or all categories if it contains `'*'`) are also captured with cProfile,
+    and `trace_memory` uses tracemalloc to record the memory allocated by each task.
+    '''
+
+    records: List[TaskRecord]
+    categories: Dict[str, CategoryStats]
+    queue_depth: List[Tuple[float, int]] # (seconds since the profiler was created, pending task count)
+    profiles: Dict[str, cProfile.Profile]
+    _profile_categories: Tuple[str, ...]
+    _trace_memory: bool
+    _start: float
+
+    def __init__(self, profile_categories: Iterable[str] = (), trace_memory: bool = False):
+        self.records = []
+        self.categories = dict()
+        self.queue_depth = []
+        self.profiles = dict()
+        self._profile_categories = tuple(profile_categories)
+        self._trace_memory = trace_memory
+        self._start = perf_counter()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def run(self, task: Callable, queue_depth: int):
+        ''' Executes the task and records its duration. `queue_depth` is the number of tasks that were pending when the task started. '''
+
+        category, label = _describe(task)
+        profile = self._get_profile(category)
+
+        if self._trace_memory:
+            if hasattr(tracemalloc, 'reset_peak'): # python 3.9+
+                tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            return task()
+        finally:
+            if profile:
+                profile.disable()
+            seconds = perf_counter() - start
+
+            record = TaskRecord(category, label, start - self._start, seconds)
+            if self._trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                if not hasattr(tracemalloc, 'reset_peak'):
+                    peak = max(current, memory_before) # the peak can't be reset per task before python 3.9
+                record.memory, record.peak_memory = current - memory_before, peak - memory_before
+
+            self.records.append(record)
+            self.categories.setdefault(category, CategoryStats()).add(record)
+            self.queue_depth.append((record.start, queue_depth))
+
+    def _get_profile(self, category: str) -> Optional[cProfile.Profile]:
+        if category not in self._profile_categories and '*' not in self._profile_categories:
+            return None
+        if category not in self.profiles:
+            self.profiles[category] = cProfile.Profile()
+        return self.profiles[category]
+
+    def stop(self):
+        ''' Stops memory tracing if it was started by this profiler '''
+        if self._trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.categories.values())
+
+    def slowest(self, count: int = 10) -> List[TaskRecord]:
+        return heapq.nlargest(count, self.records, key=lambda r: r.seconds)
+
+    def report(self, top: int = 10) -> List[str]:
+        ''' Gets the lines of a summary showing the time spent in each category, the peak queue depth and the slowest tasks '''
+
+        total = self.total_seconds
+        percent = lambda seconds: 100 * seconds / total if total > 0 else 0
+
+        lines = [f'{"category":<16}{"tasks":>8}{"total":>12}{"max":>12}{"share":>8}' + (f'{"memory":>12}{"peak":>12}' if self._trace_memory else '')]
+        for category, stats in sorted(self.categories.items(), key=lambda c: -c[1].seconds):
+            line = f'{category:<16}{stats.count:>8}{stats.seconds * 1000:>10.2f}ms{stats.max_seconds * 1000:>10.2f}ms{percent(stats.seconds):>7.1f}%'
+            if self._trace_memory:
+                line += f'{stats.memory / 1048576:>10.1f}MB{stats.peak_memory / 1048576:>10.1f}MB'
+            lines.append(line)
+
+        if self.queue_depth:
+            peak_time, peak_depth = max(self.queue_depth, key=lambda d: d[1])
+            lines.append(f'peak queue depth: {peak_depth} tasks at {peak_time:.2f}s')
+
+        lines.append(f'slowest {top} tasks:')
+        for record in self.slowest(top):
+            lines.append(f'{record.seconds * 1000:>10.2f}ms  [{record.category}] {record.label}')
+
+        return lines
+
+    def print_report(self, top: int = 10):
+        print('\n'.join(self.report(top)))
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            'total_seconds': self.total_seconds,
+            'categories': { k: asdict(v) for k, v in self.categories.items() },
+            'queue_depth': self.queue_depth,
+            'tasks': [asdict(r) for r in self.records]
+        }
+
+    def write(self, path: str):
+        '''
+        Writes the task records and category totals to `path` as JSON.
+        Each category captured with cProfile is written alongside it as `<path without extension>.<category>.pstats`.
+        '''
+
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=1)
+
+        base = os.path.splitext(path)[0]
+        for category, profile in self.profiles.items():
+            profile.dump_stats(f'{base}.{category}.pstats')
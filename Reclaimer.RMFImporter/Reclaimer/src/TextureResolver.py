@@ -0,0 +1,97 @@
+import os
+import re
+import threading
+from typing import Dict, Tuple, Set, Iterable, Optional
+
+__all__ = [
+    'TextureResolver'
+]
+
+
+# (directory mtime, lower case file name -> file name, lower case subdirectory name -> subdirectory name)
+_Listing = Tuple[int, Dict[str, str], Dict[str, str]]
+
+# shared by every resolver so the listings are kept between imports
+_listings: Dict[str, _Listing] = dict()
+_listings_lock = threading.Lock()
+
+
+class TextureResolver:
+    '''
+    Finds bitmap files by looking them up in directory listings rather than checking each candidate path for existence.
+    Each directory is read once with `os.scandir()` the first time it is needed and the listing is kept between imports.
+    Listings are only read again if the directory's modification time has changed, which is checked once per resolver.
+    Path components are matched case insensitively, the same as they would be on Windows.
+    '''
+
+    scans: int # number of directories read by this resolver
+    _validated: Set[str]
+
+    def __init__(self) -> None:
+        self.scans = 0
+        self._validated = set()
+
+    def _get_listing(self, directory: str) -> Optional[_Listing]:
+        key = os.path.normcase(os.path.abspath(directory))
+
+        with _listings_lock:
+            listing = _listings.get(key)
+            if key in self._validated:
+                return listing
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            if listing is None or listing[0] != mtime:
+                files, subdirs = dict(), dict()
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        (subdirs if entry.is_dir() else files).setdefault(entry.name.lower(), entry.name)
+                listing = (mtime, files, subdirs)
+                self.scans += 1
+        except OSError:
+            listing = None # missing or inaccessible
+
+        with _listings_lock:
+            self._validated.add(key)
+            if listing is None:
+                _listings.pop(key, None)
+            else:
+                _listings[key] = listing
+
+        return listing
+
+    def find(self, root: str, relative_path: str, extensions: Iterable[str]) -> Optional[str]:
+        '''
+        Gets the path of the first file that exists at `root/relative_path.ext` for each extension in order, or None if none of them exist.
+        Any extension already on `relative_path` is replaced, the same as `Path.with_suffix()`.
+        '''
+
+        parts = [p for p in re.split(r'[\\/]', relative_path) if p]
+        if not root or not parts:
+            return None
+
+        directory = root
+        for part in parts[:-1]:
+            listing = self._get_listing(directory)
+            name = listing[2].get(part.lower()) if listing else None
+            if name is None:
+                return None
+            directory = os.path.join(directory, name)
+
+        listing = self._get_listing(directory)
+        if listing is None:
+            return None
+
+        stem = os.path.splitext(parts[-1])[0].lower()
+        for ext in extensions:
+            name = listing[1].get(f'{stem}.{ext.lower()}')
+            if name is not None:
+                return os.path.join(directory, name)
+
+        return None
+
+    @staticmethod
+    def clear_cache():
+        ''' Discards the directory listings kept from previous imports '''
+        with _listings_lock:
+            _listings.clear()
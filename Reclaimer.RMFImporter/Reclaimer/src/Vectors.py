@@ -5,8 +5,14 @@ from typing import List, Tuple, Union, Iterable, Callable
 
 from .Types import IVector
 
+try:
+    import numpy as np
+except ImportError:
+    np = None # vectorized decoding is unavailable, fall back to decoding one vector at a time
+
 __all__ = [
     'DescriptorFlags',
+    'DataType',
     'BitConfig',
     'NormalisedVector',
     'PackedVector',
@@ -70,6 +76,16 @@ class BitConfig:
             value = -(value & self.signExtend) | (value & (self.signExtend - 1))
         return value / self.scale if self.normalized else value
 
+    def get_values(self, bits: 'np.ndarray') -> 'np.ndarray':
+        ''' Vectorized equivalent of `get_value()` that operates on an int64 array of source values '''
+        values = (bits >> self.offset) & self.lengthMask
+        if self.signMode == DescriptorFlags.SIGN_SHIFTED:
+            values = values - int(self.scale)
+        elif self.signMode == DescriptorFlags.SIGN_EXTENDED:
+            # same result as the scalar sign extension, ie subtract 2^length when the sign bit is set
+            values = np.where((values & self.signExtend) > 0, values - (self.signExtend << 1), values)
+        return values / self.scale if self.normalized else values
+
 
 class NormalisedVector(IVector):
     ''' A vector consisting of separate integer values that are normalised into floats '''
@@ -168,6 +184,51 @@ class VectorDescriptor:
     def decode(self, data: bytes, vector_index: int) -> Iterable[float]:
         return self._decode_func(data, vector_index)
 
+    def decode_all(self, data: bytes, offset: int, count: int) -> Union['np.ndarray', List[Tuple[float, ...]]]:
+        '''
+        Decodes `count` vectors starting from the vector at index `offset` in a single pass.
+        Returns a float32 array with a shape of (count, dimensions) with values identical to those returned by `decode()`.
+        If NumPy is not available, returns a list of tuples produced by `decode()` instead.
+        '''
+
+        if np is None:
+            return [tuple(self.decode(data, offset + i)) for i in range(count)]
+
+        byte_offset = offset * self._total_bytes
+
+        if self._datatype == DataType.REAL:
+            values = np.frombuffer(data, dtype='<f4', count=count * self._count, offset=byte_offset)
+            return values.reshape(count, self._count).astype(np.float32, copy=False)
+
+        source_dtype = f'<u{self._size}'
+
+        if self._datatype == DataType.INTEGER:
+            source = np.frombuffer(data, dtype=source_dtype, count=count * self._count, offset=byte_offset).reshape(count, self._count)
+            columns = (config.get_values(source[:, i].astype(np.int64)) for i, config in enumerate(self._bitmasks))
+        else:
+            source = np.frombuffer(data, dtype=source_dtype, count=count, offset=byte_offset).astype(np.int64)
+            columns = (config.get_values(source) for config in self._bitmasks)
+
+        result = np.empty((count, self._count), dtype=np.float32)
+        for i, column in enumerate(columns):
+            result[:, i] = column
+        return result
+
+    def gather(self, data: bytes, offset: int, vector_ids: Iterable[int]) -> bytes:
+        '''
+        Copies the binary data of the specified vectors (relative to the vector at index `offset`) into a new contiguous block of data.
+        The vectors are copied in the order given, without being decoded.
+        '''
+
+        vector_size = self._total_bytes
+
+        if np is None:
+            return b''.join(_get_vector_bytes(data, offset + i, vector_size) for i in vector_ids)
+
+        # treat each vector as a single opaque element so they can be gathered in one operation
+        source = np.frombuffer(data, dtype=f'V{vector_size}', count=len(data) // vector_size)
+        return source.take(np.asarray(vector_ids, dtype=np.int64) + offset).tobytes()
+
     def __str__(self) -> str:
         value_bits = self._size * 8
         value_count = self._count
@@ -1,10 +1,15 @@
 import itertools
-from typing import List, Tuple, Iterator, Iterable
+from typing import List, Dict, Tuple, Iterator, Iterable, Union, Optional
 from collections.abc import Sequence
 
 from .Model import MeshFlags
 from .Vectors import VectorDescriptor
 
+try:
+    import numpy as np
+except ImportError:
+    np = None # vectorized blend data is unavailable, fall back to building it from enumerate_blendpairs()
+
 __all__ = [
     'VertexBuffer',
     'VectorBuffer'
@@ -64,6 +69,83 @@ class VertexBuffer:
 
             yield (i, indices, weights)
 
+    def get_blend_arrays(self, mesh_flags: MeshFlags) -> Tuple[Union['np.ndarray', List[int]], Union['np.ndarray', List[int]], Union['np.ndarray', List[float]]]:
+        '''
+        Gets the blend data of every vertex as a tuple of (offsets, blendindices, blendweights) in CSR layout.
+        The blend pairs of vertex `i` are `blendindices[offsets[i]:offsets[i + 1]]` and `blendweights[offsets[i]:offsets[i + 1]]`.
+        Zero weights are removed and the weights are normalised the same way as `enumerate_blendpairs()`.
+        Rigid vertices (no blend weight channels) have a single pair with a weight of 1.
+        Returns int32/float32 arrays, or lists when NumPy is not available.
+        '''
+
+        if np is None:
+            offsets, indices, weights = [0], [], []
+            rigid = len(self.blendweight_channels) == 0
+            for _, vertex_indices, vertex_weights in self.enumerate_blendpairs(mesh_flags):
+                pairs = list(zip(vertex_indices, [1.0] if rigid else vertex_weights))
+                indices.extend(int(bi) for bi, _ in pairs)
+                weights.extend(bw for _, bw in pairs)
+                offsets.append(len(indices))
+            return (offsets, indices, weights)
+
+        count = len(self.position_channels[0])
+        blend_indices = np.concatenate([c.to_array() for c in self.blendindex_channels], axis=1).astype(np.int32)
+
+        if len(self.blendweight_channels) == 0:
+            # rigid: only the first index is used, with full weight
+            return (np.arange(count + 1, dtype=np.int32), blend_indices[:, 0].copy(), np.ones(count, dtype=np.float32))
+
+        blend_weights = np.concatenate([c.to_array() for c in self.blendweight_channels], axis=1)
+        if mesh_flags & MeshFlags.USE_IMPLIED_BLENDWEIGHTS > 0:
+            blend_weights = np.concatenate((blend_weights, np.ones((count, 1), dtype=np.float32)), axis=1)
+
+        # only weights with a corresponding index make a pair
+        width = min(blend_indices.shape[1], blend_weights.shape[1])
+        blend_indices, blend_weights = blend_indices[:, :width], blend_weights[:, :width]
+
+        # zero weighted pairs are only filtered from vertices that have at least one zero weight
+        keep = (blend_weights > 0) | ~(blend_weights == 0).any(axis=1, keepdims=True)
+        blend_weights = np.where(keep, blend_weights, 0)
+        weight_sums = blend_weights.sum(axis=1, keepdims=True)
+        blend_weights = np.divide(blend_weights, weight_sums, out=blend_weights, where=weight_sums > 0)
+
+        offsets = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(keep.sum(axis=1), out=offsets[1:])
+        return (offsets, blend_indices[keep], blend_weights[keep].astype(np.float32, copy=False))
+
+    def get_bone_weights(self, mesh_flags: MeshFlags, blend_arrays: Optional[Tuple] = None) -> Dict[int, Tuple[Union['np.ndarray', List[int]], Union['np.ndarray', List[float]]]]:
+        '''
+        Gets the blend data grouped by bone index, as a dictionary of bone index to (vertex indices, weights).
+        Vertices that reference the same bone more than once have the weights of those pairs combined.
+        `blend_arrays` can be used to pass in the result of `get_blend_arrays()` if it has already been calculated.
+        See `get_blend_arrays()` for details.
+        '''
+
+        offsets, indices, weights = blend_arrays if blend_arrays is not None else self.get_blend_arrays(mesh_flags)
+
+        if np is None:
+            groups = dict()
+            for vi in range(len(offsets) - 1):
+                for j in range(offsets[vi], offsets[vi + 1]):
+                    group = groups.setdefault(indices[j], dict())
+                    group[vi] = group.get(vi, 0.0) + weights[j]
+            return { bi: (list(group.keys()), list(group.values())) for bi, group in sorted(groups.items()) }
+
+        count = len(offsets) - 1
+        if len(indices) == 0:
+            return dict()
+
+        # combine each (bone, vertex) pair into a single key so duplicates can be merged and the result comes out sorted by bone
+        vertex_ids = np.repeat(np.arange(count, dtype=np.int64), np.diff(offsets))
+        keys, inverse = np.unique(indices.astype(np.int64) * count + vertex_ids, return_inverse=True)
+        key_weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys)).astype(np.float32)
+        key_bones = keys // count
+        key_vertices = (keys % count).astype(np.int32)
+
+        bones, starts = np.unique(key_bones, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        return { int(b): (key_vertices[s:e], key_weights[s:e]) for b, s, e in zip(bones, starts, ends) }
+
     def slice(self, offset: int, count: int) -> 'VertexBuffer':
         result = VertexBuffer()
         result.count = count
@@ -75,14 +157,26 @@ class VertexBuffer:
         result.color_channels = list(c.slice(offset, count) for c in self.color_channels)
         return result
 
+    def gather(self, vertex_ids: Sequence[int]) -> 'VertexBuffer':
+        ''' Creates a new vertex buffer that contains only the specified vertices (in the order given) across all channels '''
+        result = VertexBuffer()
+        result.count = len(vertex_ids)
+        result.position_channels = list(c.gather(vertex_ids) for c in self.position_channels)
+        result.texcoord_channels = list(c.gather(vertex_ids) for c in self.texcoord_channels)
+        result.normal_channels = list(c.gather(vertex_ids) for c in self.normal_channels)
+        result.blendindex_channels = list(c.gather(vertex_ids) for c in self.blendindex_channels)
+        result.blendweight_channels = list(c.gather(vertex_ids) for c in self.blendweight_channels)
+        result.color_channels = list(c.gather(vertex_ids) for c in self.color_channels)
+        return result
+
 
 class VectorBuffer(Sequence):
-    _binary: bytes
+    _binary: Union[bytes, memoryview] # may be a view into a memory mapped file
     _descriptor: VectorDescriptor
     _count: int
     _offset: int
 
-    def __init__(self, data: bytes, descriptor: VectorDescriptor, count: int):
+    def __init__(self, data: Union[bytes, memoryview], descriptor: VectorDescriptor, count: int):
         self._binary = data
         self._descriptor = descriptor
         self._count = count
@@ -96,7 +190,24 @@ class VectorBuffer(Sequence):
     def __len__(self) -> int:
         return self._count
 
+    def to_array(self) -> Union['np.ndarray', List[Tuple[float, ...]]]:
+        '''
+        Decodes every vector in the buffer into a float32 array with a shape of (count, dimensions).
+        See `VectorDescriptor.decode_all()` for the fallback behaviour when NumPy is not available.
+        '''
+        return self._descriptor.decode_all(self._binary, self._offset, self._count)
+
+    def get_bytes(self) -> memoryview:
+        ''' Gets the binary data of the vectors in the buffer, without copying '''
+        size = self._descriptor._total_bytes
+        return memoryview(self._binary)[self._offset * size:(self._offset + self._count) * size]
+
     def slice(self, offset: int, count: int) -> 'VectorBuffer':
         result = VectorBuffer(self._binary, self._descriptor, count)
         result._offset = offset
-        return result;
\ No newline at end of file
+        return result;
+
+    def gather(self, vector_ids: Sequence[int]) -> 'VectorBuffer':
+        ''' Creates a new buffer that contains a copy of only the specified vectors (in the order given) '''
+        data = self._descriptor.gather(self._binary, self._offset, vector_ids)
+        return VectorBuffer(data, self._descriptor, len(vector_ids))
\ No newline at end of file
@@ -1,5 +1,6 @@
 import itertools
-from typing import TypeVar, Generic, Tuple, List, Iterator
+from functools import partial
+from typing import TypeVar, Generic, Tuple, List, Dict, Iterator, Union, Hashable, Callable
 
 from .ImportOptions import *
 from .SceneFilter import *
@@ -9,8 +10,14 @@ from .Material import *
 from .Types import *
 from .VertexBuffer import *
 from .IndexBuffer import *
+from .GeometryCache import GeometryCache
 from .Progress import *
 
+try:
+    import numpy as np
+except ImportError:
+    np = None # faces are returned as lists of triangles
+
 __all__ = [
     'MeshKey',
     'ModelState',
@@ -25,6 +32,7 @@ class ModelState():
     model: Model
     filter: ModelFilter
     display_name: str
+    bone_transforms: List = None # world transform of each bone, see ViewportInterface.get_bone_transforms()
 
     def __init__(self, model: Model, filter: ModelFilter, display_name: str) -> None:
         self.model = model
@@ -50,9 +58,14 @@ class MeshParams:
     index_buffer: IndexBuffer
     mesh_key: MeshKey
     display_name: str
-    triangle_sets: List[Tuple[int, List[Triangle]]] # list of (material_index, triangles)
-
-    def __init__(self, scene: Scene, mesh: Mesh, segment: MeshSegment, mesh_key: MeshKey, display_name: str) -> None:
+    triangle_arrays: List[Tuple[int, Union['np.ndarray', List[Triangle]]]] # list of (material_index, triangles) where triangles is an int32 array of shape (triangles, 3), or a list of triangles when NumPy is not available
+    _cache: GeometryCache
+    _vertex_key: Tuple
+    _faces_key: Tuple
+    _triangle_sets: List[Tuple[int, List[Triangle]]]
+    _prepared: Dict[Hashable, object] # values calculated in advance by prepare()
+
+    def __init__(self, scene: Scene, mesh: Mesh, segment: MeshSegment, mesh_key: MeshKey, display_name: str, cache: GeometryCache = None) -> None:
         self.source_mesh = mesh
         self.source_segment = segment
         self.mesh_flags = mesh.flags
@@ -61,27 +74,104 @@ class MeshParams:
         self.texture_transform = mesh.texture_transform
         self.mesh_key = mesh_key
         self.display_name = display_name
+        self._cache = cache if cache is not None else GeometryCache(0) # a zero budget cache never stores anything
+        self._prepared = dict()
+        self._triangle_sets = None
 
         vertex_buffer = scene.vertex_buffer_pool[mesh.vertex_buffer_index]
         index_buffer = scene.index_buffer_pool[mesh.index_buffer_index]
+        buffer_key = (mesh.index_buffer_index, mesh.vertex_buffer_index)
 
+        # cache keys use the index ranges rather than the segment objects since different meshes may share the same geometry
         if segment is None:
             # use the entire mesh
             self.vertex_buffer = vertex_buffer
             self.index_buffer = index_buffer
-            self.triangle_sets = [(s.material_index, list(self.index_buffer.get_triangles(s))) for s in mesh.segments]
+            self._vertex_key = (mesh.vertex_buffer_index, )
+            self._faces_key = ('faces', *buffer_key, *((s.index_start, s.index_length) for s in mesh.segments))
+            self.triangle_arrays = [(s.material_index, self._cache.get(('triangles', *buffer_key, s.index_start, s.index_length), partial(index_buffer.get_triangle_array, s))) for s in mesh.segments]
         else:
             # only use a specific mesh segment
-            # note that this can result in unused verts
-            # for example, a segment with a single triangle of 0-8-9 would need all 10 vertices in order to keep the indices in alignment
-            # detecting+removing unused verts and shifting all the indices would probably be a slow process and a lot more memory intensive
-            offset, count = index_buffer.get_vertex_range(segment)
-            self.vertex_buffer = vertex_buffer.slice(offset, count)
-            self.index_buffer = index_buffer.relative_slice(segment)
-            self.triangle_sets = [(segment.material_index, list(self.index_buffer.get_triangles(0, -1)))]
+            # the indices are remapped to only the vertices used by the segment, so unused vertices are not included
+            # for example, a segment with a single triangle of 0-8-9 becomes a single triangle of 0-1-2 with a copy of just those 3 vertices
+            def get_segment():
+                vertex_ids, segment_indices = index_buffer.compact_slice(segment)
+                return (vertex_buffer.gather(vertex_ids), segment_indices, segment_indices.get_triangle_array(0, -1))
+
+            self._vertex_key = (*buffer_key, segment.index_start, segment.index_length)
+            self._faces_key = None # the only triangle array is already the full set of faces
+            self.vertex_buffer, self.index_buffer, triangles = self._cache.get(('segment', *self._vertex_key), get_segment)
+            self.triangle_arrays = [(segment.material_index, triangles)]
+
+    @property
+    def triangle_sets(self) -> List[Tuple[int, List[Triangle]]]:
+        ''' Gets `triangle_arrays` with each array converted to a list of triangles. The lists are created on first use and are not cached in the geometry cache. '''
+        if self._triangle_sets is None:
+            self._triangle_sets = [(mi, triangles if isinstance(triangles, list) else list(map(tuple, triangles.tolist()))) for mi, triangles in self.triangle_arrays]
+        return self._triangle_sets
+
+    def get_array(self, channel: str, index: int = 0) -> Union['np.ndarray', List[Tuple[float, ...]]]:
+        '''
+        Gets the decoded values of a vertex buffer channel using the geometry cache, so each channel only gets decoded once per import.
+        `channel` is one of 'position', 'texcoord', 'normal', 'blendindex', 'blendweight' or 'color'.
+        See `VectorBuffer.to_array()` for details of the return value.
+        '''
+        channels = getattr(self.vertex_buffer, f'{channel}_channels')
+        return self._get(('channel', *self._vertex_key, channel, index), channels[index].to_array)
+
+    def get_blend_arrays(self) -> Tuple[Union['np.ndarray', List[int]], Union['np.ndarray', List[int]], Union['np.ndarray', List[float]]]:
+        ''' Gets the blend data of every vertex in CSR layout using the geometry cache. See `VertexBuffer.get_blend_arrays()` for details. '''
+        return self._get(('blend', *self._vertex_key, int(self.mesh_flags)), partial(self.vertex_buffer.get_blend_arrays, self.mesh_flags))
+
+    def get_bone_weights(self) -> Dict[int, Tuple[Union['np.ndarray', List[int]], Union['np.ndarray', List[float]]]]:
+        ''' Gets the blend data grouped by bone index. See `VertexBuffer.get_bone_weights()` for details. '''
+        return self.vertex_buffer.get_bone_weights(self.mesh_flags, self.get_blend_arrays())
+
+    def get_faces(self) -> Union['np.ndarray', List[Triangle]]:
+        ''' Gets all triangles across all material ids as an int32 array of shape (triangles, 3), or a list of triangles when NumPy is not available '''
+        if len(self.triangle_arrays) == 1:
+            return self.triangle_arrays[0][1]
+        return self._get(self._faces_key, self._concatenate_triangles)
+
+    def _concatenate_triangles(self) -> Union['np.ndarray', List[Triangle]]:
+        if np is None:
+            return list(self.chain_triangles())
+        return np.concatenate([t for _, t in self.triangle_arrays] or [np.empty((0, 3), dtype=np.int32)])
+
+    def prepare(self, options: ImportOptions) -> 'MeshParams':
+        '''
+        Calculates everything the viewport interfaces need to build the mesh (decoded vertex channels, faces and blend data) and keeps a reference to the
+        results, so they do not need to be calculated when the mesh is built and cannot be evicted from the geometry cache in the meantime.
+        This only reads from the source buffers, so it is safe to call on a worker thread.
+        '''
+
+        vertex_buffer = self.vertex_buffer
+        channels = [('position', 0)]
+        if options.IMPORT_NORMALS and vertex_buffer.normal_channels:
+            channels.append(('normal', 0))
+        if options.IMPORT_UVW:
+            channels.extend(('texcoord', i) for i in range(len(vertex_buffer.texcoord_channels)))
+        if options.IMPORT_COLORS:
+            channels.extend(('color', i) for i in range(len(vertex_buffer.color_channels)))
+
+        for channel, index in channels:
+            key = ('channel', *self._vertex_key, channel, index)
+            self._prepared[key] = self.get_array(channel, index)
+
+        if options.IMPORT_BONES and options.IMPORT_SKIN and vertex_buffer.blendindex_channels and self.bone_index < 0:
+            key = ('blend', *self._vertex_key, int(self.mesh_flags))
+            self._prepared[key] = self.get_blend_arrays()
+
+        if len(self.triangle_arrays) > 1:
+            self._prepared[self._faces_key] = self.get_faces()
+        return self
+
+    def _get(self, key: Hashable, factory: Callable[[], object]) -> object:
+        value = self._prepared.get(key)
+        return value if value is not None else self._cache.get(key, factory)
 
     def chain_triangles(self) -> Iterator[Triangle]:
-        ''' Iterates over all triangles across all material ids '''
+        ''' Iterates over all triangles across all material ids as tuples '''
         if len(self.triangle_sets) == 1:
             return self.triangle_sets[0][1]
         triangles = (t[1] for t in self.triangle_sets)
@@ -123,6 +213,13 @@ class ViewportInterface(Generic[TMaterial, TCollection, TMatrix, TModelState, TR
     def create_transform(self, transform: Matrix4x4, bone_mode: bool = False) -> TMatrix:
         ...
 
+    def get_bone_transforms(self, model_state: TModelState) -> List[TMatrix]:
+        ''' Gets the world transform of each bone in the model, calculated once per model and cached on the model state '''
+        if model_state.bone_transforms is None:
+            local_transforms = [self.create_transform(b.transform, True) for b in model_state.model.bones]
+            model_state.bone_transforms = model_state.model.get_world_transforms(local_transforms, self.multiply_transform)
+        return model_state.bone_transforms
+
     def init_model(self, model: Model, filter: ModelFilter, collection: TCollection, display_name: str) -> TModelState:
         ...
 
@@ -0,0 +1,171 @@
+'''
+Benchmarks for the DCC-agnostic parts of the importer, using synthetic RMF files written by `RmfWriter`.
+
+Usage (from the Reclaimer.RMFImporter directory):
+    python -m Reclaimer.tests.Benchmark [--output report.json] [--compare baseline.json] [--repeat 5] [--case name]
+
+The report is a JSON file that can be passed to `--compare` when running the benchmarks on another commit.
+'''
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+from typing import List, Dict, Callable
+
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+from ..src.Scene import Scene
+from ..src.SceneReader import SceneReader
+from ..src.SceneFilter import SceneFilter
+from ..src.SceneBuilder import SceneBuilder
+from ..headless import NullInterface
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # the array benchmarks will measure the fallback path
+
+__all__ = [
+    'CASES',
+    'run_benchmarks',
+    'compare_reports'
+]
+
+
+CASES: Dict[str, SyntheticSceneParams] = {
+    'props': SyntheticSceneParams(model_count=64, placement_count=256, vertex_count=500, bone_count=0, marker_count=2, blend_index_format=None),
+    'character': SyntheticSceneParams(model_count=1, placement_count=1, vertex_count=50000, segment_count=8, bone_count=64, triangle_strips=True),
+    'packed': SyntheticSceneParams(model_count=8, placement_count=32, vertex_count=8000, position_format='Int16N3', normal_format='DecN4', texcoord_format='UHenDN3', color_format='UByteN4'),
+    'implied': SyntheticSceneParams(model_count=4, placement_count=4, vertex_count=10000, bone_count=32, blend_weight_format='UInt16N3', implied_blendweights=True),
+}
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    ''' Returns the fastest of `repeat` calls to `func`, in seconds '''
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _decode_channels(scene: Scene):
+    for buf in scene.vertex_buffer_pool:
+        for channel in (*buf.position_channels, *buf.texcoord_channels, *buf.normal_channels, *buf.color_channels):
+            list(channel)
+
+def _decode_channel_arrays(scene: Scene):
+    for buf in scene.vertex_buffer_pool:
+        for channel in (*buf.position_channels, *buf.texcoord_channels, *buf.normal_channels, *buf.color_channels):
+            channel.to_array()
+
+def _get_triangles(scene: Scene):
+    for model in scene.model_pool:
+        for mesh in model.meshes:
+            list(scene.index_buffer_pool[mesh.index_buffer_index].get_triangles(mesh))
+
+def _enumerate_blendpairs(scene: Scene):
+    for model in scene.model_pool:
+        for mesh in model.meshes[:1]:
+            buf = scene.vertex_buffer_pool[mesh.vertex_buffer_index]
+            if buf.blendindex_channels:
+                list(buf.enumerate_blendpairs(mesh.flags))
+
+def _get_blend_arrays(scene: Scene):
+    for model in scene.model_pool:
+        for mesh in model.meshes[:1]:
+            buf = scene.vertex_buffer_pool[mesh.vertex_buffer_index]
+            if buf.blendindex_channels:
+                buf.get_blend_arrays(mesh.flags)
+
+def _build_scene(scene: Scene):
+    builder = SceneBuilder(NullInterface(), scene)
+    with contextlib.redirect_stdout(io.StringIO()):
+        task_queue = builder.begin_create_scene()
+        while not task_queue.finished():
+            task_queue.execute_next()
+        builder.end_create_scene()
+
+    if task_queue.error:
+        raise task_queue.error
+
+
+def run_benchmarks(cases: Dict[str, SyntheticSceneParams] = None, repeat: int = 5) -> Dict[str, object]:
+    ''' Runs the benchmarks for each case and returns the report '''
+
+    cases = cases or CASES
+    results = dict()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, params in cases.items():
+            path = write_synthetic_scene(os.path.join(temp_dir, f'{name}.rmf'), params)
+            scene = SceneReader.open_scene(path)
+
+            results[name] = {
+                'open_scene': _time(lambda: SceneReader.open_scene(path), repeat),
+                'open_scene_mmap': _time(lambda: SceneReader.open_scene(path, memory_map=True), repeat),
+                'open_scene_lazy': _time(lambda: SceneReader.open_scene(path, lazy=True), repeat),
+                'decode_channels': _time(lambda: _decode_channels(scene), repeat),
+                'decode_channel_arrays': _time(lambda: _decode_channel_arrays(scene), repeat),
+                'get_triangles': _time(lambda: _get_triangles(scene), repeat),
+                'enumerate_blendpairs': _time(lambda: _enumerate_blendpairs(scene), repeat),
+                'get_blend_arrays': _time(lambda: _get_blend_arrays(scene), repeat),
+                'scene_filter': _time(lambda: SceneFilter(scene), repeat),
+                'scene_builder': _time(lambda: _build_scene(scene), repeat),
+            }
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'repeat': repeat,
+        'results': results
+    }
+
+def compare_reports(baseline: Dict[str, object], current: Dict[str, object]) -> List[str]:
+    ''' Returns the lines of a table comparing each timing in `current` against `baseline` '''
+
+    lines = [f'{"case":<12}{"benchmark":<24}{"baseline":>12}{"current":>12}{"ratio":>8}']
+    for case, timings in current['results'].items():
+        base_timings = baseline['results'].get(case, dict())
+        for key, value in timings.items():
+            base = base_timings.get(key)
+            if base is None:
+                lines.append(f'{case:<12}{key:<24}{"-":>12}{value * 1000:>10.2f}ms{"-":>8}')
+            else:
+                ratio = value / base if base > 0 else float('inf')
+                lines.append(f'{case:<12}{key:<24}{base * 1000:>10.2f}ms{value * 1000:>10.2f}ms{ratio:>7.2f}x')
+    return lines
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Runs the RMF importer benchmarks against synthetic scenes')
+    parser.add_argument('--output', help='path to write the JSON report to')
+    parser.add_argument('--compare', help='path of a previous JSON report to compare against')
+    parser.add_argument('--repeat', type=int, default=5, help='number of times to run each benchmark (the fastest time is reported)')
+    parser.add_argument('--case', action='append', choices=list(CASES), help='only run the specified case(s)')
+    args = parser.parse_args(args)
+
+    cases = { k: CASES[k] for k in args.case } if args.case else CASES
+    report = run_benchmarks(cases, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        lines = compare_reports(baseline, report)
+    else:
+        lines = compare_reports({ 'results': dict() }, report)
+
+    print('\n'.join(lines))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,485 @@
+import io
+import math
+import random
+import struct
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+
+from ..src.Vectors import DataType, DescriptorFlags
+
+__all__ = [
+    'DESCRIPTORS',
+    'SyntheticSceneParams',
+    'RmfWriter',
+    'write_synthetic_scene'
+]
+
+
+# block codes, matching Reclaimer.Core/Geometry/Utilities/BlockCodes.cs
+class SceneCodes:
+    FILE_HEADER = 'RMF!'
+    LIST = 'list'
+    STRING_LIST = 'STRS'
+    ATTRIBUTE_DATA = 'ATTR'
+    CUSTOM_PROPERTIES = 'CUST'
+    MATRIX_3X4 = 'M3x4'
+    SCENE_GROUP = 'NODE'
+    SCENE_OBJECT = 'OBJE'
+    PLACEMENT = 'PLAC'
+    MODEL_REFERENCE = 'MOD*'
+    MODEL = 'MODL'
+    MATERIAL = 'MATL'
+    TEXTURE_MAPPING = 'TMAP'
+    TEXTURE = 'BITM'
+    TINT = 'TINT'
+    REGION = 'REGN'
+    PERMUTATION = 'PERM'
+    MARKER = 'MARK'
+    MARKER_INSTANCE = 'MKIN'
+    BONE = 'BONE'
+    MESH = 'MESH'
+    MESH_SEGMENT = 'MSEG'
+    VECTOR_DESCRIPTOR = 'VECD'
+    VERTEX_BUFFER = 'VBUF'
+    INDEX_BUFFER = 'IBUF'
+    DATA = 'DATA'
+
+
+class VertexChannelCodes:
+    POSITION = 'POSN'
+    TEXTURE_COORDINATE = 'TEXC'
+    NORMAL = 'NORM'
+    TANGENT = 'TANG'
+    BINORMAL = 'BNRM'
+    BLEND_INDEX = 'BLID'
+    BLEND_WEIGHT = 'BLWT'
+    COLOR = 'COLR'
+
+
+DescriptorSpec = Tuple[int, int, Tuple[Tuple[int, int], ...]] # datatype, size, ((flags, bits), ...)
+
+_SNORM = DescriptorFlags.NORMALIZED | DescriptorFlags.SIGN_EXTENDED
+_UNORM = DescriptorFlags.NORMALIZED
+_NSHIFT = DescriptorFlags.NORMALIZED | DescriptorFlags.SIGN_SHIFTED
+
+def _real(count: int) -> DescriptorSpec:
+    return (DataType.REAL, 4, tuple((0, 32) for _ in range(count)))
+
+def _integer(size: int, count: int, flags: int) -> DescriptorSpec:
+    return (DataType.INTEGER, size, tuple((flags, size * 8) for _ in range(count)))
+
+def _packed(size: int, flags: int, *bits: int) -> DescriptorSpec:
+    return (DataType.PACKED, size, tuple((flags, b) for b in bits))
+
+# the same descriptors that Reclaimer.Core/Geometry/Utilities/VectorDescriptor.cs can produce
+DESCRIPTORS: Dict[str, DescriptorSpec] = {
+    'Float32_2': _real(2),
+    'Float32_3': _real(3),
+    'Float32_4': _real(4),
+    'Int16N2': _integer(2, 2, _SNORM),
+    'Int16N3': _integer(2, 3, _SNORM),
+    'Int16N4': _integer(2, 4, _SNORM),
+    'UInt16N2': _integer(2, 2, _UNORM),
+    'UInt16N3': _integer(2, 3, _UNORM),
+    'UInt16N4': _integer(2, 4, _UNORM),
+    'UShort2': _integer(2, 2, 0),
+    'ByteN4': _integer(1, 4, _SNORM),
+    'UByteN4': _integer(1, 4, _UNORM),
+    'UByte4': _integer(1, 4, 0),
+    'DecN4': _packed(4, _SNORM, 10, 10, 10, 2),
+    'DHenN3': _packed(4, _SNORM, 10, 11, 11),
+    'HenDN3': _packed(4, _SNORM, 11, 11, 10),
+    'UDecN4': _packed(4, _UNORM, 10, 10, 10, 2),
+    'UDHenN3': _packed(4, _UNORM, 10, 11, 11),
+    'UHenDN3': _packed(4, _UNORM, 11, 11, 10),
+    'DecN4S': _packed(4, _NSHIFT, 10, 10, 10, 2),
+}
+
+
+@dataclass
+class SyntheticSceneParams:
+    ''' Parameters for `write_synthetic_scene` '''
+    model_count: int = 4
+    placement_count: int = 16
+    vertex_count: int = 2000
+    segment_count: int = 2
+    region_count: int = 2
+    permutation_count: int = 2
+    bone_count: int = 8
+    marker_count: int = 4
+    material_count: int = 4
+    position_format: str = 'Float32_3'
+    normal_format: str = 'DHenN3'
+    texcoord_format: str = 'UInt16N2'
+    color_format: Optional[str] = None
+    blend_index_format: Optional[str] = 'UByte4'
+    blend_weight_format: Optional[str] = 'UByteN4'
+    implied_blendweights: bool = False
+    triangle_strips: bool = False
+    seed: int = 0
+
+
+class RmfWriter:
+    ''' A minimal python equivalent of `SceneWriter.cs` that writes raw block data '''
+
+    _stream: io.BytesIO
+    _strings: Dict[str, int]
+
+    def __init__(self):
+        self._stream = io.BytesIO()
+        self._strings = dict()
+
+    def getvalue(self) -> bytes:
+        return self._stream.getvalue()
+
+    def string_index(self, value: str) -> int:
+        if value not in self._strings:
+            self._strings[value] = len(self._strings)
+        return self._strings[value]
+
+    def write(self, format: str, *values):
+        self._stream.write(struct.pack(f'<{format}', *values))
+
+    def write_bytes(self, data: bytes):
+        self._stream.write(data)
+
+    def write_stringref(self, value: str):
+        self.write('i', self.string_index(value))
+
+    def write_matrix3x3(self, m):
+        for row in m[:3]:
+            self.write('3f', *row[:3])
+
+    def write_matrix3x4(self, m):
+        for row in m:
+            self.write('3f', *row[:3])
+
+    def write_matrix4x4(self, m):
+        for row in m:
+            self.write('4f', *row)
+
+    @contextmanager
+    def block(self, code: str):
+        self._stream.write(code.encode())
+        pointer = self._stream.tell()
+        self.write('i', 0)
+        yield
+        end = self._stream.tell()
+        self._stream.seek(pointer)
+        self.write('i', end)
+        self._stream.seek(end)
+
+    @contextmanager
+    def list_block(self, code: str, count: int):
+        with self.block(SceneCodes.LIST):
+            self._stream.write(code.encode())
+            self.write('i', count)
+            yield
+
+    def write_string_table(self):
+        with self.block(SceneCodes.STRING_LIST):
+            strings = list(self._strings.keys())
+            self.write('i', len(strings))
+            for s in strings:
+                data = s.encode()
+                self.write('i', len(data))
+                self._stream.write(data)
+
+
+_IDENTITY = ((1., 0., 0., 0.), (0., 1., 0., 0.), (0., 0., 1., 0.), (0., 0., 0., 1.))
+
+def _translation(x: float, y: float, z: float):
+    return ((1., 0., 0., 0.), (0., 1., 0., 0.), (0., 0., 1., 0.), (x, y, z, 1.))
+
+def _encode_vector(spec: DescriptorSpec, values: List[float]) -> bytes:
+    ''' Encodes a vector of values in the range of the descriptor (-1 to 1 for signed normalized, 0 to 1 for unsigned normalized) '''
+    datatype, size, dimensions = spec
+    if datatype == DataType.REAL:
+        return struct.pack(f'<{len(dimensions)}f', *values[:len(dimensions)])
+
+    def encode_value(value: float, flags: int, bits: int) -> int:
+        sign_mode = flags & DescriptorFlags.SIGN_MASK
+        normalized = flags & DescriptorFlags.NORMALIZED
+        if sign_mode:
+            scale = (1 << bits - 1) - 1
+            v = int(round(value * scale)) if normalized else int(value)
+            if sign_mode == DescriptorFlags.SIGN_SHIFTED:
+                return (v + scale) & ((1 << bits) - 1)
+            return v & ((1 << bits) - 1)
+        scale = (1 << bits) - 1
+        return int(round(value * scale)) if normalized else int(value)
+
+    formats = { 1: 'B', 2: 'H', 4: 'I' }
+    encoded = [encode_value(v, flags, bits) for v, (flags, bits) in zip(values, dimensions)]
+
+    if datatype == DataType.INTEGER:
+        return struct.pack(f'<{len(dimensions)}{formats[size]}', *encoded)
+
+    packed, offset = 0, 0
+    for v, (_, bits) in zip(encoded, dimensions):
+        packed |= v << offset
+        offset += bits
+    return struct.pack(f'<{formats[size]}', packed)
+
+
+class _Geometry:
+    ''' Generates a grid of vertices with triangles split into segments '''
+
+    def __init__(self, params: SyntheticSceneParams, rng: random.Random):
+        self.params = params
+        columns = max(2, int(math.sqrt(params.vertex_count)))
+        rows = max(2, params.vertex_count // columns)
+        self.vertex_count = columns * rows
+        self.columns, self.rows = columns, rows
+        self.rng = rng
+
+        # build a triangle list for the whole grid, then split it into contiguous segments
+        triangles = []
+        for r in range(rows - 1):
+            for c in range(columns - 1):
+                i = r * columns + c
+                triangles.append((i, i + 1, i + columns))
+                triangles.append((i + 1, i + columns + 1, i + columns))
+
+        segment_count = max(1, params.segment_count)
+        per_segment = max(1, len(triangles) // segment_count)
+        self.segments = [triangles[i * per_segment:(i + 1) * per_segment if i < segment_count - 1 else len(triangles)] for i in range(segment_count)]
+
+    def positions(self) -> List[List[float]]:
+        c, r = self.columns, self.rows
+        return [[(i % c) / (c - 1) * 2 - 1, (i // c) / (r - 1) * 2 - 1, self.rng.uniform(-1, 1), 1.0] for i in range(self.vertex_count)]
+
+    def unit_vectors(self, signed: bool) -> List[List[float]]:
+        result = []
+        for _ in range(self.vertex_count):
+            v = [self.rng.uniform(-1, 1) for _ in range(4)]
+            if not signed:
+                v = [abs(x) for x in v]
+            result.append(v)
+        return result
+
+    def blend_indices(self, bone_count: int) -> List[List[float]]:
+        return [[self.rng.randrange(bone_count) for _ in range(4)] for _ in range(self.vertex_count)]
+
+    def blend_weights(self) -> List[List[float]]:
+        result = []
+        for _ in range(self.vertex_count):
+            w = [self.rng.random() for _ in range(4)]
+            w[self.rng.randrange(4)] = 0.0 # make sure some weights get filtered out
+            total = sum(w) or 1.0
+            result.append([x / total for x in w])
+        return result
+
+    def strip_segments(self) -> List[List[int]]:
+        ''' Converts each segment into a strip by joining every triangle with degenerate triangles '''
+        strips = []
+        for triangles in self.segments:
+            strip = []
+            for t in triangles:
+                if strip:
+                    strip.extend((strip[-1], t[0]))
+                    if len(strip) % 2 == 1:
+                        strip.append(t[0]) # keep the winding parity aligned with the start of each triangle
+                strip.extend(t)
+            strips.append(strip)
+        return strips
+
+
+def write_synthetic_scene(path: str, params: SyntheticSceneParams = None) -> str:
+    ''' Writes a synthetic RMF file to `path` using the given parameters and returns the path '''
+
+    params = params or SyntheticSceneParams()
+    rng = random.Random(params.seed)
+    w = RmfWriter()
+
+    descriptor_names: List[str] = []
+    def descriptor_index(name: str) -> int:
+        if name not in descriptor_names:
+            descriptor_names.append(name)
+        return descriptor_names.index(name)
+
+    geometry = [_Geometry(params, rng) for _ in range(params.model_count)]
+    skinned = params.bone_count > 0 and params.blend_index_format is not None
+
+    with w.block(SceneCodes.FILE_HEADER):
+        w.write('4B', 1, 0, 1, 0)
+
+        with w.block(SceneCodes.ATTRIBUTE_DATA):
+            w.write('f', 1.0)
+            w.write_matrix3x3(_IDENTITY)
+            w.write_stringref('synthetic')
+            w.write_stringref('synthetic\\scene')
+
+        with w.block(SceneCodes.SCENE_GROUP):
+            with w.block(SceneCodes.ATTRIBUTE_DATA):
+                w.write_stringref('root')
+            with w.list_block(SceneCodes.SCENE_GROUP, 1):
+                with w.block(SceneCodes.SCENE_GROUP):
+                    with w.block(SceneCodes.ATTRIBUTE_DATA):
+                        w.write_stringref('placements')
+                    with w.list_block(SceneCodes.SCENE_GROUP, 0):
+                        pass
+                    with w.list_block(SceneCodes.PLACEMENT, params.placement_count):
+                        for i in range(params.placement_count):
+                            with w.block(SceneCodes.PLACEMENT):
+                                with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                    w.write_stringref(f'placement_{i:03d}')
+                                    w.write('i', 0)
+                                with w.block(SceneCodes.MATRIX_3X4):
+                                    w.write_matrix3x4(_translation(i * 3.0, 0, 0))
+                                with w.block(SceneCodes.SCENE_OBJECT):
+                                    with w.block(SceneCodes.MODEL_REFERENCE):
+                                        w.write('i', i % max(1, params.model_count))
+            with w.list_block(SceneCodes.PLACEMENT, 0):
+                pass
+
+        with w.list_block(SceneCodes.MARKER, 0):
+            pass
+
+        meshes_per_model = params.region_count * params.permutation_count
+        with w.list_block(SceneCodes.MODEL, params.model_count):
+            for mi in range(params.model_count):
+                with w.block(SceneCodes.MODEL):
+                    with w.block(SceneCodes.ATTRIBUTE_DATA):
+                        w.write_stringref(f'model_{mi:03d}')
+                        w.write('i', 0)
+                        w.write_stringref(f'synthetic\\model_{mi:03d}')
+
+                    with w.list_block(SceneCodes.REGION, params.region_count):
+                        for ri in range(params.region_count):
+                            with w.block(SceneCodes.REGION):
+                                with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                    w.write_stringref(f'region_{ri}')
+                                with w.list_block(SceneCodes.PERMUTATION, params.permutation_count):
+                                    for pi in range(params.permutation_count):
+                                        with w.block(SceneCodes.PERMUTATION):
+                                            with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                                w.write_stringref(f'perm_{pi}')
+                                                w.write('B', 0)
+                                                w.write('i', ri * params.permutation_count + pi)
+                                                w.write('i', 1)
+                                                w.write_matrix3x4(_IDENTITY)
+
+                    with w.list_block(SceneCodes.MARKER, params.marker_count):
+                        for ki in range(params.marker_count):
+                            with w.block(SceneCodes.MARKER):
+                                with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                    w.write_stringref(f'marker_{ki}')
+                                with w.list_block(SceneCodes.MARKER_INSTANCE, 1):
+                                    with w.block(SceneCodes.MARKER_INSTANCE):
+                                        with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                            w.write('3i', 0, 0, ki % params.bone_count if params.bone_count else -1)
+                                            w.write('3f', 0.1 * ki, 0, 0)
+                                            w.write('4f', 0, 0, 0, 1)
+
+                    with w.list_block(SceneCodes.BONE, params.bone_count):
+                        for bi in range(params.bone_count):
+                            with w.block(SceneCodes.BONE):
+                                with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                    w.write_stringref(f'bone_{bi:02d}')
+                                    w.write('i', bi - 1) # simple chain
+                                    w.write_matrix4x4(_translation(0.1, 0, 0) if bi else _IDENTITY)
+
+                    # every mesh in a model shares the same vertex and index buffer
+                    with w.list_block(SceneCodes.MESH, meshes_per_model):
+                        for _ in range(meshes_per_model):
+                            with w.block(SceneCodes.MESH):
+                                with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                    w.write('3i', mi, mi, -1)
+                                    w.write_matrix3x4(_IDENTITY)
+                                    w.write_matrix3x4(_IDENTITY)
+                                    w.write('i', 1 if params.implied_blendweights else 0)
+
+                                g = geometry[mi]
+                                lengths = [len(s) for s in g.strip_segments()] if params.triangle_strips else [len(s) * 3 for s in g.segments]
+                                with w.list_block(SceneCodes.MESH_SEGMENT, len(lengths)):
+                                    start = 0
+                                    for si, length in enumerate(lengths):
+                                        with w.block(SceneCodes.MESH_SEGMENT):
+                                            with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                                w.write('3i', start, length, si % params.material_count if params.material_count else -1)
+                                        start += length
+
+        with w.list_block(SceneCodes.VERTEX_BUFFER, params.model_count):
+            for g in geometry:
+                with w.block(SceneCodes.VERTEX_BUFFER):
+                    w.write('i', g.vertex_count)
+
+                    channels = [
+                        (VertexChannelCodes.POSITION, params.position_format, g.positions()),
+                        (VertexChannelCodes.TEXTURE_COORDINATE, params.texcoord_format, g.unit_vectors(False)),
+                        (VertexChannelCodes.NORMAL, params.normal_format, g.unit_vectors(True))
+                    ]
+
+                    if skinned:
+                        channels.append((VertexChannelCodes.BLEND_INDEX, params.blend_index_format, g.blend_indices(params.bone_count)))
+                        if params.blend_weight_format:
+                            channels.append((VertexChannelCodes.BLEND_WEIGHT, params.blend_weight_format, g.blend_weights()))
+
+                    if params.color_format:
+                        channels.append((VertexChannelCodes.COLOR, params.color_format, g.unit_vectors(False)))
+
+                    for code, format, values in channels:
+                        if not format:
+                            continue
+                        spec = DESCRIPTORS[format]
+                        with w.block(code):
+                            w.write('i', descriptor_index(format))
+                            w.write_bytes(b''.join(_encode_vector(spec, v) for v in values))
+
+        with w.list_block(SceneCodes.INDEX_BUFFER, params.model_count):
+            for g in geometry:
+                with w.block(SceneCodes.INDEX_BUFFER):
+                    if params.triangle_strips:
+                        indices = [i for s in g.strip_segments() for i in s]
+                        layout = 5
+                    else:
+                        indices = [i for s in g.segments for t in s for i in t]
+                        layout = 3
+                    width = 1 if g.vertex_count <= 0xFF else 2 if g.vertex_count <= 0xFFFF else 4
+                    w.write('B', layout)
+                    w.write('B', width)
+                    w.write('i', len(indices))
+                    w.write(f'{len(indices)}{ {1: "B", 2: "H", 4: "I"}[width] }', *indices)
+
+        with w.list_block(SceneCodes.VECTOR_DESCRIPTOR, len(descriptor_names)):
+            for name in descriptor_names:
+                datatype, size, dimensions = DESCRIPTORS[name]
+                with w.block(SceneCodes.VECTOR_DESCRIPTOR):
+                    w.write('B', datatype)
+                    w.write('B', size)
+                    w.write('i', len(dimensions))
+                    for flags, bits in dimensions:
+                        w.write('2B', flags, bits)
+
+        with w.list_block(SceneCodes.MATERIAL, params.material_count):
+            for i in range(params.material_count):
+                with w.block(SceneCodes.MATERIAL):
+                    with w.block(SceneCodes.ATTRIBUTE_DATA):
+                        w.write_stringref(f'material_{i:02d}')
+                        w.write_stringref('opaque')
+                    with w.list_block(SceneCodes.TEXTURE_MAPPING, 1):
+                        with w.block(SceneCodes.TEXTURE_MAPPING):
+                            with w.block(SceneCodes.ATTRIBUTE_DATA):
+                                w.write_stringref('diffuse')
+                                w.write('i', 0)
+                                w.write('i', i)
+                                w.write('i', 0)
+                                w.write('2f', 1.0, 1.0)
+                    with w.list_block(SceneCodes.TINT, 0):
+                        pass
+
+        with w.list_block(SceneCodes.TEXTURE, params.material_count):
+            for i in range(params.material_count):
+                with w.block(SceneCodes.TEXTURE):
+                    with w.block(SceneCodes.ATTRIBUTE_DATA):
+                        w.write_stringref(f'synthetic\\bitmaps\\texture_{i:02d}')
+                        w.write('f', 2.2)
+
+        w.write_string_table()
+
+    with open(path, 'wb') as f:
+        f.write(w.getvalue())
+
+    return path
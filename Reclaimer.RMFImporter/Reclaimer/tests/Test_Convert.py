@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from ..src.SceneReader import SceneReader
+from ..src.SceneFilter import SceneFilter
+from ..convert import ConvertJob, convert_file, find_files
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+PARAMS = SyntheticSceneParams(model_count=2, placement_count=3, vertex_count=100)
+
+class Test_SelectMatching(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        path = write_synthetic_scene(os.path.join(self._temp_dir.name, 'scene.rmf'), PARAMS)
+        self.scene = SceneReader.open_scene(path)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_models(self):
+        filter = SceneFilter(self.scene)
+        filter.select_matching(models='PLACEMENT_00[02]')
+        self.assertEqual([m.label for m in filter._selected_models_recursive()], ['placement_000', 'placement_002'])
+
+    def test_regions_and_permutations(self):
+        filter = SceneFilter(self.scene)
+        filter.select_matching(regions='region_1', permutations='*_0')
+        for model in filter._selected_models_recursive():
+            selected = [(r.label, p.label) for r in model.selected_regions() for p in r.selected_permutations()]
+            self.assertEqual(selected, [('region_1', 'perm_0')])
+        self.assertEqual(filter.count_meshes(), PARAMS.placement_count)
+
+class Test_ConvertObj(unittest.TestCase):
+    def test_convert(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = os.path.join(temp_dir, 'input', 'maps')
+            os.makedirs(input_dir)
+            write_synthetic_scene(os.path.join(input_dir, 'scene.rmf'), PARAMS)
+
+            files = list(find_files([os.path.join(temp_dir, 'input')], os.path.join(temp_dir, 'output'), 'obj'))
+            self.assertEqual(files, [(os.path.join(input_dir, 'scene.rmf'), os.path.join(temp_dir, 'output', 'maps', 'scene.obj'))])
+
+            result = convert_file(ConvertJob(*files[0], regions='region_0'))
+            self.assertIsNone(result.error)
+
+            with open(result.output_path) as f:
+                lines = f.read().splitlines()
+
+        mesh_count = PARAMS.placement_count * PARAMS.permutation_count
+        groups = [l for l in lines if l.startswith('g ')]
+        self.assertEqual(len(groups), mesh_count)
+        self.assertEqual(result.mesh_count, mesh_count)
+
+        # every face should reference a vertex that has already been written
+        vertex_count = 0
+        for line in lines:
+            if line.startswith('v '):
+                vertex_count += 1
+            elif line.startswith('f '):
+                indices = [int(c.split('/')[0]) for c in line.split()[1:]]
+                self.assertTrue(all(1 <= i <= vertex_count for i in indices))
+
+if __name__ == '__main__':
+    unittest.main()
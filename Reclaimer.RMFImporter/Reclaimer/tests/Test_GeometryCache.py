@@ -0,0 +1,106 @@
+import os
+import time
+import tempfile
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..src import GeometryCache as module
+from ..src.GeometryCache import GeometryCache
+from ..src.SceneReader import SceneReader
+from ..src.ViewportInterface import MeshParams
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+@unittest.skipIf(module.np is None, 'NumPy is not available')
+class Test_GeometryCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = GeometryCache(1024)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return module.np.zeros(16, dtype=module.np.float32)
+
+        first = cache.get('a', factory)
+        second = cache.get('a', factory)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.size, 64)
+
+    def test_lru_eviction(self):
+        cache = GeometryCache(256)
+        create = lambda: module.np.zeros(16, dtype=module.np.float32) # 64 bytes each
+
+        for key in 'abcd':
+            cache.get(key, create)
+
+        cache.get('a', create) # 'a' becomes the most recently used
+        cache.get('e', create) # evicts 'b', the least recently used
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(list(cache._entries.keys()), ['c', 'd', 'a', 'e'])
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_oversized_values(self):
+        cache = GeometryCache(32)
+        value = cache.get('a', lambda: module.np.zeros(16, dtype=module.np.float32))
+        self.assertEqual(len(value), 16)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_concurrent_misses(self):
+        cache = GeometryCache(1024)
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05) # keep the value pending while the other threads request it
+            return module.np.zeros(16, dtype=module.np.float32)
+
+        def get():
+            barrier.wait()
+            return cache.get('a', factory)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda _: get(), range(4)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(len(cache._pending), 0)
+
+    def test_factory_error(self):
+        cache = GeometryCache(1024)
+
+        def factory():
+            raise ValueError()
+
+        self.assertRaises(ValueError, cache.get, 'a', factory)
+        self.assertEqual(len(cache._pending), 0)
+        self.assertEqual(len(cache.get('a', lambda: module.np.zeros(4))), 4) # the key can be created again after a failure
+
+    def test_mesh_params(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scene = SceneReader.open_scene(write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), SyntheticSceneParams(model_count=1, placement_count=1, vertex_count=100)))
+
+        cache = GeometryCache()
+        mesh = scene.model_pool[0].meshes[0]
+        first, second = (MeshParams(scene, mesh, None, (0, 0, -1), 'mesh', cache) for _ in range(2))
+
+        # placements of the same mesh share the same triangle arrays and faces
+        for (_, a), (_, b) in zip(first.triangle_arrays, second.triangle_arrays):
+            self.assertIs(a, b)
+            self.assertEqual((a.dtype, a.shape[1]), (module.np.int32, 3))
+        self.assertIs(first.get_faces(), second.get_faces())
+        self.assertEqual(len(first.get_faces()), sum(len(t) for _, t in first.triangle_arrays))
+
+        # the tuple lists are only created on request
+        self.assertIsNone(first._triangle_sets)
+        self.assertEqual(list(first.chain_triangles()), [tuple(t) for t in first.get_faces().tolist()])
+
+        segment = MeshParams(scene, mesh, mesh.segments[1], (0, 0, 1), 'segment', cache)
+        self.assertIs(segment.get_faces(), segment.triangle_arrays[0][1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import json
+import io
+import struct
+import tempfile
+import unittest
+import contextlib
+from ..src.ImportOptions import ImportOptions
+from ..src.SceneBuilder import SceneBuilder
+from ..src.SceneReader import SceneReader
+from ..headless import GltfInterface
+from ..headless.Utils import multiply_matrix
+from ..convert import ConvertJob, convert_file
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+FLOAT = 5126
+UNSIGNED_INT = 5125
+
+COMPONENT_SIZES = { 5120: 1, 5121: 1, 5122: 2, 5123: 2, 5125: 4, 5126: 4 }
+COMPONENT_FORMATS = { 5120: 'b', 5121: 'B', 5122: 'h', 5123: 'H', 5125: 'I', 5126: 'f' }
+TYPE_SIZES = { 'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT4': 16 }
+
+def read_glb(path: str):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, length = struct.unpack_from('<4sII', data, 0)
+    json_length, json_type = struct.unpack_from('<I4s', data, 12)
+    gltf = json.loads(data[20:20 + json_length])
+
+    binary = b''
+    if 20 + json_length < len(data):
+        bin_length, bin_type = struct.unpack_from('<I4s', data, 20 + json_length)
+        assert bin_type == b'BIN\0'
+        binary = data[28 + json_length:28 + json_length + bin_length]
+
+    assert (magic, version, length, json_type) == (b'glTF', 2, len(data), b'JSON')
+    return (gltf, binary)
+
+def convert_scene(params: SyntheticSceneParams):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), params)
+        result = convert_file(ConvertJob(input_path, os.path.join(temp_dir, 'scene.glb'), 'glb'))
+        if result.error:
+            raise Exception(result.error)
+        return (SceneReader.open_scene(input_path), *read_glb(result.output_path))
+
+def export_scene(input_path: str, output_path: str, options: ImportOptions):
+    scene = SceneReader.open_scene(input_path)
+    options._scene = scene
+    builder = SceneBuilder(GltfInterface(output_path), scene, options=options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        task_queue = builder.begin_create_scene()
+        while not task_queue.finished():
+            task_queue.execute_next()
+        builder.end_create_scene()
+    return read_glb(output_path)
+
+def read_accessor(gltf, binary, index: int):
+    ''' Reads the elements of an accessor as tuples (normalized values are left as integers) '''
+    accessor = gltf['accessors'][index]
+    view = gltf['bufferViews'][accessor['bufferView']]
+    count = TYPE_SIZES[accessor['type']]
+    element_format = '<' + COMPONENT_FORMATS[accessor['componentType']] * count
+    stride = view.get('byteStride', struct.calcsize(element_format))
+    return [struct.unpack_from(element_format, binary, view['byteOffset'] + i * stride) for i in range(accessor['count'])]
+
+def get_world_matrices(gltf):
+    ''' Gets the world matrix of each node, as row-major matrices that transform row vectors (the same element order as glTF) '''
+    parents = { c: i for i, node in enumerate(gltf['nodes']) for c in node.get('children', []) }
+    identity = tuple(tuple(1.0 if r == c else 0.0 for c in range(4)) for r in range(4))
+    result = dict()
+
+    def get_world(i: int):
+        if i not in result:
+            values = gltf['nodes'][i].get('matrix')
+            local = tuple(tuple(values[r * 4:r * 4 + 4]) for r in range(4)) if values else identity
+            result[i] = multiply_matrix(local, get_world(parents[i])) if i in parents else local
+        return result[i]
+
+    return [get_world(i) for i in range(len(gltf['nodes']))]
+
+def transform_point(p, m):
+    return tuple(sum(v * m[r][c] for r, v in enumerate((*p[:3], 1.0))) for c in range(3))
+
+class Test_Gltf(unittest.TestCase):
+    def check_accessors(self, gltf, binary):
+        for accessor in gltf['accessors']:
+            view = gltf['bufferViews'][accessor['bufferView']]
+            element_size = COMPONENT_SIZES[accessor['componentType']] * TYPE_SIZES[accessor['type']]
+            stride = view.get('byteStride', element_size)
+            self.assertEqual(view['byteOffset'] % 4, 0)
+            self.assertLessEqual(view['byteOffset'] + view['byteLength'], len(binary))
+            self.assertLessEqual(stride * (accessor['count'] - 1) + element_size, view['byteLength'])
+
+    def test_triangle_lists(self):
+        params = SyntheticSceneParams(model_count=2, placement_count=3, vertex_count=100)
+        scene, gltf, binary = convert_scene(params)
+        self.check_accessors(gltf, binary)
+
+        # each placement of the same model should reference the same meshes
+        mesh_nodes = [n for n in gltf['nodes'] if 'mesh' in n]
+        self.assertEqual(len(mesh_nodes), params.placement_count * params.region_count * params.permutation_count)
+        self.assertEqual(len(gltf['meshes']), params.model_count * params.region_count * params.permutation_count)
+
+        # float32 positions and triangle list indices should be copied as-is
+        for mesh in gltf['meshes']:
+            position = gltf['accessors'][mesh['primitives'][0]['attributes']['POSITION']]
+            self.assertEqual(gltf['bufferViews'][position['bufferView']]['byteStride'], 12)
+            for primitive in mesh['primitives']:
+                self.assertNotEqual(gltf['accessors'][primitive['indices']]['componentType'], UNSIGNED_INT)
+
+        # the first mesh should contain the same positions as the source vertex buffer
+        position = gltf['accessors'][gltf['meshes'][0]['primitives'][0]['attributes']['POSITION']]
+        view = gltf['bufferViews'][position['bufferView']]
+        values = struct.unpack_from(f'<{position["count"] * 3}f', binary, view['byteOffset'])
+        source = scene.vertex_buffer_pool[0].position_channels[0]
+        self.assertEqual(position['count'], len(source))
+        for i in range(len(source)):
+            self.assertSequenceEqual(values[i * 3:i * 3 + 3], tuple(source[i])[:3])
+
+        self.assertEqual(len(gltf['skins']), params.placement_count)
+
+    def test_triangle_strips(self):
+        params = SyntheticSceneParams(model_count=1, placement_count=1, vertex_count=100, triangle_strips=True, blend_index_format=None)
+        scene, gltf, binary = convert_scene(params)
+        self.check_accessors(gltf, binary)
+        self.assertNotIn('skins', gltf)
+
+        # triangle strips need to be converted to triangle lists
+        for mesh in gltf['meshes']:
+            for primitive in mesh['primitives']:
+                accessor = gltf['accessors'][primitive['indices']]
+                self.assertEqual(accessor['componentType'], UNSIGNED_INT)
+                self.assertEqual(accessor['count'] % 3, 0)
+
+    def test_skinned_positions(self):
+        # the posed positions of each skinned mesh should match the same mesh exported without skinning
+        params = SyntheticSceneParams(model_count=1, placement_count=2, vertex_count=20)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), params)
+            gltf, binary = export_scene(input_path, os.path.join(temp_dir, 'skinned.glb'), ImportOptions())
+            static_options = ImportOptions()
+            static_options.IMPORT_SKIN = False
+            static_gltf, static_binary = export_scene(input_path, os.path.join(temp_dir, 'static.glb'), static_options)
+
+        self.check_accessors(gltf, binary)
+        self.assertEqual(len(gltf['skins']), params.placement_count) # one per placement, since the synthetic permutations all share the same transform
+
+        world, static_world = get_world_matrices(gltf), get_world_matrices(static_gltf)
+        mesh_nodes = [i for i, n in enumerate(gltf['nodes']) if 'mesh' in n]
+        static_nodes = [i for i, n in enumerate(static_gltf['nodes']) if 'mesh' in n]
+        self.assertEqual(len(mesh_nodes), len(static_nodes))
+
+        for node_index, static_index in zip(mesh_nodes, static_nodes):
+            node = gltf['nodes'][node_index]
+            self.assertIn('skin', node)
+            self.assertNotIn('matrix', node)
+
+            skin = gltf['skins'][node['skin']]
+            inverse_binds = [tuple(tuple(m[r * 4:r * 4 + 4]) for r in range(4)) for m in read_accessor(gltf, binary, skin['inverseBindMatrices'])]
+            joint_matrices = [multiply_matrix(ib, world[j]) for ib, j in zip(inverse_binds, skin['joints'])]
+
+            attributes = gltf['meshes'][node['mesh']]['primitives'][0]['attributes']
+            positions = read_accessor(gltf, binary, attributes['POSITION'])
+            joints = read_accessor(gltf, binary, attributes['JOINTS_0'])
+            weights = read_accessor(gltf, binary, attributes['WEIGHTS_0'])
+
+            static_attributes = static_gltf['meshes'][static_gltf['nodes'][static_index]['mesh']]['primitives'][0]['attributes']
+            static_positions = read_accessor(static_gltf, static_binary, static_attributes['POSITION'])
+
+            for p, j, w, s in zip(positions, joints, weights, static_positions):
+                posed = [0.0, 0.0, 0.0]
+                for joint, weight in zip(j, w):
+                    if weight:
+                        posed = [a + weight * b for a, b in zip(posed, transform_point(p, joint_matrices[joint]))]
+                expected = transform_point(s, static_world[static_index])
+                for a, b in zip(posed, expected):
+                    self.assertAlmostEqual(a, b, delta=1e-5 + abs(b) * 1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
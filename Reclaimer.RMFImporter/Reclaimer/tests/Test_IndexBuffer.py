@@ -0,0 +1,97 @@
+import random
+import struct
+import unittest
+from ..src import IndexBuffer as module
+from ..src.IndexBuffer import IndexBuffer, IndexLayout
+from ..src.Model import Mesh, MeshSegment
+
+def create_segment(start: int, length: int) -> MeshSegment:
+    segment = MeshSegment()
+    segment.index_start = start
+    segment.index_length = length
+    return segment
+
+def create_buffer(layout: IndexLayout, indices) -> IndexBuffer:
+    return IndexBuffer(layout, 2, struct.pack(f'<{len(indices)}H', *indices))
+
+@unittest.skipIf(module.np is None, 'NumPy is not available')
+class Test_IndexBuffer(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        # small index range so there are plenty of degenerate triangles
+        self.indices = [rng.randrange(12) for _ in range(1000)]
+        self.mesh = Mesh()
+        self.mesh.segments = [create_segment(0, 301), create_segment(301, 298), create_segment(599, 401)]
+
+    def _scalar(self, func):
+        # temporarily disable numpy to get the results from the scalar implementation
+        np, module.np = module.np, None
+        try:
+            return func()
+        finally:
+            module.np = np
+
+    def test_triangle_strip(self):
+        buffer = create_buffer(IndexLayout.TRIANGLE_STRIP, self.indices)
+
+        for segment in self.mesh.segments:
+            expected = self._scalar(lambda: list(buffer.get_triangles(segment)))
+            self.assertEqual(list(buffer.get_triangles(segment)), expected)
+            self.assertEqual(buffer.get_triangle_array(segment).tolist(), [list(t) for t in expected])
+            self.assertEqual(buffer.count_triangles(segment), len(expected))
+
+        expected = self._scalar(lambda: list(buffer.get_triangles(self.mesh)))
+        self.assertEqual(buffer.get_triangle_array(self.mesh).tolist(), [list(t) for t in expected])
+
+    def test_triangle_list(self):
+        buffer = create_buffer(IndexLayout.TRIANGLE_LIST, self.indices[:999])
+        expected = self._scalar(lambda: list(buffer.get_triangles(0, -1)))
+        self.assertEqual(len(expected), 333)
+        self.assertEqual(buffer.get_triangle_array(0, -1).tolist(), [list(t) for t in expected])
+
+    def test_relative_slice(self):
+        buffer = create_buffer(IndexLayout.TRIANGLE_STRIP, [i + 100 for i in self.indices])
+        segment = self.mesh.segments[1]
+
+        self.assertEqual(buffer.get_vertex_range(segment), self._scalar(lambda: buffer.get_vertex_range(segment)))
+
+        expected = self._scalar(lambda: buffer.relative_slice(segment))
+        actual = buffer.relative_slice(segment)
+        self.assertEqual(list(actual.indices), list(expected.indices))
+        self.assertEqual(min(actual.indices), 0)
+
+    def test_cached_ranges(self):
+        for layout in (IndexLayout.TRIANGLE_STRIP, IndexLayout.TRIANGLE_LIST):
+            buffer = create_buffer(layout, self.indices)
+            # use a separate buffer for the scalar results so the cached values are not shared
+            scalar = create_buffer(layout, self.indices)
+
+            for segment in self.mesh.segments:
+                subset = self.indices[segment.index_start:segment.index_start + segment.index_length]
+                self.assertEqual(buffer.get_vertex_range(segment), (min(subset), max(subset) + 1 - min(subset)))
+                self.assertEqual(buffer.get_vertex_range(segment), self._scalar(lambda: scalar.get_vertex_range(segment)))
+
+            # the vertex range should not need the strips to be unpacked
+            self.assertEqual(len(buffer._triangle_counts), 0)
+
+            for segment in self.mesh.segments:
+                expected = self._scalar(lambda: scalar.count_triangles(segment))
+                self.assertEqual(buffer.count_triangles(segment), expected)
+                self.assertEqual(buffer.count_triangles(segment), len(buffer.get_triangle_array(segment)))
+
+    def test_compact_slice(self):
+        # spread the indices out so there are unused vertices in the range of each segment
+        buffer = create_buffer(IndexLayout.TRIANGLE_STRIP, [i * 7 + 100 for i in self.indices])
+
+        for segment in self.mesh.segments:
+            expected_ids, expected = self._scalar(lambda: buffer.compact_slice(segment))
+            vertex_ids, actual = buffer.compact_slice(segment)
+            self.assertEqual(list(vertex_ids), expected_ids)
+            self.assertEqual(list(actual.indices), list(expected.indices))
+
+            # the remapped triangles should refer to the same source vertices
+            source = [tuple(vertex_ids[i] for i in t) for t in actual.get_triangles(0, -1)]
+            self.assertEqual(source, list(buffer.get_triangles(segment)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from ..src.Model import Model, Bone
+
+def create_model(parent_indices):
+    model = Model()
+    model.bones = []
+    for i, parent_index in enumerate(parent_indices):
+        bone = Bone()
+        bone.name = f'bone{i}'
+        bone.parent_index = parent_index
+        model.bones.append(bone)
+    return model
+
+class Test_Model(unittest.TestCase):
+    # children are listed before their parents to make sure the order is not just the list order
+    PARENT_INDICES = [-1, 3, 0, 0, 1, 1, -1, 6]
+
+    def test_bone_children(self):
+        model = create_model(self.PARENT_INDICES)
+        self.assertEqual(model.bone_children, [[2, 3], [4, 5], [], [1], [], [], [7], []])
+        for bone in model.bones:
+            expected = [b for b in model.bones if b.parent_index == model.bones.index(bone)]
+            self.assertEqual(model.get_bone_children(bone), expected)
+
+    def test_bone_order(self):
+        model = create_model(self.PARENT_INDICES)
+        order = model.bone_order
+        self.assertEqual(sorted(order), list(range(len(model.bones))))
+        for i in order:
+            parent_index = model.bones[i].parent_index
+            if parent_index >= 0:
+                self.assertLess(order.index(parent_index), order.index(i))
+
+    def test_world_transforms(self):
+        # use bone names as the 'transforms' so the result shows the order the transforms were multiplied in
+        model = create_model(self.PARENT_INDICES)
+        result = model.get_world_transforms([b.name for b in model.bones], lambda parent, local: f'{parent}/{local}')
+        expected = ['/'.join(b.name for b in model.get_bone_lineage(bone)) for bone in model.bones]
+        self.assertEqual(result, expected)
+
+if __name__ == '__main__':
+    unittest.main()
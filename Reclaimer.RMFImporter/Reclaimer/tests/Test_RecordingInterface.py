@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from ..src.SceneReader import SceneReader
+from ..headless import NullInterface, profile_import
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+PARAMS = SyntheticSceneParams(model_count=2, placement_count=3, vertex_count=100, bone_count=4, marker_count=2)
+
+class Test_RecordingInterface(unittest.TestCase):
+    def setUp(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.scene = SceneReader.open_scene(write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), PARAMS))
+
+    def test_calls(self):
+        recorder = profile_import(self.scene)
+        stats = recorder.stats
+
+        mesh_count = PARAMS.placement_count * PARAMS.region_count * PARAMS.permutation_count
+        self.assertEqual(stats['build_mesh'].count, mesh_count)
+        self.assertEqual(stats['build_mesh'].size, mesh_count * (PARAMS.vertex_count + PARAMS.bone_count + PARAMS.marker_count)) # mesh params + model state
+        self.assertGreater(stats['create_material'].count, 0)
+        self.assertEqual(stats['set_materials'].size, len(self.scene.material_pool))
+        self.assertEqual(stats['init_model'].count, PARAMS.placement_count)
+        self.assertEqual(stats['create_bones'].count, PARAMS.placement_count)
+        self.assertEqual(stats['apply_transform'].count, PARAMS.placement_count)
+        self.assertEqual(stats['init_scene'].count, 1)
+        self.assertEqual(len(recorder.calls), sum(s.count for s in stats.values()))
+
+        self.assertGreater(recorder.total_seconds, 0)
+        self.assertLessEqual(recorder.interface_seconds, recorder.total_seconds)
+
+        phases = recorder.get_phases()
+        self.assertEqual(phases['meshes'].count, mesh_count + PARAMS.placement_count * PARAMS.region_count)
+
+        lines = recorder.report()
+        self.assertTrue(any(line.startswith('meshes') for line in lines))
+        self.assertTrue(lines[-1].startswith('total'))
+
+    def test_error(self):
+        class FailingInterface(NullInterface):
+            def build_mesh(self, *args):
+                raise ValueError('build_mesh')
+
+        with self.assertRaises(ValueError):
+            profile_import(self.scene, interface=FailingInterface())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import os
+import tempfile
+import unittest
+import contextlib
+from ..src.ImportOptions import ImportOptions
+from ..src.SceneBuilder import SceneBuilder, _PreparePipeline
+from ..src.SceneReader import SceneReader
+from ..headless import NullInterface
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+class _MeshKeyInterface(NullInterface):
+    ''' Records the mesh key of every mesh that gets built '''
+
+    def __init__(self):
+        self.mesh_keys = []
+        self.prepared = []
+        self.faces = []
+
+    def build_mesh(self, model_state, permutation, region_group, world_transform, mesh_params):
+        self.mesh_keys.append(mesh_params.mesh_key)
+        self.prepared.append(len(mesh_params._prepared) > 0)
+        self.faces.append(mesh_params.get_faces().tolist())
+
+def build_scene(params: SyntheticSceneParams, dedup: bool, prepare_threads: int = 0):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scene = SceneReader.open_scene(write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), params))
+
+    options = ImportOptions()
+    options.DEDUPLICATE_GEOMETRY = dedup
+    options.PREPARE_THREADS = prepare_threads
+    interface = _MeshKeyInterface()
+    builder = SceneBuilder(interface, scene, options=options)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        task_queue = builder.begin_create_scene()
+        while not task_queue.finished():
+            task_queue.execute_next()
+        builder.end_create_scene()
+
+    if task_queue.error:
+        raise task_queue.error
+
+    return builder, interface
+
+class Test_Dedup(unittest.TestCase):
+    # every mesh within a synthetic model uses the same buffers and segments, but each model has different vertex data
+    PARAMS = SyntheticSceneParams(model_count=2, placement_count=2, vertex_count=100, bone_count=0, marker_count=0, blend_index_format=None)
+
+    def test_disabled(self):
+        builder, interface = build_scene(self.PARAMS, False)
+        self.assertEqual(len(set(interface.mesh_keys)), 8)
+        self.assertEqual(builder._dedup_meshes, 0)
+
+    def test_identical_meshes(self):
+        builder, interface = build_scene(self.PARAMS, True)
+        self.assertEqual(len(interface.mesh_keys), 8)
+        self.assertEqual(len(set(interface.mesh_keys)), 2)
+        self.assertEqual(builder._dedup_meshes, 6)
+        self.assertGreater(builder._dedup_bytes, 0)
+
+    def test_skinned_meshes(self):
+        params = SyntheticSceneParams(model_count=2, placement_count=2, vertex_count=100, marker_count=0)
+        builder, interface = build_scene(params, True)
+        self.assertEqual(len(set(interface.mesh_keys)), 8)
+        self.assertEqual(builder._dedup_meshes, 0)
+
+class Test_Prepare(unittest.TestCase):
+    PARAMS = SyntheticSceneParams(model_count=2, placement_count=3, vertex_count=100, triangle_strips=True)
+
+    def test_threads(self):
+        _, inline = build_scene(self.PARAMS, True, 0)
+        _, threaded = build_scene(self.PARAMS, True, 2)
+
+        self.assertFalse(any(inline.prepared))
+        self.assertTrue(all(threaded.prepared))
+        self.assertEqual(inline.mesh_keys, threaded.mesh_keys)
+        self.assertEqual(inline.faces, threaded.faces)
+
+    def test_pipeline(self):
+        pipeline = _PreparePipeline(2, 3)
+        results = [pipeline.submit(lambda i=i: i) for i in range(10)]
+
+        # only the lookahead count should be submitted until results start being collected
+        self.assertEqual(pipeline._in_flight, 3)
+        self.assertEqual(len(pipeline._waiting), 7)
+
+        self.assertEqual([r() for r in results], list(range(10)))
+        self.assertEqual(pipeline._in_flight, 0)
+        pipeline.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
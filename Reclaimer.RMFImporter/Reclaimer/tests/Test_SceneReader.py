@@ -1,5 +1,11 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
+from ..src import SceneReader as module
 from ..src.SceneReader import SceneReader
+from ..src.Scene import Placement
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
 
 class Test_Citadel(unittest.TestCase):
     def test_citadel(self):
@@ -26,5 +32,87 @@ class Test_Masterchief(unittest.TestCase):
                     pass
         return
 
+class Test_Synthetic(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.list_path = write_synthetic_scene(os.path.join(self._temp_dir.name, 'list.rmf'), SyntheticSceneParams())
+        self.strip_path = write_synthetic_scene(os.path.join(self._temp_dir.name, 'strip.rmf'), SyntheticSceneParams(triangle_strips=True, normal_format='DecN4', color_format='UByteN4'))
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def assertScenesEqual(self, expected, actual):
+        self.assertEqual(expected.name, actual.name)
+        self.assertEqual([m.name for m in expected.model_pool], [m.name for m in actual.model_pool])
+        self.assertEqual([m.name for m in expected.material_pool], [m.name for m in actual.material_pool])
+        self.assertEqual(len(expected.vertex_buffer_pool), len(actual.vertex_buffer_pool))
+        self.assertEqual(len(expected.index_buffer_pool), len(actual.index_buffer_pool))
+
+        for a, b in zip(expected.vertex_buffer_pool, actual.vertex_buffer_pool):
+            self.assertEqual(a.count, b.count)
+            self.assertEqual([tuple(v) for v in a.position_channels[0]], [tuple(v) for v in b.position_channels[0]])
+            self.assertEqual([tuple(v) for v in a.normal_channels[0]], [tuple(v) for v in b.normal_channels[0]])
+
+        for a, b in zip(expected.index_buffer_pool, actual.index_buffer_pool):
+            self.assertEqual(list(a.indices), list(b.indices))
+
+    def test_open_modes(self):
+        for path in (self.list_path, self.strip_path):
+            expected = SceneReader.open_scene(path)
+            for kwargs in ({ 'memory_map': True }, { 'lazy': True }, { 'buffer_workers': 4 }, { 'memory_map': True, 'buffer_workers': 4 }):
+                with self.subTest(path=os.path.basename(path), **kwargs):
+                    self.assertScenesEqual(expected, SceneReader.open_scene(path, **kwargs))
+
+    def test_use_index(self):
+        expected = SceneReader.open_scene(self.list_path)
+        first = SceneReader.open_scene(self.list_path, use_index=True)
+        self.assertTrue(os.path.exists(os.path.join(self._temp_dir.name, 'list.rmfidx')))
+        second = SceneReader.open_scene(self.list_path, use_index=True)
+        self.assertScenesEqual(expected, first)
+        self.assertScenesEqual(expected, second)
+
+    def test_open_scenes(self):
+        paths = [self.list_path, self.strip_path] * 2
+        scenes = SceneReader.open_scenes(paths, max_workers=4)
+        self.assertEqual([s._source_file for s in scenes], paths)
+        self.assertScenesEqual(scenes[0], scenes[2])
+        self.assertScenesEqual(scenes[1], scenes[3])
+
+    def test_iter_models(self):
+        scene = SceneReader.open_scene(self.list_path, lazy=True)
+        pool = scene.vertex_buffer_pool
+        for model in SceneReader.iter_models(scene):
+            loaded = [i for i in range(len(pool)) if pool.is_loaded(i)]
+            self.assertEqual(loaded, [scene.model_pool.index(model)])
+        self.assertFalse(any(pool.is_loaded(i) for i in range(len(pool))))
+
+    def test_iter_placements(self):
+        scene = SceneReader.open_scene(self.list_path, lazy=True)
+        other = Placement()
+        other.object = None # an object type that is not decoded
+        scene.root_node.child_objects.append(other)
+
+        pool = scene.vertex_buffer_pool
+        placements = []
+        for placement in SceneReader.iter_placements(scene):
+            self.assertTrue(pool.is_loaded(scene.model_pool.index(placement.object)))
+            placements.append(placement)
+
+        self.assertEqual(len(placements), SyntheticSceneParams().placement_count)
+        self.assertNotIn(other, placements)
+        self.assertFalse(any(pool.is_loaded(i) for i in range(len(pool))))
+        pool._reader.close()
+
+    def test_lazy_reader(self):
+        # accessing buffers one at a time should not open (or map) the file again for each buffer
+        scene = SceneReader.open_scene(self.list_path, memory_map=True, lazy=True)
+        with mock.patch.object(module, '_ReaderContext', wraps=module._ReaderContext) as reader_type:
+            for pool in (scene.vertex_buffer_pool, scene.index_buffer_pool):
+                for i in range(len(pool)):
+                    self.assertIsNotNone(pool[i])
+        self.assertEqual(reader_type.call_count, 1)
+        self.assertIs(scene.vertex_buffer_pool._reader, scene.index_buffer_pool._reader)
+        scene.vertex_buffer_pool._reader.close()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import io
+import os
+import json
+import pstats
+import tempfile
+import unittest
+import contextlib
+import tracemalloc
+from types import SimpleNamespace
+from unittest import mock
+from queue import Queue
+from ..src.ImportOptions import ImportOptions
+from ..src.SceneBuilder import SceneBuilder, TaskQueue, Task, TaskCategory
+from ..src.SceneReader import SceneReader
+from ..src.TaskProfiler import TaskProfiler
+from ..headless import NullInterface
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+PARAMS = SyntheticSceneParams(model_count=2, placement_count=3, vertex_count=100)
+
+class Test_TaskProfiler(unittest.TestCase):
+    def test_queue(self):
+        def expand():
+            q = Queue()
+            q.put(Task(TaskCategory.MESHES, 'child', lambda: None))
+            q.put(lambda: None)
+            return q
+
+        q = Queue()
+        q.put(Task(TaskCategory.MODELS, 'parent', expand))
+        q.put(Task(TaskCategory.MARKERS, 'sibling', lambda: None))
+
+        task_queue = TaskQueue(q, TaskProfiler())
+        while not task_queue.finished():
+            task_queue.execute_next()
+
+        profiler = task_queue.profiler
+        self.assertEqual([(r.category, r.label) for r in profiler.records], [('models', 'parent'), ('meshes', 'child'), ('other', 'Test_TaskProfiler.test_queue.<locals>.expand.<locals>.<lambda>'), ('markers', 'sibling')])
+        self.assertEqual([d for _, d in profiler.queue_depth], [2, 3, 2, 1])
+        self.assertEqual(profiler.categories['models'].count, 1)
+        self.assertEqual(len(profiler.slowest(2)), 2)
+
+    def test_memory_without_reset_peak(self):
+        # python 3.7 (blender 2.91, 3ds max 2022) has no tracemalloc.reset_peak()
+        legacy = SimpleNamespace(**{n: getattr(tracemalloc, n) for n in ('start', 'stop', 'is_tracing', 'get_traced_memory')})
+        with mock.patch(f'{TaskProfiler.__module__}.tracemalloc', legacy):
+            profiler = TaskProfiler(trace_memory=True)
+            try:
+                data = profiler.run(Task(TaskCategory.MESHES, 'allocate', bytearray, 1 << 20), 0)
+            finally:
+                profiler.stop()
+
+        self.assertEqual(len(data), 1 << 20)
+        record = profiler.records[0]
+        self.assertGreaterEqual(record.memory, 1 << 20)
+        self.assertEqual(record.peak_memory, record.memory)
+
+    def test_import(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scene = SceneReader.open_scene(write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), PARAMS))
+
+            options = ImportOptions()
+            options.PROFILE_TASKS = True
+            options.PROFILE_CATEGORIES = (TaskCategory.MESHES, )
+            options.PROFILE_MEMORY = True
+            options.PROFILE_OUTPUT = os.path.join(temp_dir, 'profile.json')
+
+            builder = SceneBuilder(NullInterface(), scene, options=options)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                task_queue = builder.begin_create_scene()
+                while not task_queue.finished():
+                    task_queue.execute_next()
+                builder.end_create_scene()
+
+            self.assertIsNone(task_queue.error)
+            self.assertIn('slowest 10 tasks:', output.getvalue())
+
+            with open(options.PROFILE_OUTPUT) as f:
+                report = json.load(f)
+
+            stats = pstats.Stats(os.path.join(temp_dir, 'profile.meshes.pstats'))
+            self.assertGreater(stats.total_calls, 0)
+            self.assertFalse(os.path.exists(os.path.join(temp_dir, 'profile.materials.pstats')))
+
+        mesh_count = PARAMS.placement_count * PARAMS.region_count * PARAMS.permutation_count
+        mesh_tasks = [t for t in report['tasks'] if t['category'] == TaskCategory.MESHES]
+        self.assertEqual(len(mesh_tasks), mesh_count + PARAMS.placement_count) # one per mesh plus one per model to queue the meshes
+        self.assertEqual(report['categories'][TaskCategory.MODELS]['count'], PARAMS.placement_count * 2) # create and finish
+        self.assertTrue(all(t['peak_memory'] >= 0 for t in report['tasks']))
+
+if __name__ == '__main__':
+    unittest.main()
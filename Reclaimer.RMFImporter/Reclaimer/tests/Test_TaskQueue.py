@@ -0,0 +1,45 @@
+import time
+import unittest
+from queue import Queue
+from ..src.SceneBuilder import TaskQueue, Task
+
+SLOW_SECONDS = 0.02
+
+def create_queue(pattern: str) -> TaskQueue:
+    ''' Creates a queue with a slow task for each `s` in the pattern and a fast task for each `f` '''
+    q = Queue()
+    for c in pattern:
+        if c == 's':
+            q.put(Task('slow', 'slow', time.sleep, SLOW_SECONDS))
+        else:
+            q.put(Task('fast', 'fast', lambda: None))
+    return TaskQueue(q)
+
+class Test_TaskQueue(unittest.TestCase):
+    def test_batches(self):
+        task_queue = create_queue('sfffffsfffff')
+
+        # the first slow task uses up the whole batch, then the next batch stops before the next slow task
+        batches = []
+        while not task_queue.finished():
+            batches.append(task_queue.execute_batch(SLOW_SECONDS / 2))
+
+        self.assertEqual(batches, [1, 5, 1, 5])
+        self.assertGreaterEqual(task_queue.cost_estimates['slow'], SLOW_SECONDS)
+        self.assertLess(task_queue.cost_estimates['fast'], SLOW_SECONDS)
+
+    def test_unlimited(self):
+        task_queue = create_queue('ffsff')
+        self.assertEqual(task_queue.execute_batch(None), 5)
+        self.assertTrue(task_queue.finished())
+        self.assertEqual(task_queue.execute_batch(None), 0)
+
+    def test_finished(self):
+        # the batch should return as soon as the work runs out rather than waiting for the timeout
+        task_queue = create_queue('ff')
+        start = time.perf_counter()
+        self.assertEqual(task_queue.execute_batch(1.0), 2)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+from ..src.Material import Texture
+from ..src.ImportOptions import ImportOptions
+from ..src.TextureResolver import TextureResolver
+
+FILES = [
+    os.path.join('Objects', 'Weapons', 'Bitmaps', 'Rifle_Diffuse.TIF'),
+    os.path.join('Objects', 'Weapons', 'Bitmaps', 'rifle_normal.png'),
+    os.path.join('levels', 'shared', 'bitmaps', 'rock.tif'),
+    os.path.join('levels', 'shared', 'bitmaps', 'rock.png'),
+]
+
+def create_texture(name: str) -> Texture:
+    texture = Texture()
+    texture.name = name
+    return texture
+
+class Test_TextureResolver(unittest.TestCase):
+    def setUp(self):
+        TextureResolver.clear_cache()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = self._temp_dir.name
+        for path in FILES:
+            path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+        TextureResolver.clear_cache()
+
+    def test_find(self):
+        resolver = TextureResolver()
+        self.assertEqual(resolver.find(self.root, 'objects\\weapons\\bitmaps\\rifle_diffuse', ['png', 'tif']), os.path.join(self.root, FILES[0]))
+        self.assertEqual(resolver.find(self.root, 'OBJECTS/WEAPONS/BITMAPS/RIFLE_NORMAL', ['tif', 'png']), os.path.join(self.root, FILES[1]))
+        self.assertEqual(resolver.find(self.root, 'levels\\shared\\bitmaps\\rock', ['png', 'tif']), os.path.join(self.root, FILES[3]))
+        self.assertEqual(resolver.find(self.root, 'levels\\shared\\bitmaps\\rock.dds', ['tif']), os.path.join(self.root, FILES[2]))
+        self.assertIsNone(resolver.find(self.root, 'levels\\shared\\bitmaps\\missing', ['tif', 'png']))
+        self.assertIsNone(resolver.find(self.root, 'missing\\bitmaps\\rock', ['tif']))
+        self.assertIsNone(resolver.find(os.path.join(self.root, 'missing'), 'rock', ['tif']))
+
+    def test_cache(self):
+        name = 'levels\\shared\\bitmaps\\rock'
+        resolver = TextureResolver()
+        resolver.find(self.root, name, ['tif'])
+        self.assertEqual(resolver.scans, 4)
+
+        # a new resolver should reuse the listings from the previous one
+        resolver = TextureResolver()
+        resolver.find(self.root, name, ['tif'])
+        self.assertEqual(resolver.scans, 0)
+
+        # only the modified directory should be read again
+        directory = os.path.join(self.root, 'levels', 'shared', 'bitmaps')
+        os.remove(os.path.join(directory, 'rock.tif'))
+        stat = os.stat(directory)
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        resolver = TextureResolver()
+        self.assertEqual(resolver.find(self.root, name, ['tif', 'png']), os.path.join(directory, 'rock.png'))
+        self.assertEqual(resolver.scans, 1)
+
+    def test_options(self):
+        options = ImportOptions()
+        options.BITMAP_ROOT = self.root
+        options.BITMAP_EXT = 'png'
+
+        textures = [create_texture(n) for n in ('objects\\weapons\\bitmaps\\rifle_diffuse', 'levels\\shared\\bitmaps\\rock', 'levels\\shared\\bitmaps\\missing')]
+
+        # the results come from the directory listings, so no bitmap files should be checked individually
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), mock.patch('os.path.exists', side_effect=AssertionError('unexpected os.path.exists()')):
+            options.resolve_textures(textures + textures[:1])
+
+        self.assertIn('located 2/3 bitmap files', output.getvalue())
+        self.assertEqual(options.texture_path(textures[0]), os.path.join(self.root, FILES[0]))
+        self.assertEqual(options.texture_path(textures[1]), os.path.join(self.root, FILES[3])) # the default extension comes first
+        self.assertEqual(options.texture_path(textures[2]), os.path.join(self.root, 'levels\\shared\\bitmaps\\missing.png'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+from ..src.Vectors import VectorDescriptor, DataType, DescriptorFlags, np
+from ..src.VertexBuffer import VectorBuffer
+
+SNORM = DescriptorFlags.NORMALIZED | DescriptorFlags.SIGN_EXTENDED
+UNORM = DescriptorFlags.NORMALIZED
+NSHIFT = DescriptorFlags.NORMALIZED | DescriptorFlags.SIGN_SHIFTED
+SEXT = DescriptorFlags.SIGN_EXTENDED
+SSHIFT = DescriptorFlags.SIGN_SHIFTED
+
+def integer(size: int, count: int, flags: int) -> VectorDescriptor:
+    return VectorDescriptor(DataType.INTEGER, size, [(flags, size * 8)] * count)
+
+def packed(size: int, flags: int, *bits: int) -> VectorDescriptor:
+    return VectorDescriptor(DataType.PACKED, size, [(flags, b) for b in bits])
+
+DESCRIPTORS = [
+    VectorDescriptor(DataType.REAL, 4, [(0, 32)] * 2),
+    VectorDescriptor(DataType.REAL, 4, [(0, 32)] * 3),
+    VectorDescriptor(DataType.REAL, 4, [(0, 32)] * 4),
+    *(integer(size, count, flags) for size in (1, 2, 4) for count in (2, 4) for flags in (0, UNORM, SNORM, NSHIFT, SEXT, SSHIFT)),
+    *(packed(4, flags, *bits) for flags in (0, UNORM, SNORM, NSHIFT, SEXT, SSHIFT) for bits in ((10, 10, 10, 2), (10, 11, 11), (11, 11, 10))),
+    packed(2, UNORM, 5, 6, 5),
+    packed(2, SNORM, 4, 4, 4, 4)
+]
+
+@unittest.skipIf(np is None, 'NumPy is not available')
+class Test_VectorDescriptor(unittest.TestCase):
+    def test_decode_all(self):
+        rng = random.Random(0)
+        count = 257
+
+        for descriptor in DESCRIPTORS:
+            with self.subTest(descriptor=str(descriptor)):
+                data = bytes(rng.randrange(256) for _ in range(descriptor._total_bytes * count))
+                if descriptor._datatype == DataType.REAL:
+                    # avoid NaN values since they never compare equal
+                    data = np.frombuffer(data, dtype='<u4').copy()
+                    data &= 0xBFFFFFFF
+                    data = data.tobytes()
+
+                expected = np.array([list(descriptor.decode(data, i)) for i in range(count)], dtype=np.float32)
+                actual = descriptor.decode_all(data, 0, count)
+
+                self.assertEqual(actual.dtype, np.float32)
+                self.assertEqual(actual.shape, expected.shape)
+                self.assertTrue(np.array_equal(actual.view(np.uint32), expected.view(np.uint32)))
+
+    def test_to_array_slice(self):
+        descriptor = packed(4, SNORM, 10, 11, 11)
+        data = bytes(range(256)) * 4
+        buffer = VectorBuffer(memoryview(data), descriptor, 256)
+        subset = buffer.slice(10, 20)
+
+        expected = np.array([list(v) for v in subset], dtype=np.float32)
+        self.assertTrue(np.array_equal(subset.to_array(), expected))
+
+if __name__ == '__main__':
+    unittest.main()
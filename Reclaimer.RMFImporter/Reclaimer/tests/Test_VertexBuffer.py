@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from ..src import VertexBuffer as module
+from ..src.Model import MeshFlags
+from ..src.SceneReader import SceneReader
+from .RmfWriter import SyntheticSceneParams, write_synthetic_scene
+
+def read_vertex_buffer(temp_dir: str, **kwargs):
+    path = write_synthetic_scene(os.path.join(temp_dir, 'scene.rmf'), SyntheticSceneParams(model_count=1, vertex_count=500, **kwargs))
+    return SceneReader.open_scene(path).vertex_buffer_pool[0]
+
+@unittest.skipIf(module.np is None, 'NumPy is not available')
+class Test_BlendArrays(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _scalar(self, func):
+        # temporarily disable numpy to get the results from the fallback implementation
+        np, module.np = module.np, None
+        try:
+            return func()
+        finally:
+            module.np = np
+
+    def assertBlendArrays(self, buffer, flags: MeshFlags):
+        offsets, indices, weights = buffer.get_blend_arrays(flags)
+        rigid = len(buffer.blendweight_channels) == 0
+
+        self.assertEqual(len(offsets), buffer.count + 1)
+        for vi, blend_indices, blend_weights in buffer.enumerate_blendpairs(flags):
+            start, end = offsets[vi], offsets[vi + 1]
+            expected = list(zip(blend_indices, [1.0] if rigid else blend_weights))
+            self.assertEqual(indices[start:end].tolist(), [int(bi) for bi, _ in expected])
+            for actual, (_, bw) in zip(weights[start:end].tolist(), expected):
+                self.assertAlmostEqual(actual, bw, places=5)
+
+        scalar = self._scalar(lambda: buffer.get_blend_arrays(flags))
+        self.assertEqual(offsets.tolist(), scalar[0])
+        self.assertEqual(indices.tolist(), scalar[1])
+
+        bone_weights = buffer.get_bone_weights(flags)
+        scalar_bone_weights = self._scalar(lambda: buffer.get_bone_weights(flags))
+        self.assertEqual(list(bone_weights.keys()), list(scalar_bone_weights.keys()))
+        for bi, (vertex_ids, bone_weights) in bone_weights.items():
+            expected_ids, expected_weights = scalar_bone_weights[bi]
+            self.assertEqual(vertex_ids.tolist(), sorted(expected_ids))
+            expected_weights = [w for _, w in sorted(zip(expected_ids, expected_weights))]
+            for actual, expected in zip(bone_weights.tolist(), expected_weights):
+                self.assertAlmostEqual(actual, expected, places=5)
+
+    def test_skinned(self):
+        buffer = read_vertex_buffer(self._temp_dir.name)
+        self.assertBlendArrays(buffer, MeshFlags.NONE)
+
+    def test_implied(self):
+        buffer = read_vertex_buffer(self._temp_dir.name, blend_weight_format='UInt16N3')
+        self.assertBlendArrays(buffer, MeshFlags.USE_IMPLIED_BLENDWEIGHTS)
+
+    def test_rigid(self):
+        buffer = read_vertex_buffer(self._temp_dir.name, blend_weight_format=None)
+        self.assertBlendArrays(buffer, MeshFlags.NONE)
+
+    def test_multiple_channels(self):
+        buffer = read_vertex_buffer(self._temp_dir.name)
+        buffer.blendindex_channels = buffer.blendindex_channels * 2
+        buffer.blendweight_channels = buffer.blendweight_channels * 2
+        self.assertBlendArrays(buffer, MeshFlags.NONE)
+
+class Test_Gather(unittest.TestCase):
+    def test_gather(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            buffer = read_vertex_buffer(temp_dir, color_format='UByteN4', normal_format='DecN4')
+
+        vertex_ids = [5, 0, 17, 400, 17, buffer.count - 1]
+        result = buffer.gather(vertex_ids)
+        self.assertEqual(result.count, len(vertex_ids))
+
+        channel_pairs = [
+            (buffer.position_channels, result.position_channels),
+            (buffer.texcoord_channels, result.texcoord_channels),
+            (buffer.normal_channels, result.normal_channels),
+            (buffer.blendindex_channels, result.blendindex_channels),
+            (buffer.blendweight_channels, result.blendweight_channels),
+            (buffer.color_channels, result.color_channels)
+        ]
+
+        for source_channels, result_channels in channel_pairs:
+            self.assertEqual(len(source_channels), len(result_channels))
+            for source, gathered in zip(source_channels, result_channels):
+                self.assertEqual([tuple(gathered[i]) for i in range(len(vertex_ids))], [tuple(source[i]) for i in vertex_ids])
+
+                # gathering from a slice should be relative to the start of the slice
+                sliced = source.slice(100, 50).gather([0, 49])
+                self.assertEqual([tuple(v) for v in sliced], [tuple(source[100]), tuple(source[149])])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -136,7 +136,7 @@ class RmfDialog(QtWidgets.QDialog):
         self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)
 
         try:
-            self._scene = SceneReader.open_scene(filepath)
+            self._scene = SceneReader.open_scene(filepath, memory_map=True, lazy=True)
         except Exception as e:
             self._error = e
             return